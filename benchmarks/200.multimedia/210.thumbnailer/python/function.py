@@ -16,8 +16,8 @@ client = storage.storage.get_instance()
 #        image.save(resized_path)
 
 # Memory-based solution
-def resize_image(image_bytes, w, h):
-    with Image.open(io.BytesIO(image_bytes)) as image:
+def resize_image(image_file, w, h):
+    with Image.open(image_file) as image:
         image.thumbnail((w,h))
         out = io.BytesIO()
         image.save(out, format='jpeg')
@@ -39,16 +39,19 @@ def handler(event):
     #resize_image(download_path, upload_path, width, height)
     #client.upload(output_bucket, key, upload_path)
     download_begin = datetime.datetime.now()
-    img = client.download_stream(input_bucket, key)
+    with client.open_read(input_bucket, key) as f:
+        img = f.read()
     download_end = datetime.datetime.now()
 
     process_begin = datetime.datetime.now()
-    resized = resize_image(img, width, height)
+    resized = resize_image(io.BytesIO(img), width, height)
     resized_size = resized.getbuffer().nbytes
     process_end = datetime.datetime.now()
 
     upload_begin = datetime.datetime.now()
-    key_name = client.upload_stream(output_bucket, key, resized)
+    with client.open_write(output_bucket, key) as out:
+        out.write(resized.getbuffer())
+    key_name = out.key
     upload_end = datetime.datetime.now()
 
     download_time = (download_end - download_begin) / datetime.timedelta(microseconds=1)
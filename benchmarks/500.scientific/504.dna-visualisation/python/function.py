@@ -1,4 +1,4 @@
-import datetime, io, json
+import datetime, json
 # using https://squiggle.readthedocs.io/en/latest/
 from squiggle import transform
 
@@ -10,23 +10,21 @@ def handler(event):
     input_bucket = event.get('bucket').get('input')
     output_bucket = event.get('bucket').get('output')
     key = event.get('object').get('key')
-    download_path = '/tmp/{}'.format(key)
 
     download_begin = datetime.datetime.now()
-    client.download(input_bucket, key, download_path)
+    with client.open_read(input_bucket, key) as f:
+        data = f.read().decode()
     download_stop = datetime.datetime.now()
-    data = open(download_path, "r").read()
 
     process_begin = datetime.datetime.now()
     result = transform(data)
     process_end = datetime.datetime.now()
 
     upload_begin = datetime.datetime.now()
-    buf = io.BytesIO(json.dumps(result).encode())
-    buf.seek(0)
-    key_name = client.upload_stream(output_bucket, key, buf)
+    with client.open_write(output_bucket, key) as out:
+        out.write(json.dumps(result).encode())
+    key_name = out.key
     upload_stop = datetime.datetime.now()
-    buf.close()
 
     download_time = (download_stop - download_begin) / datetime.timedelta(microseconds=1)
     process_time = (process_end - process_begin) / datetime.timedelta(microseconds=1)
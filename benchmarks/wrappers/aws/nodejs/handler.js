@@ -1,5 +1,11 @@
 
-const path = require('path'), fs = require('fs');
+// loading of the wrapper is timed with the same monotonic clock as invocations
+const load_start = process.hrtime();
+
+function elapsed_us(start) {
+  var elapsed = process.hrtime(start);
+  return elapsed[0] * 1e6 + elapsed[1] / 1e3;
+}
 
 function process_output(data, http_trigger) {
   if(http_trigger)
@@ -13,20 +19,20 @@ exports.handler = async function(event, context) {
   var start = process.hrtime();
   var http_trigger = "body" in event;
   var input_data = http_trigger ? JSON.parse(event.body) : event
+  var first_invocation = cold_process;
+  cold_process = false;
+  var init_start = process.hrtime();
   var func = require('./function/function')
+  var init_time = elapsed_us(init_start);
+  var handler_start = process.hrtime();
   var ret = func.handler(input_data);
   return ret.then(
     (result) => {
+      var handler_time = elapsed_us(handler_start);
       var elapsed = process.hrtime(start);
       var end = Date.now()/1000;
       var micro = elapsed[1] / 1e3 + elapsed[0] * 1e6;
 
-      var is_cold = false;
-      var fname = path.join('/tmp','cold_run');
-      if(!fs.existsSync(fname)) {
-        is_cold = true;
-        fs.closeSync(fs.openSync(fname, 'w'));
-      }
       return {
         statusCode: 200,
         body: process_output({
@@ -34,8 +40,11 @@ exports.handler = async function(event, context) {
           end: end,
           compute_time: micro,
           results_time: 0,
+          load_time: first_invocation ? load_time : 0,
+          code_load_time: first_invocation ? init_time : 0,
+          handler_time: handler_time,
           result: {output: result},
-          is_cold: is_cold,
+          is_cold: first_invocation,
           request_id: context.awsRequestId
         }, http_trigger)
       };
@@ -45,3 +54,7 @@ exports.handler = async function(event, context) {
     }
   );
 }
+
+// reported by the first invocation in this process
+const load_time = elapsed_us(load_start);
+var cold_process = true;
@@ -1,9 +1,16 @@
 
+import time
+# loading of the wrapper is timed with the same monotonic clock as invocations
+load_begin = time.perf_counter()
+
 import datetime, io, json, os, sys, uuid
 
 # Add current directory to allow location of packages
 sys.path.append(os.path.join(os.path.dirname(__file__), '.python_packages/lib/site-packages'))
 
+from function.import_profiler import ImportProfiler
+
+
 # TODO: usual trigger
 # implement support for S3 and others
 def handler(event, context):
@@ -17,8 +24,14 @@ def handler(event, context):
     event['request-id'] = req_id
     event['income-timestamp'] = income_timestamp
     begin = datetime.datetime.now()
-    from function import function
+    global cold_process
+    first_invocation, cold_process = cold_process, False
+    init_begin = time.perf_counter()
+    with ImportProfiler(event.get('profile-imports', False)) as profiler:
+        from function import function
+    handler_begin = time.perf_counter()
     ret = function.handler(event)
+    handler_end = time.perf_counter()
     end = datetime.datetime.now()
 
     log_data = {
@@ -39,11 +52,9 @@ def handler(event, context):
     else:
         results_time = 0
 
-    # cold test
-    is_cold = False
+    # the file identifies the container, shared by all processes running in it
     fname = os.path.join('/tmp', 'cold_run')
     if not os.path.exists(fname):
-        is_cold = True
         container_id = str(uuid.uuid4())[0:8]
         with open(fname, 'a') as f:
             f.write(container_id)
@@ -61,11 +72,19 @@ def handler(event, context):
             'begin': begin.strftime('%s.%f'),
             'end': end.strftime('%s.%f'),
             'results_time': results_time,
-            'is_cold': is_cold,
+            'is_cold': first_invocation,
             'result': log_data,
             'request_id': context.aws_request_id,
             'cold_start_var': cold_start_var,
             'container_id': container_id,
+            'imports': profiler.imports,
+            'load_time': int(load_time * 1000000) if first_invocation else 0,
+            'code_load_time': int((handler_begin - init_begin) * 1000000) if first_invocation else 0,
+            'handler_time': int((handler_end - handler_begin) * 1000000),
         })
     }
 
+
+# reported by the first invocation in this process
+load_time = time.perf_counter() - load_begin
+cold_process = True
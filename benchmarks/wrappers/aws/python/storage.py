@@ -5,6 +5,124 @@ import uuid
 import boto3
 
 
+class ChunkReader(io.RawIOBase):
+    """
+    Readable stream over chunks of an object received from the network.
+    Closing the stream closes the source of chunks, releasing its connection.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, chunks, source):
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._chunk = memoryview(b'')
+        self._source = source
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._chunk:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk = memoryview(chunk)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        self._position += size
+        return size
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            close = getattr(self._source, 'close', None)
+            if close is not None:
+                close()
+        super().close()
+
+
+class MultipartWriter(io.RawIOBase):
+    """
+    Writable stream uploading data in parts, such that at most one part is kept in memory.
+    Objects smaller than a part are uploaded with a single request.
+    The upload is aborted when the stream is left with an exception.
+    """
+
+    # S3 requires parts of at least 5 MiB, except the last one
+    PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, client, bucket, key):
+        super().__init__()
+        self.key = key
+        self._client = client
+        self._bucket = bucket
+        self._buffer = bytearray()
+        self._parts = []
+        self._upload_id = None
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.PART_SIZE:
+            self._upload_part(bytes(self._buffer[:self.PART_SIZE]))
+            del self._buffer[:self.PART_SIZE]
+        return len(data)
+
+    def _upload_part(self, data):
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(
+                Bucket=self._bucket, Key=self.key
+            )['UploadId']
+        part_number = len(self._parts) + 1
+        ret = self._client.upload_part(
+            Bucket=self._bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=data
+        )
+        self._parts.append({'ETag': ret['ETag'], 'PartNumber': part_number})
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                self._client.put_object(Bucket=self._bucket, Key=self.key, Body=bytes(self._buffer))
+            else:
+                if self._buffer:
+                    self._upload_part(bytes(self._buffer))
+                self._client.complete_multipart_upload(
+                    Bucket=self._bucket, Key=self.key, UploadId=self._upload_id,
+                    MultipartUpload={'Parts': self._parts}
+                )
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._buffer = bytearray()
+            super().close()
+
+    def abort(self):
+        if self._upload_id is not None:
+            self._client.abort_multipart_upload(
+                Bucket=self._bucket, Key=self.key, UploadId=self._upload_id
+            )
+            self._upload_id = None
+        self._buffer = bytearray()
+        super().close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
 class storage:
     instance = None
     client = None
@@ -30,12 +148,13 @@ class storage:
         self.client.download_file(bucket, file, filepath)
 
     def download_directory(self, bucket, prefix, path):
-        objects = self.client.list_objects_v2(Bucket=bucket, Prefix=prefix)
-        for obj in objects['Contents']:
-            file_name = obj['Key']
-            path_to_file = os.path.dirname(file_name)
-            os.makedirs(os.path.join(path, path_to_file), exist_ok=True)
-            self.download(bucket, file_name, os.path.join(path, file_name))
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                file_name = obj['Key']
+                path_to_file = os.path.dirname(file_name)
+                os.makedirs(os.path.join(path, path_to_file), exist_ok=True)
+                self.download(bucket, file_name, os.path.join(path, file_name))
 
     def upload_stream(self, bucket, file, data):
         key_name = storage.unique_name(file)
@@ -43,9 +162,24 @@ class storage:
         return key_name
 
     def download_stream(self, bucket, file):
-        data = io.BytesIO()
-        self.client.download_fileobj(bucket, file, data)
-        return data.getbuffer()
+        return self.client.get_object(Bucket=bucket, Key=file)['Body'].read()
+
+    """
+        Streaming access to objects: data is transferred while it is read or written,
+        without keeping the entire object in memory.
+    """
+
+    def open_read(self, bucket, file):
+        body = self.client.get_object(Bucket=bucket, Key=file)['Body']
+        # chunks are read directly from the HTTP response
+        return io.BufferedReader(ChunkReader(body.iter_chunks(ChunkReader.CHUNK_SIZE), body))
+
+    def open_write(self, bucket, file):
+        return MultipartWriter(self.client, bucket, storage.unique_name(file))
+
+    def read_range(self, bucket, file, offset, length):
+        byte_range = 'bytes={}-{}'.format(offset, offset + length - 1)
+        return self.client.get_object(Bucket=bucket, Key=file, Range=byte_range)['Body'].read()
     
     def get_instance():
         if storage.instance is None:
@@ -1,6 +1,12 @@
 
 
-const path = require('path'), fs = require('fs');
+// loading of the wrapper is timed with the same monotonic clock as invocations
+const load_start = process.hrtime();
+
+function elapsed_us(start) {
+  var elapsed = process.hrtime(start);
+  return elapsed[0] * 1e6 + elapsed[1] / 1e3;
+}
 
 module.exports = async function(context, req) {
   if('connection_string' in req.body) {
@@ -8,29 +14,31 @@ module.exports = async function(context, req) {
   }
   var begin = Date.now()/1000;
   var start = process.hrtime();
+  var first_invocation = cold_process;
+  cold_process = false;
+  var init_start = process.hrtime();
   var func = require('./function');
+  var init_time = elapsed_us(init_start);
+  var handler_start = process.hrtime();
   var ret = func.handler(req.body);
   return ret.then(
     (result) => {
+      var handler_time = elapsed_us(handler_start);
       var elapsed = process.hrtime(start);
       var end = Date.now()/1000;
       var micro = elapsed[1] / 1e3 + elapsed[0] * 1e6;
 
-      var is_cold = false;
-      var fname = path.join('/tmp','cold_run');
-      if(!fs.existsSync(fname)) {
-        is_cold = true;
-        fs.closeSync(fs.openSync(fname, 'w'));
-      }
-
       return {
           body: {
             begin: begin,
             end: end,
             compute_time: micro,
             results_time: 0,
+          load_time: first_invocation ? load_time : 0,
+          code_load_time: first_invocation ? init_time : 0,
+          handler_time: handler_time,
             result: {output: result},
-            is_cold: is_cold,
+            is_cold: first_invocation,
             request_id: context.invocationId
           },
           headers: { 'Content-Type': 'application/json' }
@@ -43,3 +51,7 @@ module.exports = async function(context, req) {
     }
   );
 }
+
+// reported by the first invocation in this process
+const load_time = elapsed_us(load_start);
+var cold_process = true;
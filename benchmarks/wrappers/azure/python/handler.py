@@ -1,8 +1,13 @@
+import time
+# loading of the wrapper is timed with the same monotonic clock as invocations
+load_begin = time.perf_counter()
 
-import datetime, io, json, os, uuid
+import datetime, io, json, os, sys, uuid
 
 import azure.functions as func
 
+from .import_profiler import ImportProfiler
+
 
 # TODO: usual trigger
 # implement support for blob and others
@@ -15,8 +20,14 @@ def main(req: func.HttpRequest, context: func.Context) -> func.HttpResponse:
     req_json['income-timestamp'] = income_timestamp
     begin = datetime.datetime.now()
     # We are deployed in the same directory
-    from . import function
+    global cold_process
+    first_invocation, cold_process = cold_process, False
+    init_begin = time.perf_counter()
+    with ImportProfiler(req_json.get('profile-imports', False)) as profiler:
+        from . import function
+    handler_begin = time.perf_counter()
     ret = function.handler(req_json)
+    handler_end = time.perf_counter()
     end = datetime.datetime.now()
 
     log_data = {
@@ -38,11 +49,9 @@ def main(req: func.HttpRequest, context: func.Context) -> func.HttpResponse:
     else:
         results_time = 0
 
-    # cold test
-    is_cold = False
+    # the file identifies the container, shared by all processes running in it
     fname = os.path.join('/tmp','cold_run')
     if not os.path.exists(fname):
-        is_cold = True
         container_id = str(uuid.uuid4())[0:8]
         with open(fname, 'a') as f:
             f.write(container_id)
@@ -64,12 +73,20 @@ def main(req: func.HttpRequest, context: func.Context) -> func.HttpResponse:
             'end': end.strftime('%s.%f'),
             'results_time': results_time,
             'result': log_data,
-            'is_cold': is_cold,
+            'is_cold': first_invocation,
             'is_cold_worker': is_cold_worker,
             'container_id': container_id,
             'environ_container_id': os.environ['CONTAINER_NAME'],
-            'request_id': context.invocation_id
+            'request_id': context.invocation_id,
+            'imports': profiler.imports,
+            'load_time': int(load_time * 1000000) if first_invocation else 0,
+            'code_load_time': int((handler_begin - init_begin) * 1000000) if first_invocation else 0,
+            'handler_time': int((handler_end - handler_begin) * 1000000)
         }),
         mimetype="application/json"
     )
 
+
+# reported by the first invocation in this process
+load_time = time.perf_counter() - load_begin
+cold_process = True
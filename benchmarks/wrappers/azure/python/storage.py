@@ -1,8 +1,107 @@
 
+import io
 import os
 import uuid
 
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import BlobBlock, BlobServiceClient
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Readable stream over chunks of an object received from the network.
+    Closing the stream closes the source of chunks, releasing its connection.
+    """
+
+    def __init__(self, chunks, source):
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._chunk = memoryview(b'')
+        self._source = source
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._chunk:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk = memoryview(chunk)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        self._position += size
+        return size
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            close = getattr(self._source, 'close', None)
+            if close is not None:
+                close()
+        super().close()
+
+
+class BlockWriter(io.RawIOBase):
+    """
+    Writable stream uploading data in blocks, such that at most one block is kept in memory.
+    Blobs smaller than a block are uploaded with a single request.
+    Staged blocks are discarded by Azure when the stream is left with an exception.
+    """
+
+    BLOCK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, client, key):
+        super().__init__()
+        self.key = key
+        self._client = client
+        self._buffer = bytearray()
+        self._blocks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.BLOCK_SIZE:
+            self._stage_block(bytes(self._buffer[:self.BLOCK_SIZE]))
+            del self._buffer[:self.BLOCK_SIZE]
+        return len(data)
+
+    def _stage_block(self, data):
+        # identifiers of blocks in a blob must have the same length
+        block_id = '{:08d}'.format(len(self._blocks))
+        self._client.stage_block(block_id, data)
+        self._blocks.append(BlobBlock(block_id=block_id))
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if not self._blocks:
+                self._client.upload_blob(bytes(self._buffer), overwrite=True)
+            else:
+                if self._buffer:
+                    self._stage_block(bytes(self._buffer))
+                self._client.commit_block_list(self._blocks)
+        finally:
+            self._buffer = bytearray()
+            super().close()
+
+    def abort(self):
+        # uncommitted blocks are garbage collected after a week
+        self._buffer = bytearray()
+        super().close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
 
 class storage:
     instance = None
@@ -51,6 +150,26 @@ class storage:
     def download_stream(self, container, file):
         client = self.client.get_blob_client(container=container, blob=file)
         return client.download_blob().readall()
+
+    """
+        Streaming access to objects: data is transferred while it is read or written,
+        without keeping the entire object in memory.
+    """
+
+    def open_read(self, container, file):
+        client = self.client.get_blob_client(container=container, blob=file)
+        # the downloader requests consecutive chunks of the blob while it is read
+        downloader = client.download_blob()
+        return io.BufferedReader(ChunkReader(downloader.chunks(), downloader))
+
+    def open_write(self, container, file):
+        key_name = storage.unique_name(file)
+        client = self.client.get_blob_client(container=container, blob=key_name)
+        return BlockWriter(client, key_name)
+
+    def read_range(self, container, file, offset, length):
+        client = self.client.get_blob_client(container=container, blob=file)
+        return client.download_blob(offset=offset, length=length).readall()
     
     def get_instance():
         if storage.instance is None:
@@ -0,0 +1,83 @@
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+
+# The import hook is process-wide, while requests can be served by several threads.
+# It is installed by the first active profiler and restored by the last one;
+# each thread records its imports only into its own profiler.
+_lock = threading.Lock()
+_active = 0
+_original_import = None
+_current = threading.local()
+
+
+def _import(name, globals=None, locals=None, fromlist=(), level=0):
+    profiler = getattr(_current, 'profiler', None)
+    if profiler is None:
+        return _original_import(name, globals, locals, fromlist, level)
+    return profiler._import(name, globals, locals, fromlist, level)
+
+
+class ImportProfiler:
+    """
+    Record modules imported in the context, similarly to `python -X importtime`:
+    self and cumulative time of each import in microseconds, and its nesting depth.
+    Modules imported before, e.g., in a warm container, are not reported.
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.imports = [] if enabled else None
+        self._stack = []
+
+    def __enter__(self):
+        global _active, _original_import
+        if self.enabled:
+            with _lock:
+                if _active == 0:
+                    _original_import = builtins.__import__
+                    builtins.__import__ = _import
+                _active += 1
+            _current.profiler = self
+        return self
+
+    def __exit__(self, *args):
+        global _active
+        if self.enabled:
+            _current.profiler = None
+            with _lock:
+                _active -= 1
+                if _active == 0:
+                    builtins.__import__ = _original_import
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = name
+        if level > 0:
+            try:
+                module = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+            except (ImportError, ValueError):
+                pass
+        # submodules in fromlist, e.g., from . import function
+        if module in sys.modules:
+            parent = sys.modules[module]
+            new = [item for item in fromlist or () if item != '*' and not hasattr(parent, item)]
+            if not new:
+                return _original_import(name, globals, locals, fromlist, level)
+            module = ','.join('{}.{}'.format(module, item).lstrip('.') for item in new)
+        self._stack.append(0.0)
+        begin = time.perf_counter()
+        try:
+            return _original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - begin
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            self.imports.append({
+                'module': module,
+                'self': int((cumulative - children) * 1000000),
+                'cumulative': int(cumulative * 1000000),
+                'depth': len(self._stack)
+            })
@@ -1,7 +1,13 @@
+import time
+# loading of the wrapper is timed with the same monotonic clock as invocations
+load_begin = time.perf_counter()
+
 import datetime, io, json, os, uuid, sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '.python_packages/lib/site-packages'))
 
+from function.import_profiler import ImportProfiler
+
 
 def handler(req):
     income_timestamp = datetime.datetime.now().timestamp()
@@ -12,9 +18,15 @@ def handler(req):
     req_json['request-id'] = req_id
     req_json['income-timestamp'] = income_timestamp
     begin = datetime.datetime.now()
-    # We are deployed in the same directorygit status
-    from function import function
+    # We are deployed in the same directory
+    global cold_process
+    first_invocation, cold_process = cold_process, False
+    init_begin = time.perf_counter()
+    with ImportProfiler(req_json.get('profile-imports', False)) as profiler:
+        from function import function
+    handler_begin = time.perf_counter()
     ret = function.handler(req_json)
+    handler_end = time.perf_counter()
     end = datetime.datetime.now()
 
 
@@ -36,11 +48,9 @@ def handler(req):
     else:
         results_time = 0
 
-    # cold test
-    is_cold = False
+    # the file identifies the container, shared by all processes running in it
     fname = os.path.join('/tmp', 'cold_run')
     if not os.path.exists(fname):
-        is_cold = True
         container_id = str(uuid.uuid4())[0:8]
         with open(fname, 'a') as f:
             f.write(container_id)
@@ -56,9 +66,18 @@ def handler(req):
             'begin': begin.strftime('%s.%f'),
             'end': end.strftime('%s.%f'),
             'results_time': results_time,
-            'is_cold': is_cold,
+            'is_cold': first_invocation,
             'result': log_data,
             'request_id': req_id,
             'cold_start_var': cold_start_var,
             'container_id': container_id,
+            'imports': profiler.imports,
+            'load_time': int(load_time * 1000000) if first_invocation else 0,
+            'code_load_time': int((handler_begin - init_begin) * 1000000) if first_invocation else 0,
+            'handler_time': int((handler_end - handler_begin) * 1000000),
         }), 200, {'ContentType': 'application/json'}
+
+
+# reported by the first invocation in this process
+load_time = time.perf_counter() - load_begin
+cold_process = True
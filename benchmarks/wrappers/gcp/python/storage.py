@@ -1,4 +1,3 @@
-import io
 import os
 import uuid
 
@@ -8,6 +7,8 @@ from google.cloud import storage as gcp_storage
 class storage:
     instance = None
     client = None
+    # multiple of 256 KiB required by resumable uploads
+    CHUNK_SIZE = 8 * 1024 * 1024
 
     def __init__(self):
         self.client = gcp_storage.Client()
@@ -49,11 +50,31 @@ class storage:
         return key_name
 
     def download_stream(self, bucket, file):
-        data = io.BytesIO()
         bucket_instance = self.client.bucket(bucket)
         blob = bucket_instance.blob(file)
-        blob.download_to_file(data)
-        return data.getbuffer()
+        return blob.download_as_bytes()
+
+    """
+        Streaming access to objects: data is transferred while it is read or written,
+        without keeping the entire object in memory.
+    """
+
+    def open_read(self, bucket, file):
+        blob = self.client.bucket(bucket).blob(file)
+        # the reader is seekable and downloads chunks with ranged requests
+        return blob.open('rb', chunk_size=storage.CHUNK_SIZE)
+
+    def open_write(self, bucket, file):
+        key_name = storage.unique_name(file)
+        blob = self.client.bucket(bucket).blob(key_name)
+        # chunks are sent with a resumable upload, finalized when the writer is closed
+        writer = blob.open('wb', chunk_size=storage.CHUNK_SIZE)
+        writer.key = key_name
+        return writer
+
+    def read_range(self, bucket, file, offset, length):
+        blob = self.client.bucket(bucket).blob(file)
+        return blob.download_as_bytes(start=offset, end=offset + length - 1)
 
     def get_instance():
         if storage.instance is None:
@@ -1,4 +1,10 @@
-const path = require('path'), fs = require('fs');
+// loading of the wrapper is timed with the same monotonic clock as invocations
+const load_start = process.hrtime();
+
+function elapsed_us(start) {
+  var elapsed = process.hrtime(start);
+  return elapsed[0] * 1e6 + elapsed[1] / 1e3;
+}
 
 async function main(args) {
 
@@ -8,29 +14,35 @@ async function main(args) {
       delete args[arg];
   });
 
+  var first_invocation = cold_process;
+  cold_process = false;
+  var init_start = process.hrtime();
   var func = require('/function/function.js');
+  var init_time = elapsed_us(init_start);
   var begin = Date.now() / 1000;
   var start = process.hrtime();
   var ret = await func.handler(args);
+  var handler_time = elapsed_us(start);
   var elapsed = process.hrtime(start);
   var end = Date.now() / 1000;
   var micro = elapsed[1] / 1e3 + elapsed[0] * 1e6;
-  var is_cold = false;
-  var fname = path.join('/tmp', 'cold_run');
-  if (!fs.existsSync(fname)) {
-    is_cold = true;
-    fs.closeSync(fs.openSync(fname, 'w'));
-  }
 
   return {
     begin: begin,
     end: end,
     compute_time: micro,
     results_time: 0,
+    load_time: first_invocation ? load_time : 0,
+    code_load_time: first_invocation ? init_time : 0,
+    handler_time: handler_time,
     result: ret,
     request_id: process.env.__OW_ACTIVATION_ID,
-    is_cold: is_cold,
+    is_cold: first_invocation,
   };
 }
 
 exports.main = main;
+
+// reported by the first invocation in this process
+const load_time = elapsed_us(load_start);
+var cold_process = true;
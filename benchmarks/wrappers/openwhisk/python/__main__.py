@@ -1,9 +1,17 @@
+import time
+# loading of the wrapper is timed with the same monotonic clock as invocations
+load_begin = time.perf_counter()
+
 import logging
 import datetime
 import os
+import sys
 
 import minio
 
+from function.import_profiler import ImportProfiler
+
+
 def main(args):
     logging.getLogger().setLevel(logging.INFO)
     begin = datetime.datetime.now()
@@ -15,8 +23,14 @@ def main(args):
         del args[arg]
 
     try:
-        from function import function
+        global cold_process
+        first_invocation, cold_process = cold_process, False
+        init_begin = time.perf_counter()
+        with ImportProfiler(args.get("profile-imports", False)) as profiler:
+            from function import function
+        handler_begin = time.perf_counter()
         ret = function.handler(args)
+        handler_end = time.perf_counter()
         end = datetime.datetime.now()
         logging.info("Function result: {}".format(ret))
         log_data = {"result": ret["result"]}
@@ -25,19 +39,17 @@ def main(args):
 
         results_time = (end - begin) / datetime.timedelta(microseconds=1)
 
-        is_cold = False
-        fname = "cold_run"
-        if not os.path.exists(fname):
-            is_cold = True
-            open(fname, "a").close()
-
         return {
             "begin": begin.strftime("%s.%f"),
             "end": end.strftime("%s.%f"),
             "request_id": os.getenv('__OW_ACTIVATION_ID'),
             "results_time": results_time,
-            "is_cold": is_cold,
+            "is_cold": first_invocation,
             "result": log_data,
+            "imports": profiler.imports,
+            "load_time": int(load_time * 1000000) if first_invocation else 0,
+            "code_load_time": int((handler_begin - init_begin) * 1000000) if first_invocation else 0,
+            "handler_time": int((handler_end - handler_begin) * 1000000),
         }
     except Exception as e:
         end = datetime.datetime.now()
@@ -49,3 +61,8 @@ def main(args):
             "results_time": results_time,
             "result": f"Error - invocation failed! Reason: {e}"
         }
+
+
+# reported by the first invocation in this process
+load_time = time.perf_counter() - load_begin
+cold_process = True
@@ -1,10 +1,87 @@
+import io
 import os
+import tempfile
 import uuid
 import json
 import minio
 import logging
 
 
+class SpooledWriter(io.RawIOBase):
+    """
+    Writable stream for Minio, which requires the length of uploaded objects.
+    Data is kept in memory up to the part size and spooled to a temporary file beyond it;
+    the object is uploaded on close, in parts when it is larger than a part.
+    """
+
+    PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, client, bucket, key):
+        super().__init__()
+        self.key = key
+        self._client = client
+        self._bucket = bucket
+        self._file = tempfile.SpooledTemporaryFile(max_size=self.PART_SIZE)
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self._file.write(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            length = self._file.tell()
+            self._file.seek(0)
+            self._client.put_object(self._bucket, self.key, self._file, length)
+        finally:
+            self._file.close()
+            super().close()
+
+    def abort(self):
+        self._file.close()
+        super().close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class ResponseReader(io.RawIOBase):
+    """
+    Readable stream over the HTTP response of a Minio object.
+    Closing the stream returns the connection to the pool, as done by `read_range`.
+    """
+
+    def __init__(self, response):
+        super().__init__()
+        self._response = response
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self._response.readinto(buffer)
+        self._position += size
+        return size
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._response.close()
+            finally:
+                self._response.release_conn()
+        super().close()
+
+
 class storage:
     instance = None
     client = None
@@ -70,6 +147,30 @@ class storage:
         data = self.client.get_object(bucket, file)
         return data.read()
 
+    """
+        Streaming access to objects: data is transferred while it is read or written,
+        without keeping the entire object in memory.
+    """
+
+    def open_read(self, bucket, file):
+        # the body is read directly from the HTTP response
+        return io.BufferedReader(ResponseReader(self.client.get_object(bucket, file)))
+
+    def open_write(self, bucket, file):
+        return SpooledWriter(self.client, bucket, storage.unique_name(file))
+
+    def read_range(self, bucket, file, offset, length):
+        # ranged reads moved to get_object in Minio 7
+        if hasattr(self.client, 'get_partial_object'):
+            response = self.client.get_partial_object(bucket, file, offset, length)
+        else:
+            response = self.client.get_object(bucket, file, offset=offset, length=length)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
     @staticmethod
     def get_instance():
         if storage.instance is None:
@@ -1,27 +1,48 @@
-const http = require('http'),
+// loading of the server is timed with the same monotonic clock as invocations
+const load_start = process.hrtime();
+const cluster = require('cluster'),
+      http = require('http'),
       strftime = require('strftime'),
-      express = require('express'),
-      f = require('/function/function/function');
+      express = require('express');
+const init_start = process.hrtime();
+const f = require('/function/function/function');
+const init_time = elapsed_us(init_start);
 //import { v4 as uuidv4 } from 'uuid';
 const { v4: uuidv4 } = require('uuid');
 
 
+function elapsed_us(start) {
+  var elapsed = process.hrtime(start);
+  return elapsed[0] * 1e6 + elapsed[1] / 1e3;
+}
+
+// the first request served by the container is a cold start
+var cold_process = true;
+
 var app = express();
 app.use(express.json());
 
 app.post('/', function (req, res) {
 
+  let first_invocation = cold_process;
+  cold_process = false;
   let begin = Date.now();
+  let handler_start = process.hrtime();
   let ret = f.handler(req.body);
   ret.then((func_res) => {
 
+    let handler_time = elapsed_us(handler_start);
     let end = Date.now();
     res.setHeader('Content-Type', 'application/json');
     res.end(JSON.stringify({
       begin: strftime('%s.%L', new Date(begin)),
       end: strftime('%s.%L', new Date(end)),
       request_id: uuidv4(),
-      is_cold: false,
+      is_cold: first_invocation,
+      load_time: first_invocation ? load_time : 0,
+      // the benchmark is loaded with the server
+      code_load_time: first_invocation ? init_time : 0,
+      handler_time: handler_time,
       result: {
         output: func_res
       }
@@ -35,8 +56,22 @@ app.post('/', function (req, res) {
   );
 });
 
-app.listen(port=process.argv[2], function () {
-  console.log(`Server listening on port ${process.argv[2]}.`);
-});
+const load_time = elapsed_us(load_start) - init_time;
+
+// each worker process is a separate function instance with its own cold start
+const workers = parseInt(process.env.SEBS_SERVER_WORKERS || '1');
+// sockets of requests exceeding the function timeout are closed, zero disables it
+const timeout = parseInt(process.env.SEBS_FUNCTION_TIMEOUT || '0');
+if (workers > 1 && cluster.isMaster) {
+  for (let i = 0; i < workers; i++) {
+    cluster.fork();
+  }
+  console.log(`Server listening on port ${process.argv[2]} with ${workers} workers.`);
+} else {
+  const server = app.listen(port=process.argv[2], function () {
+    console.log(`Server listening on port ${process.argv[2]}.`);
+  });
+  server.setTimeout(timeout * 1000);
+}
 
 
@@ -1,6 +1,11 @@
+import time
+# loading of the server is timed with the same monotonic clock as invocations
+load_begin = time.perf_counter()
+
 import datetime
 import os
 import sys
+import threading
 import uuid
 
 import bottle
@@ -8,25 +13,54 @@ from bottle import route, run, template, request
 
 CODE_LOCATION='/function'
 
+
 @route('/', method='POST')
 def flush_log():
+    global cold_process
+    # the first request served by the container is a cold start
+    with cold_lock:
+        first_invocation, cold_process = cold_process, False
+    init_begin = time.perf_counter()
+    with ImportProfiler(request.json.get('profile-imports', False)) as profiler:
+        from function import function
     begin = datetime.datetime.now()
-    from function import function
-    end = datetime.datetime.now()
-    # FIXME: measurements?
+    handler_begin = time.perf_counter()
     ret = function.handler(request.json)
+    handler_end = time.perf_counter()
+    end = datetime.datetime.now()
 
     return {
         'begin': begin.strftime('%s.%f'),
         'end': end.strftime('%s.%f'),
         "request_id": str(uuid.uuid4()),
-        "is_cold": False,
+        "is_cold": first_invocation,
         "result": {
             "output": ret
-        }
+        },
+        "imports": profiler.imports,
+        "load_time": int(load_time * 1000000) if first_invocation else 0,
+        "code_load_time": int((handler_begin - init_begin) * 1000000) if first_invocation else 0,
+        "handler_time": int((handler_end - handler_begin) * 1000000),
     }
 
 sys.path.append(os.path.join(CODE_LOCATION))
 sys.path.append(os.path.join(CODE_LOCATION, '.python_packages/lib/site-packages/'))
-run(host='0.0.0.0', port=int(sys.argv[1]), debug=True)
+# shipped with the function code, like the storage wrapper
+from function.import_profiler import ImportProfiler
+cold_process = True
+cold_lock = threading.Lock()
+load_time = time.perf_counter() - load_begin
+
+# each worker process is a separate function instance with its own cold start
+workers = int(os.environ.get('SEBS_SERVER_WORKERS', '1'))
+threads = int(os.environ.get('SEBS_SERVER_THREADS', '1'))
+# gunicorn kills workers exceeding the function timeout, zero disables it
+timeout = int(os.environ.get('SEBS_FUNCTION_TIMEOUT', '0'))
+try:
+    import gunicorn
+    server_options = {'server': 'gunicorn', 'workers': workers, 'threads': threads, 'timeout': timeout}
+except ImportError:
+    print('gunicorn is not available, using the single-threaded development server.')
+    server_options = {'debug': True}
+run(host='0.0.0.0', port=int(sys.argv[1]), **server_options)
 
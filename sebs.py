@@ -332,6 +332,76 @@ def regression(benchmark_input_size, benchmark_name, **kwargs):
     )
 
 
+@benchmark.command("build-all")
+@click.option(
+    "--benchmark-name",
+    "benchmark_names",
+    multiple=True,
+    type=str,
+    help="Build only the selected benchmarks. Can be repeated.",
+)
+@click.option(
+    "--deployments",
+    multiple=True,
+    type=click.Choice(["azure", "aws", "gcp", "local", "openwhisk"]),
+    help="Deployments to build for. Can be repeated. Defaults to the configured deployment.",
+)
+@click.option(
+    "--runtime",
+    "runtimes",
+    multiple=True,
+    type=str,
+    help="Language and version, e.g., python:3.8. Can be repeated.",
+)
+@click.option("--workers", default=8, type=int, help="Number of concurrent builds.")
+@click.option(
+    "--docker-builds",
+    default=2,
+    type=int,
+    help="Number of concurrent Docker containers installing dependencies.",
+)
+@common_params
+def build_all(benchmark_names, deployments, runtimes, workers, docker_builds, **kwargs):
+
+    from sebs.build import build_all as build_packages, timing_report
+
+    # building code packages does not require cloud resources
+    (config, output_dir, logging_filename, sebs_client, _) = parse_common_params(
+        initialize_deployment=False, **kwargs
+    )
+    runtime = config["experiments"]["runtime"]
+    selected_runtimes = []
+    for val in runtimes if runtimes else [f"{runtime['language']}:{runtime['version']}"]:
+        language, _, version = val.partition(":")
+        if not version:
+            raise RuntimeError(f"Runtime {val} must be specified as language:version!")
+        selected_runtimes.append((language, version))
+
+    results = build_packages(
+        sebs_client,
+        config["experiments"],
+        config["deployment"],
+        list(deployments) if deployments else [config["deployment"]["name"]],
+        list(benchmark_names) if benchmark_names else None,
+        selected_runtimes,
+        workers,
+        docker_builds,
+        logging_filename,
+    )
+    for res in results:
+        if res["status"] in ("failed", "skipped"):
+            sebs_client.logging.info(
+                f"Build of {res['benchmark']} for {res['deployment']} "
+                f"{res['language']}:{res['version']} {res['status']}: {res['reason']}"
+            )
+    sebs_client.logging.info("Build timings [s]:\n" + timing_report(results))
+
+    result_file = os.path.join(output_dir, "build.json")
+    with open(result_file, "w") as out_f:
+        json.dump(results, out_f, indent=2)
+    sebs_client.logging.info("Save results to {}".format(os.path.abspath(result_file)))
+
+
 @cli.group()
 def storage():
     pass
@@ -374,6 +444,35 @@ def storage_stop(input_json):
         logging.info(f"Stopped storage deployment of {storage_type}.")
 
 
+@cli.group()
+def cache():
+    pass
+
+
+@cache.command("migrate")
+@click.option(
+    "--cache",
+    "cache_dir",
+    default=os.path.join(os.path.curdir, "cache"),
+    type=click.Path(exists=True, file_okay=False),
+    help="Location of experiments cache.",
+)
+@click.option(
+    "--to",
+    "target",
+    required=True,
+    type=click.Choice(["json", "sqlite"]),
+    help="New cache backend.",
+)
+def cache_migrate(cache_dir, target):
+
+    from sebs.cache_backend import migrate
+
+    sebs.utils.global_logging()
+    count = migrate(cache_dir, target)
+    logging.info(f"Migrated {count} cached benchmarks in {cache_dir} to the {target} backend.")
+
+
 @cli.group()
 def local():
     pass
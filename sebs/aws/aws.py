@@ -11,10 +11,10 @@ import docker
 from sebs.aws.s3 import S3
 from sebs.aws.function import LambdaFunction
 from sebs.aws.config import AWSConfig
-from sebs.utils import execute
 from sebs.benchmark import Benchmark
 from sebs.cache import Cache
 from sebs.config import SeBSConfig
+from sebs.packaging import create_archive
 from sebs.utils import LoggingHandlers
 from sebs.faas.function import Function, ExecutionResult, Trigger, FunctionConfig
 from sebs.faas.storage import PersistentStorage
@@ -144,13 +144,11 @@ class AWS(System):
                 file = os.path.join(directory, file)
                 shutil.move(file, function_dir)
 
-        # FIXME: use zipfile
         # create zip with hidden directory but without parent directory
-        execute("zip -qu -r9 {}.zip * .".format(benchmark), shell=True, cwd=directory)
         benchmark_archive = "{}.zip".format(os.path.join(directory, benchmark))
+        bytes_size = create_archive(directory, benchmark_archive, **self.system_config.packaging())
         self.logging.info("Created {} archive".format(benchmark_archive))
 
-        bytes_size = os.path.getsize(os.path.join(directory, benchmark_archive))
         mbytes = bytes_size / 1024.0 / 1024.0
         self.logging.info("Zip archive size {:2f} MB".format(mbytes))
 
@@ -246,6 +244,7 @@ class AWS(System):
 
         trigger = LibraryTrigger(func_name, self)
         trigger.logging_handlers = self.logging_handlers
+        trigger.invocation_executor = self.invocation_executor
         lambda_function.add_trigger(trigger)
 
         return lambda_function
@@ -256,9 +255,11 @@ class AWS(System):
 
         for trigger in function.triggers(Trigger.TriggerType.LIBRARY):
             trigger.logging_handlers = self.logging_handlers
+            trigger.invocation_executor = self.invocation_executor
             cast(LibraryTrigger, trigger).deployment_client = self
         for trigger in function.triggers(Trigger.TriggerType.HTTP):
             trigger.logging_handlers = self.logging_handlers
+            trigger.invocation_executor = self.invocation_executor
 
     """
         Update function code and configuration on AWS.
@@ -502,6 +503,7 @@ class AWS(System):
             )
             time.sleep(5)
             trigger.logging_handlers = self.logging_handlers
+            trigger.invocation_executor = self.invocation_executor
         elif trigger_type == Trigger.TriggerType.LIBRARY:
             # should already exist
             return func.triggers(Trigger.TriggerType.LIBRARY)[0]
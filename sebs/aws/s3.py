@@ -1,13 +1,17 @@
 import uuid
-from typing import List
+from typing import Iterator, List
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 
 from sebs.cache import Cache
-from ..faas.storage import PersistentStorage
+from ..faas.storage import ObjectInfo, PersistentStorage
 
 
 class S3(PersistentStorage):
+
+    DELETE_BATCH = 1000
+
     @staticmethod
     def typename() -> str:
         return "AWS.S3"
@@ -78,31 +82,25 @@ class S3(PersistentStorage):
 
         return bucket_name
 
-    def uploader_func(self, bucket_idx, key, filepath):
-        # Skip upload when using cached buckets and not updating storage.
-        if self.cached and not self.replace_existing:
-            return
-        bucket_name = self.input_buckets[bucket_idx]
-        if not self.replace_existing:
-            if "Contents" in self.input_buckets_files[bucket_idx]:
-                for f in self.input_buckets_files[bucket_idx]["Contents"]:
-                    f_name = f["Key"]
-                    if key == f_name:
-                        self.logging.info(
-                            "Skipping upload of {} to {}".format(filepath, bucket_name)
-                        )
-                        return
-        bucket_name = self.input_buckets[bucket_idx]
-        self.upload(bucket_name, filepath, key)
-
     def upload(self, bucket_name: str, filepath: str, key: str):
         self.logging.info("Upload {} to {}".format(filepath, bucket_name))
-        self.client.upload_file(Filename=filepath, Bucket=bucket_name, Key=key)
+        config = self.upload_config
+        transfer_config = TransferConfig(
+            multipart_threshold=config.multipart_threshold * 1024 * 1024,
+            multipart_chunksize=config.part_size * 1024 * 1024,
+            max_concurrency=config.part_workers,
+        )
+        self.client.upload_file(
+            Filename=filepath, Bucket=bucket_name, Key=key, Config=transfer_config
+        )
 
     def download(self, bucket_name: str, key: str, filepath: str):
         self.logging.info("Download {}:{} to {}".format(bucket_name, key, filepath))
         self.client.download_file(Bucket=bucket_name, Key=key, Filename=filepath)
 
+    def read_object(self, bucket_name: str, key: str) -> bytes:
+        return self.client.get_object(Bucket=bucket_name, Key=key)["Body"].read()
+
     def exists_bucket(self, bucket_name: str) -> bool:
         try:
             self.client.head_bucket(Bucket=bucket_name)
@@ -110,21 +108,26 @@ class S3(PersistentStorage):
         except self.client.exceptions.ClientError:
             return False
 
-    def list_bucket(self, bucket_name: str):
-        objects_list = self.client.list_objects_v2(Bucket=bucket_name)
-        objects: List[str]
-        if "Contents" in objects_list:
-            objects = [obj["Key"] for obj in objects_list["Contents"]]
-        else:
-            objects = []
-        return objects
+    def list_objects(self, bucket_name: str, prefix: str = "") -> Iterator[ObjectInfo]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield ObjectInfo(obj["Key"], obj["Size"], obj["ETag"].strip('"'))
 
     def list_buckets(self, bucket_name: str) -> List[str]:
         s3_buckets = self.client.list_buckets()["Buckets"]
         return [bucket["Name"] for bucket in s3_buckets if bucket_name in bucket["Name"]]
 
-    def clean_bucket(self, bucket: str):
-        objects = self.client.list_objects_v2(Bucket=bucket)
-        if "Contents" in objects:
-            objects = [{"Key": obj["Key"]} for obj in objects["Contents"]]  # type: ignore
-            self.client.delete_objects(Bucket=bucket, Delete={"Objects": objects})  # type: ignore
+    def _delete_objects(self, bucket_name: str, keys: List[str]):
+        # S3 deletes at most 1000 objects in a single request
+        for begin in range(0, len(keys), self.DELETE_BATCH):
+            end = begin + self.DELETE_BATCH
+            batch = [{"Key": key} for key in keys[begin:end]]
+            ret = self.client.delete_objects(
+                Bucket=bucket_name, Delete={"Objects": batch}  # type: ignore
+            )
+            for error in ret.get("Errors", []):
+                self.logging.error(
+                    f"Error when deleting object {error['Key']} from bucket {bucket_name}: "
+                    f"{error['Message']}!"
+                )
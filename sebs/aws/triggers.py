@@ -2,7 +2,7 @@ import base64
 import concurrent.futures
 import datetime
 import json
-from typing import Dict, Optional  # noqa
+from typing import Dict, List, Optional  # noqa
 
 from sebs.aws.aws import AWS
 from sebs.faas.function import ExecutionResult, Trigger
@@ -111,11 +111,8 @@ class HTTPTrigger(Trigger):
         self.logging.debug(f"Invoke function {self.url}")
         return self._http_invoke(payload, self.url)
 
-    def async_invoke(self, payload: dict) -> concurrent.futures.Future:
-
-        pool = concurrent.futures.ThreadPoolExecutor()
-        fut = pool.submit(self.sync_invoke, payload)
-        return fut
+    def burst_invoke(self, payload: dict, invocations: int) -> List[concurrent.futures.Future]:
+        return self._http_burst_invoke(payload, self.url, invocations)
 
     def serialize(self) -> dict:
         return {"type": "HTTP", "url": self.url, "api-id": self.api_id}
@@ -16,7 +16,8 @@ from sebs.faas.function import Trigger
 from sebs.benchmark import Benchmark
 from sebs.cache import Cache
 from sebs.config import SeBSConfig
-from sebs.utils import LoggingHandlers, execute
+from sebs.packaging import create_archive
+from sebs.utils import LoggingHandlers
 from ..faas.function import Function, FunctionConfig, ExecutionResult
 from ..faas.storage import PersistentStorage
 from ..faas.system import System
@@ -177,7 +178,11 @@ class Azure(System):
         json.dump(default_host_json, open(os.path.join(directory, "host.json"), "w"), indent=2)
 
         code_size = Benchmark.directory_size(directory)
-        execute("zip -qu -r9 {}.zip * .".format(benchmark), shell=True, cwd=directory)
+        create_archive(
+            directory,
+            os.path.join(directory, f"{benchmark}.zip"),
+            **self.system_config.packaging(),
+        )
         return directory, code_size
 
     def publish_function(
@@ -260,6 +265,7 @@ class Azure(System):
 
         trigger = HTTPTrigger(url, self.config.resources.data_storage_account(self.cli_instance))
         trigger.logging_handlers = self.logging_handlers
+        trigger.invocation_executor = self.invocation_executor
         function.add_trigger(trigger)
 
     def update_function_configuration(self, function: Function, code_package: Benchmark):
@@ -373,6 +379,7 @@ class Azure(System):
         for trigger in function.triggers_all():
             azure_trigger = cast(AzureTrigger, trigger)
             azure_trigger.logging_handlers = self.logging_handlers
+            azure_trigger.invocation_executor = self.invocation_executor
             azure_trigger.data_storage_account = data_storage_account
 
     """
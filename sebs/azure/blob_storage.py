@@ -1,13 +1,16 @@
 import uuid
-from typing import List
+from typing import Iterator, List
 
 from azure.storage.blob import BlobServiceClient
 
 from sebs.cache import Cache
-from ..faas.storage import PersistentStorage
+from ..faas.storage import ObjectInfo, PersistentStorage
 
 
 class BlobStorage(PersistentStorage):
+
+    DELETE_BATCH = 256
+
     @staticmethod
     def typename() -> str:
         return "Azure.BlobStorage"
@@ -48,23 +51,6 @@ class BlobStorage(PersistentStorage):
             for container in self.client.list_containers(name_starts_with=bucket_name)
         ]
 
-    def uploader_func(self, container_idx, file, filepath):
-        # Skip upload when using cached containers
-        if self.cached and not self.replace_existing:
-            return
-        container_name = self.input_buckets[container_idx]
-        if not self.replace_existing:
-            for f in self.input_buckets_files[container_idx]:
-                if f == file:
-                    self.logging.info(
-                        "Skipping upload of {} to {}".format(filepath, container_name)
-                    )
-                    return
-        client = self.client.get_blob_client(container_name, file)
-        with open(filepath, "rb") as file_data:
-            client.upload_blob(data=file_data, overwrite=True)
-        self.logging.info("Upload {} to {}".format(filepath, container_name))
-
     """
         Download file from bucket.
 
@@ -79,34 +65,37 @@ class BlobStorage(PersistentStorage):
         with open(filepath, "wb") as download_file:
             download_file.write(client.download_blob().readall())
 
+    def read_object(self, container_name: str, key: str) -> bytes:
+        return self.client.get_blob_client(container_name, key).download_blob().readall()
+
     def upload(self, container_name: str, filepath: str, key: str):
         self.logging.info("Upload {} to {}".format(filepath, container_name))
         client = self.client.get_blob_client(container_name, key)
+        # large blobs are uploaded in blocks, in parallel
         with open(filepath, "rb") as upload_file:
-            client.upload_blob(upload_file)  # type: ignore
+            client.upload_blob(
+                upload_file, overwrite=True, max_concurrency=self.upload_config.part_workers
+            )  # type: ignore
 
     def exists_bucket(self, container: str) -> bool:
         return self.client.get_container_client(container).exists()
 
-    """
-        Return list of files in a container.
-
-        :param container:
-        :return: list of file names. empty if container empty
-    """
-
-    def list_bucket(self, container: str):
-        objects = list(
-            map(
-                lambda x: x["name"],
-                self.client.get_container_client(container).list_blobs(),
+    def list_objects(self, container: str, prefix: str = "") -> Iterator[ObjectInfo]:
+        container_client = self.client.get_container_client(container)
+        # the iterator requests next pages of results
+        for blob in container_client.list_blobs(name_starts_with=prefix or None):
+            # the MD5 is not stored for blobs uploaded in blocks
+            content_md5 = blob["content_settings"]["content_md5"]
+            yield ObjectInfo(
+                blob["name"],
+                blob["size"],
+                blob["etag"].strip('"'),
+                bytes(content_md5).hex() if content_md5 else None,
             )
-        )
-        return objects
-
-    def clean_bucket(self, bucket: str):
-        self.logging.info("Clean output container {}".format(bucket))
-        container_client = self.client.get_container_client(bucket)
-        blobs = list(map(lambda x: x["name"], container_client.list_blobs()))
-        if len(blobs) > 0:
-            container_client.delete_blobs(*blobs)
+
+    def _delete_objects(self, container: str, keys: List[str]):
+        container_client = self.client.get_container_client(container)
+        # a batch request contains at most 256 subrequests
+        for begin in range(0, len(keys), self.DELETE_BATCH):
+            end = begin + self.DELETE_BATCH
+            container_client.delete_blobs(*keys[begin:end])
@@ -1,5 +1,5 @@
 import concurrent.futures
-from typing import Any, Dict, Optional  # noqa
+from typing import Any, Dict, List, Optional  # noqa
 
 from sebs.azure.config import AzureResources
 from sebs.faas.function import ExecutionResult, Trigger
@@ -34,10 +34,10 @@ class HTTPTrigger(AzureTrigger):
         payload["connection_string"] = self.data_storage_account.connection_string
         return self._http_invoke(payload, self.url)
 
-    def async_invoke(self, payload: dict) -> concurrent.futures.Future:
-        pool = concurrent.futures.ThreadPoolExecutor()
-        fut = pool.submit(self.sync_invoke, payload)
-        return fut
+    def burst_invoke(self, payload: dict, invocations: int) -> List[concurrent.futures.Future]:
+
+        payload["connection_string"] = self.data_storage_account.connection_string
+        return self._http_burst_invoke(payload, self.url, invocations)
 
     def serialize(self) -> dict:
         return {"type": "HTTP", "url": self.url}
@@ -1,18 +1,25 @@
+import contextlib
 import glob
 import hashlib
 import json
 import os
 import shutil
 import subprocess
+import sys
+import threading
+import time
+import uuid
 from abc import abstractmethod
-from typing import Any, Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import docker
 
 from sebs.config import SeBSConfig
 from sebs.cache import Cache
 from sebs.utils import find_benchmark, project_absolute_path, LoggingBase
-from sebs.faas.storage import PersistentStorage
+from sebs.faas.storage import PersistentStorage, UploadConfig
+from sebs.packaging import replace_member
+from sebs.slimming import compile_bytecode, slim_package
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -123,6 +130,14 @@ class Benchmark(LoggingBase):
     def code_size(self):
         return self._code_size
 
+    """
+        SHA-256 digest of the code package archive, None when the package is a directory.
+    """
+
+    @property
+    def archive_hash(self) -> Optional[str]:
+        return self._archive_hash
+
     @property
     def language(self) -> "Language":
         return self._language
@@ -137,8 +152,16 @@ class Benchmark(LoggingBase):
 
     @property  # noqa: A003
     def hash(self):
-        path = os.path.join(self.benchmark_path, self.language_name)
-        self._hash_value = Benchmark.hash_directory(path, self._deployment_name, self.language_name)
+        # benchmark sources are not modified during the lifetime of the object
+        if self._hash_value is None:
+            path = os.path.join(self.benchmark_path, self.language_name)
+            self._hash_value = Benchmark.hash_directory(
+                path,
+                self._deployment_name,
+                self.language_name,
+                "blake2b" if self._experiment_config.check_flag("fast_hash") else "md5",
+                self._cache_client,
+            )
         return self._hash_value
 
     @hash.setter  # noqa: A003
@@ -148,6 +171,49 @@ class Benchmark(LoggingBase):
         """
         self._hash_value = val
 
+    """
+        Duration in seconds of each stage of the last build:
+        copy, init.sh, dependencies, slim, package and cache.
+    """
+
+    @property
+    def build_timings(self) -> Dict[str, float]:
+        return self._build_timings
+
+    """
+        Semaphore shared by concurrent builds to limit the number
+        of Docker containers installing dependencies at the same time.
+    """
+
+    @property
+    def docker_build_slots(self) -> Optional[threading.Semaphore]:
+        return self._docker_build_slots
+
+    @docker_build_slots.setter
+    def docker_build_slots(self, slots: Optional[threading.Semaphore]):
+        self._docker_build_slots = slots
+
+    @property
+    def slimming_report(self) -> Optional[dict]:
+        return self._slimming_report
+
+    """
+        Code packages are slimmed after the installation of dependencies
+        when the flag `slim_packages` is set.
+    """
+
+    @property
+    def slimmed(self) -> bool:
+        return self._experiment_config.check_flag("slim_packages")
+
+    """
+        The user requested a rebuild and an update of the deployed code, e.g., with --update-code.
+    """
+
+    @property
+    def update_code(self) -> bool:
+        return self._experiment_config.update_code
+
     def __init__(
         self,
         benchmark: str,
@@ -179,6 +245,10 @@ class Benchmark(LoggingBase):
         self._docker_client = docker_client
         self._system_config = system_config
         self._hash_value = None
+        self._archive_hash: Optional[str] = None
+        self._build_timings: Dict[str, float] = {}
+        self._slimming_report: Optional[dict] = None
+        self._docker_build_slots = None
         self._output_dir = os.path.join(
             output_dir, f"{benchmark}_code", self._language.value, self._language_version
         )
@@ -189,13 +259,21 @@ class Benchmark(LoggingBase):
             self._is_cached_valid = False
 
     """
-        Compute MD5 hash of an entire directory.
+        Compute hash of benchmark sources and deployment wrappers from the sorted
+        paths and digests of files. MD5 is used by default, BLAKE2 is faster on large files.
+        When a cache is provided, a file is read only if its size, modification time
+        or inode changed since its digest was computed.
     """
 
     @staticmethod
-    def hash_directory(directory: str, deployment: str, language: str):
+    def hash_directory(
+        directory: str,
+        deployment: str,
+        language: str,
+        algorithm: str = "md5",
+        cache_client: Optional[Cache] = None,
+    ):
 
-        hash_sum = hashlib.md5()
         FILES = {
             "python": ["*.py", "requirements.txt*"],
             "nodejs": ["*.js", "package.json"],
@@ -203,23 +281,61 @@ class Benchmark(LoggingBase):
         WRAPPERS = {"python": "*.py", "nodejs": "*.js"}
         NON_LANG_FILES = ["*.sh", "*.json"]
         selected_files = FILES[language] + NON_LANG_FILES
+        files: List[str] = []
         for file_type in selected_files:
-            for f in glob.glob(os.path.join(directory, file_type)):
-                path = os.path.join(directory, f)
-                with open(path, "rb") as opened_file:
-                    hash_sum.update(opened_file.read())
+            files.extend(glob.glob(os.path.join(directory, file_type)))
         # wrappers
-        wrappers = project_absolute_path(
-            "benchmarks", "wrappers", deployment, language, WRAPPERS[language]
-        )
-        for f in glob.glob(wrappers):
-            path = os.path.join(directory, f)
-            with open(path, "rb") as opened_file:
-                hash_sum.update(opened_file.read())
+        for wrappers_dir in (deployment, "common"):
+            wrappers = project_absolute_path(
+                "benchmarks", "wrappers", wrappers_dir, language, WRAPPERS[language]
+            )
+            files.extend(glob.glob(wrappers))
+
+        def new_hash():
+            return hashlib.blake2b(digest_size=16) if algorithm == "blake2b" else hashlib.md5()
+
+        digests: List[Tuple[str, str]] = []
+        updated: Dict[str, Tuple[list, str]] = {}
+        for f in sorted(set(os.path.abspath(f) for f in files)):
+            stat = os.stat(f)
+            signature = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+            digest = None
+            if cache_client is not None:
+                digest = cache_client.get_file_digest(f, algorithm, signature)
+            if digest is None:
+                file_hash = new_hash()
+                with open(f, "rb") as opened_file:
+                    for chunk in iter(lambda: opened_file.read(1024 * 1024), b""):
+                        file_hash.update(chunk)
+                digest = file_hash.hexdigest()
+                updated[f] = (signature, digest)
+            # relative paths keep the hash independent of the location of the project
+            digests.append((os.path.relpath(f, project_absolute_path()), digest))
+        if cache_client is not None and updated:
+            cache_client.update_file_digests(algorithm, updated)
+
+        hash_sum = new_hash()
+        for path, digest in digests:
+            hash_sum.update(f"{path}\0{digest}\n".encode())
         return hash_sum.hexdigest()
 
     def serialize(self) -> dict:
-        return {"size": self.code_size, "hash": self.hash}
+        return {
+            "size": self.code_size,
+            "hash": self.hash,
+            "archive_hash": self.archive_hash,
+            "slimmed": self.slimmed,
+        }
+
+    @staticmethod
+    def archive_digest(path: str) -> Optional[str]:
+        if not os.path.isfile(path):
+            return None
+        digest = hashlib.sha256()
+        with open(path, "rb") as archive:
+            for chunk in iter(lambda: archive.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def query_cache(self):
         self._code_package = self._cache_client.get_code_package(
@@ -239,8 +355,13 @@ class Benchmark(LoggingBase):
             current_hash = self.hash
             old_hash = self._code_package["hash"]
             self._code_size = self._code_package["size"]
+            self._archive_hash = self._code_package.get("archive_hash")
             self._is_cached = True
-            self._is_cached_valid = current_hash == old_hash
+            # enabling or disabling slimming changes the package
+            self._is_cached_valid = (
+                current_hash == old_hash
+                and self._code_package.get("slimmed", False) == self.slimmed
+            )
         else:
             self._is_cached = False
             self._is_cached_valid = False
@@ -286,6 +407,11 @@ class Benchmark(LoggingBase):
         ]
         for file in handlers:
             shutil.copy2(file, os.path.join(output_dir))
+        # modules shared by wrappers of all deployments
+        common_dir = project_absolute_path("benchmarks", "wrappers", "common", self.language_name)
+        if os.path.exists(common_dir):
+            for file in sorted(os.listdir(common_dir)):
+                shutil.copy2(os.path.join(common_dir, file), output_dir)
 
     def add_deployment_package_python(self, output_dir):
         # append to the end of requirements file
@@ -329,6 +455,75 @@ class Benchmark(LoggingBase):
         sizes = [f.stat().st_size for f in root.glob("**/*") if f.is_file()]
         return sum(sizes)
 
+    """
+        Location of the cached dependency layer, i.e., files produced by the Docker
+        installation of dependencies. The layer is addressed by the hash of package
+        files, the benchmark's package.sh script, the deployment, language version
+        and the build image. Changes in the source code of the benchmark do not
+        invalidate the layer.
+
+        :return: path of the layer in the cache, None if there are no dependencies
+            or caching was disabled with the flag `no_dependency_cache`
+    """
+
+    def dependencies_layer(self, output_dir: str, image: str) -> Optional[str]:
+
+        if self._experiment_config.check_flag("no_dependency_cache"):
+            return None
+        PACKAGE_FILES = {"python": ["requirements.txt*"], "nodejs": ["package.json"]}
+        files: List[str] = []
+        for file_type in PACKAGE_FILES[self.language_name]:
+            files.extend(sorted(glob.glob(os.path.join(output_dir, file_type))))
+        if len(files) == 0:
+            return None
+        files.append(os.path.join(self._benchmark_path, self.language_name, "package.sh"))
+
+        hash_sum = hashlib.sha256()
+        hash_sum.update(
+            "\n".join(
+                [self._deployment_name, self.language_name, self.language_version, image]
+            ).encode()
+        )
+        for path in files:
+            if os.path.exists(path):
+                hash_sum.update(os.path.basename(path).encode())
+                with open(path, "rb") as opened_file:
+                    hash_sum.update(opened_file.read())
+        return os.path.join(self._cache_client.cache_dir, "dependencies", hash_sum.hexdigest())
+
+    def restore_dependencies(self, output_dir: str, layer: str):
+        for entry in os.listdir(layer):
+            src = os.path.join(layer, entry)
+            if os.path.isdir(src):
+                shutil.copytree(src, os.path.join(output_dir, entry), symlinks=True)
+            else:
+                shutil.copy2(src, output_dir)
+
+    """
+        Store entries created by the installation of dependencies in the cache.
+        The layer is written to a temporary directory and renamed,
+        such that concurrent builds never observe a partial layer.
+
+        :param existing: top-level entries of output_dir before the installation
+    """
+
+    def store_dependencies(self, output_dir: str, layer: str, existing: Set[str]):
+        tmp_layer = f"{layer}.tmp-{uuid.uuid4().hex[0:8]}"
+        os.makedirs(tmp_layer)
+        for entry in os.listdir(output_dir):
+            if entry in existing:
+                continue
+            src = os.path.join(output_dir, entry)
+            if os.path.isdir(src):
+                shutil.copytree(src, os.path.join(tmp_layer, entry), symlinks=True)
+            else:
+                shutil.copy2(src, tmp_layer)
+        try:
+            os.rename(tmp_layer, layer)
+        except OSError:
+            # another build stored the same layer in the meantime
+            shutil.rmtree(tmp_layer)
+
     def install_dependencies(self, output_dir):
         # do we have docker image for this run and language?
         if "build" not in self._system_config.docker_image_types(
@@ -347,6 +542,14 @@ class Benchmark(LoggingBase):
                 language=self.language_name,
                 runtime=self.language_version,
             )
+
+            layer = self.dependencies_layer(output_dir, f"{repo_name}:{image_name}")
+            if layer is not None and os.path.exists(layer):
+                self.logging.info(f"Using cached dependencies from {layer}")
+                self.restore_dependencies(output_dir, layer)
+                return
+            existing = set(os.listdir(output_dir))
+
             try:
                 self._docker_client.images.get(repo_name + ":" + image_name)
             except docker.errors.ImageNotFound:
@@ -361,6 +564,7 @@ class Benchmark(LoggingBase):
                     raise RuntimeError("Docker pull of image {} failed!".format(image_name))
 
             # Create set of mounted volumes unless Docker volumes are disabled
+            volumes = {}
             if not self._experiment_config.check_flag("docker_copy_build_files"):
                 volumes = {os.path.abspath(output_dir): {"bind": "/mnt/function", "mode": "rw"}}
                 package_script = os.path.abspath(
@@ -382,88 +586,144 @@ class Benchmark(LoggingBase):
                         "Docker build of benchmark dependencies in container "
                         "of image {repo}:{image}".format(repo=repo_name, image=image_name)
                     )
-                    uid = os.getuid()
-                    # Standard, simplest build
-                    if not self._experiment_config.check_flag("docker_copy_build_files"):
-                        self.logging.info(
-                            "Docker mount of benchmark code from path {path}".format(
-                                path=os.path.abspath(output_dir)
-                            )
-                        )
-                        stdout = self._docker_client.containers.run(
-                            "{}:{}".format(repo_name, image_name),
-                            volumes=volumes,
-                            environment={
-                                "CONTAINER_UID": str(os.getuid()),
-                                "CONTAINER_GID": str(os.getgid()),
-                                "CONTAINER_USER": "docker_user",
-                                "APP": self.benchmark,
-                                "PLATFORM": self._deployment_name.upper(),
-                            },
-                            remove=True,
-                            stdout=True,
-                            stderr=True,
-                        )
-                    # Hack to enable builds on platforms where Docker mounted volumes
-                    # are not supported. Example: CircleCI docker environment
-                    else:
-                        container = self._docker_client.containers.run(
-                            "{}:{}".format(repo_name, image_name),
-                            environment={"APP": self.benchmark},
-                            # user="1000:1000",
-                            user=uid,
-                            # remove=True,
-                            detach=True,
-                            tty=True,
-                            command="/bin/bash",
+                    # limit the number of concurrent build containers
+                    slots = self._docker_build_slots
+                    with slots if slots is not None else contextlib.nullcontext():
+                        stdout = self._run_build_container(
+                            f"{repo_name}:{image_name}", output_dir, volumes
                         )
-                        # copy application files
-                        import tarfile
-
-                        self.logging.info(
-                            "Send benchmark code from path {path} to "
-                            "Docker instance".format(path=os.path.abspath(output_dir))
-                        )
-                        tar_archive = os.path.join(output_dir, os.path.pardir, "function.tar")
-                        with tarfile.open(tar_archive, "w") as tar:
-                            for f in os.listdir(output_dir):
-                                tar.add(os.path.join(output_dir, f), arcname=f)
-                        with open(tar_archive, "rb") as data:
-                            container.put_archive("/mnt/function", data.read())
-                        # do the build step
-                        exit_code, stdout = container.exec_run(
-                            cmd="/bin/bash /sebs/installer.sh",
-                            user="docker_user",
-                            stdout=True,
-                            stderr=True,
-                        )
-                        # copy updated code with package
-                        data, stat = container.get_archive("/mnt/function")
-                        with open(tar_archive, "wb") as f:
-                            for chunk in data:
-                                f.write(chunk)
-                        with tarfile.open(tar_archive, "r") as tar:
-                            tar.extractall(output_dir)
-                            # docker packs the entire directory with basename function
-                            for f in os.listdir(os.path.join(output_dir, "function")):
-                                shutil.move(
-                                    os.path.join(output_dir, "function", f),
-                                    os.path.join(output_dir, f),
-                                )
-                            shutil.rmtree(os.path.join(output_dir, "function"))
-                        container.stop()
 
                     # Pass to output information on optimizing builds.
                     # Useful for AWS where packages have to obey size limits.
                     for line in stdout.decode("utf-8").split("\n"):
                         if "size" in line:
                             self.logging.info("Docker build: {}".format(line))
+
+                    if layer is not None:
+                        self.store_dependencies(output_dir, layer, existing)
+                        self.logging.info(f"Stored dependencies in cache at {layer}")
                 except docker.errors.ContainerError as e:
                     self.logging.error("Package build failed!")
                     self.logging.error(e)
                     self.logging.error(f"Docker mount volumes: {volumes}")
                     raise e
 
+    """
+        Run the build container installing dependencies in the output directory.
+
+        :return: output of the container
+    """
+
+    def _run_build_container(self, image: str, output_dir: str, volumes: dict) -> bytes:
+        uid = os.getuid()
+        # Standard, simplest build
+        if not self._experiment_config.check_flag("docker_copy_build_files"):
+            self.logging.info(
+                "Docker mount of benchmark code from path {path}".format(
+                    path=os.path.abspath(output_dir)
+                )
+            )
+            return self._docker_client.containers.run(
+                image,
+                volumes=volumes,
+                environment={
+                    "CONTAINER_UID": str(os.getuid()),
+                    "CONTAINER_GID": str(os.getgid()),
+                    "CONTAINER_USER": "docker_user",
+                    "APP": self.benchmark,
+                    "PLATFORM": self._deployment_name.upper(),
+                },
+                remove=True,
+                stdout=True,
+                stderr=True,
+            )
+        # Hack to enable builds on platforms where Docker mounted volumes
+        # are not supported. Example: CircleCI docker environment
+        else:
+            container = self._docker_client.containers.run(
+                image,
+                environment={"APP": self.benchmark},
+                # user="1000:1000",
+                user=uid,
+                # remove=True,
+                detach=True,
+                tty=True,
+                command="/bin/bash",
+            )
+            # copy application files
+            import tarfile
+
+            self.logging.info(
+                "Send benchmark code from path {path} to "
+                "Docker instance".format(path=os.path.abspath(output_dir))
+            )
+            # concurrent builds of other versions share the parent directory
+            tar_archive = os.path.join(
+                output_dir,
+                os.path.pardir,
+                f"function-{self.language_version}.tar",
+            )
+            with tarfile.open(tar_archive, "w") as tar:
+                for name in os.listdir(output_dir):
+                    tar.add(os.path.join(output_dir, name), arcname=name)
+            with open(tar_archive, "rb") as data:
+                container.put_archive("/mnt/function", data.read())
+            # do the build step
+            exit_code, stdout = container.exec_run(
+                cmd="/bin/bash /sebs/installer.sh",
+                user="docker_user",
+                stdout=True,
+                stderr=True,
+            )
+            # copy updated code with package
+            data, stat = container.get_archive("/mnt/function")
+            with open(tar_archive, "wb") as archive:
+                for chunk in data:
+                    archive.write(chunk)
+            with tarfile.open(tar_archive, "r") as tar:
+                tar.extractall(output_dir)
+                # docker packs the entire directory with basename function
+                for name in os.listdir(os.path.join(output_dir, "function")):
+                    shutil.move(
+                        os.path.join(output_dir, "function", name),
+                        os.path.join(output_dir, name),
+                    )
+                shutil.rmtree(os.path.join(output_dir, "function"))
+            container.stop()
+            return stdout
+
+    """
+        Remove caches, tests, documentation, package metadata and debug symbols
+        from the code package. With the flag `slim_bytecode`, Python sources
+        are byte-compiled afterwards.
+        The report is written next to the code directory as `slimming-<version>.json`.
+    """
+
+    def slim(self, output_dir: str):
+
+        report = slim_package(output_dir, self._system_config.slimming())
+        report["bytecode"] = None
+        if self.language_name == "python" and self._experiment_config.check_flag("slim_bytecode"):
+            report["bytecode"] = compile_bytecode(output_dir, self.language_version)
+            if report["bytecode"] is None:
+                self.logging.warning(
+                    f"Skipping byte-compilation: SeBS runs on Python {sys.version_info.major}."
+                    f"{sys.version_info.minor}, while the function uses {self.language_version}."
+                )
+        report_path = os.path.join(
+            output_dir, os.path.pardir, f"slimming-{self.language_version}.json"
+        )
+        with open(report_path, "w") as out_f:
+            json.dump(report, out_f, indent=2)
+        self._slimming_report = report
+        self.logging.info(
+            "Slimmed code package from {before:.2f} MB to {after:.2f} MB, report in {path}".format(
+                before=report["size_before"] / 1024.0 / 1024.0,
+                after=report["size_after"] / 1024.0 / 1024.0,
+                path=os.path.abspath(report_path),
+            )
+        )
+
     def recalculate_code_size(self):
         self._code_size = Benchmark.directory_size(self._output_dir)
         return self._code_size
@@ -493,11 +753,30 @@ class Benchmark(LoggingBase):
             shutil.rmtree(self._output_dir)
         os.makedirs(self._output_dir)
 
+        self._build_timings = {}
+        begin = time.perf_counter()
         self.copy_code(self._output_dir)
+        self._build_timings["copy"] = time.perf_counter() - begin
+
+        begin = time.perf_counter()
         self.add_benchmark_data(self._output_dir)
+        self._build_timings["init.sh"] = time.perf_counter() - begin
+
+        begin = time.perf_counter()
         self.add_deployment_files(self._output_dir)
         self.add_deployment_package(self._output_dir)
+        self._build_timings["copy"] += time.perf_counter() - begin
+
+        begin = time.perf_counter()
         self.install_dependencies(self._output_dir)
+        self._build_timings["dependencies"] = time.perf_counter() - begin
+
+        if self.slimmed:
+            begin = time.perf_counter()
+            self.slim(self._output_dir)
+            self._build_timings["slim"] = time.perf_counter() - begin
+
+        begin = time.perf_counter()
         self._code_location, self._code_size = deployment_build_step(
             os.path.abspath(self._output_dir),
             self.language_name,
@@ -505,6 +784,8 @@ class Benchmark(LoggingBase):
             self.benchmark,
             self.is_cached,
         )
+        self._archive_hash = Benchmark.archive_digest(self._code_location)
+        self._build_timings["package"] = time.perf_counter() - begin
         self.logging.info(
             (
                 "Created code package (source hash: {hash}), for run on {deployment}"
@@ -518,11 +799,13 @@ class Benchmark(LoggingBase):
         )
 
         # package already exists
+        begin = time.perf_counter()
         if self.is_cached:
             self._cache_client.update_code_package(self._deployment_name, self.language_name, self)
         else:
             self._cache_client.add_code_package(self._deployment_name, self.language_name, self)
         self.query_cache()
+        self._build_timings["cache"] = time.perf_counter() - begin
 
         return True, self._code_location
 
@@ -541,14 +824,19 @@ class Benchmark(LoggingBase):
         mod = load_benchmark_input(self._benchmark_path)
         buckets = mod.buckets_count()
         storage.allocate_buckets(self.benchmark, buckets)
+        storage.upload_config = UploadConfig.deserialize(self._system_config.storage_upload())
         # Get JSON and upload data as required by benchmark
-        input_config = mod.generate_input(
-            benchmark_data_path,
-            size,
-            storage.input,
-            storage.output,
-            storage.uploader_func,
-        )
+        with storage.upload_queue(self.benchmark, size) as upload_func:
+            input_config: Dict[str, Any] = mod.generate_input(
+                benchmark_data_path,
+                size,
+                storage.input,
+                storage.output,
+                upload_func,
+            )
+        # wrappers record import times during cold starts
+        if self._experiment_config.check_flag("profile_imports"):
+            input_config["profile-imports"] = True
         return input_config
 
     """
@@ -560,6 +848,7 @@ class Benchmark(LoggingBase):
 
         if self.code_package_is_archive():
             self._update_zip(self.code_location, filename, data)
+            self._archive_hash = Benchmark.archive_digest(self.code_location)
             new_size = self.code_package_recompute_size() / 1024.0 / 1024.0
             self.logging.info(f"Modified zip package {self.code_location}, new size {new_size} MB")
         else:
@@ -581,31 +870,12 @@ class Benchmark(LoggingBase):
         self._code_size = bytes_size
         return bytes_size
 
-    #  https://stackoverflow.com/questions/25738523/how-to-update-one-file-inside-zip-file-using-python
-    @staticmethod
-    def _update_zip(zipname: str, filename: str, data: bytes):
-        import zipfile
-        import tempfile
-
-        # generate a temp file
-        tmpfd, tmpname = tempfile.mkstemp(dir=os.path.dirname(zipname))
-        os.close(tmpfd)
-
-        # create a temp copy of the archive without filename
-        with zipfile.ZipFile(zipname, "r") as zin:
-            with zipfile.ZipFile(tmpname, "w") as zout:
-                zout.comment = zin.comment  # preserve the comment
-                for item in zin.infolist():
-                    if item.filename != filename:
-                        zout.writestr(item, zin.read(item.filename))
-
-        # replace with the temp archive
-        os.remove(zipname)
-        os.rename(tmpname, zipname)
-
-        # now add filename with its new data
-        with zipfile.ZipFile(zipname, mode="a", compression=zipfile.ZIP_DEFLATED) as zf:
-            zf.writestr(filename, data)
+    """
+        Replace a member of the archive, without recompressing other members.
+    """
+
+    def _update_zip(self, zipname: str, filename: str, data: bytes):
+        replace_member(zipname, filename, data, **self._system_config.packaging())
 
 
 """
@@ -0,0 +1,173 @@
+import concurrent.futures
+import copy
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from sebs.faas.system import System as FaaSSystem
+from sebs.regression import benchmarks_nodejs, benchmarks_python
+
+if TYPE_CHECKING:
+    from sebs import SeBS
+
+"""
+    Build code packages of many benchmarks concurrently.
+
+    Each (benchmark, deployment, language, version) tuple is built by a separate
+    worker thread. Deployment clients are created once per deployment and are not
+    initialized, since building a code package does not need cloud resources.
+    Docker containers installing dependencies are limited by a shared semaphore.
+"""
+
+STAGES = ["copy", "init.sh", "dependencies", "slim", "package", "cache"]
+
+
+def default_benchmarks(language: str) -> List[str]:
+    return benchmarks_python if language == "python" else benchmarks_nodejs
+
+
+def build_package(
+    sebs_client: "SeBS",
+    deployment_client: FaaSSystem,
+    experiment_config: dict,
+    benchmark_name: str,
+    language: str,
+    version: str,
+    docker_slots: threading.Semaphore,
+    logging_filename: Optional[str],
+) -> dict:
+
+    result: dict = {
+        "benchmark": benchmark_name,
+        "deployment": deployment_client.name(),
+        "language": language,
+        "version": version,
+    }
+    supported = sebs_client.config.supported_language_versions(deployment_client.name(), language)
+    if version not in supported:
+        result["status"] = "skipped"
+        result["reason"] = f"{language}:{version} is not supported on {deployment_client.name()}"
+        return result
+
+    config = copy.deepcopy(experiment_config)
+    config["runtime"] = {"language": language, "version": version}
+    begin = time.perf_counter()
+    try:
+        # code directories are not specific to a deployment
+        benchmark = sebs_client.get_benchmark(
+            benchmark_name,
+            deployment_client,
+            sebs_client.get_experiment_config(config),
+            logging_filename=logging_filename,
+            output_dir=os.path.join(sebs_client.output_dir, deployment_client.name()),
+        )
+        benchmark.docker_build_slots = docker_slots
+        rebuilt, location = benchmark.build(deployment_client.package_code)
+        result["status"] = "built" if rebuilt else "cached"
+        result["location"] = location
+        result["timings"] = benchmark.build_timings
+        if benchmark.slimming_report is not None:
+            result["slimming"] = benchmark.slimming_report
+    except Exception as e:
+        result["status"] = "failed"
+        result["reason"] = str(e)
+    result["total"] = time.perf_counter() - begin
+    return result
+
+
+"""
+    :param deployments: names of deployments
+    :param benchmarks: benchmark names, None selects all benchmarks of the regression suite
+    :param runtimes: pairs of language and language version
+    :param workers: number of concurrent builds
+    :param docker_builds: number of concurrent Docker containers installing dependencies
+    :return: build results with per-stage timings
+"""
+
+
+def build_all(
+    sebs_client: "SeBS",
+    experiment_config: dict,
+    deployment_config: dict,
+    deployments: List[str],
+    benchmarks: Optional[List[str]],
+    runtimes: List[Tuple[str, str]],
+    workers: int,
+    docker_builds: int,
+    logging_filename: Optional[str] = None,
+) -> List[dict]:
+
+    deployment_clients: Dict[str, FaaSSystem] = {}
+    for name in deployments:
+        deployment_clients[name] = sebs_client.get_deployment(
+            {**deployment_config, "name": name}, logging_filename=logging_filename
+        )
+
+    docker_slots = threading.BoundedSemaphore(docker_builds)
+    futures = []
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="sebs-build"
+    ) as pool:
+        for name, deployment_client in deployment_clients.items():
+            for language, version in runtimes:
+                for benchmark_name in benchmarks if benchmarks else default_benchmarks(language):
+                    futures.append(
+                        pool.submit(
+                            build_package,
+                            sebs_client,
+                            deployment_client,
+                            experiment_config,
+                            benchmark_name,
+                            language,
+                            version,
+                            docker_slots,
+                            logging_filename,
+                        )
+                    )
+    # clients were not initialized, thus there are no cloud resources to release
+    for deployment_client in deployment_clients.values():
+        deployment_client.invocation_executor.shutdown()
+
+    return [fut.result() for fut in futures]
+
+
+"""
+    Format build results as a table with duration of each stage in seconds.
+"""
+
+
+def timing_report(results: List[dict]) -> str:
+
+    header = ["benchmark", "deployment", "runtime", "status", *STAGES, "total"]
+    rows = [header]
+    for res in results:
+        timings = res.get("timings", {})
+        rows.append(
+            [
+                res["benchmark"],
+                res["deployment"],
+                f"{res['language']}:{res['version']}",
+                res["status"],
+                *[f"{timings[stage]:.2f}" if stage in timings else "-" for stage in STAGES],
+                f"{res['total']:.2f}" if "total" in res else "-",
+            ]
+        )
+
+    # summary of time spent in each stage
+    totals = [sum(res.get("timings", {}).get(stage, 0.0) for res in results) for stage in STAGES]
+    rows.append(
+        [
+            "total",
+            "",
+            "",
+            f"{sum(1 for res in results if res['status'] == 'built')} built",
+            *[f"{val:.2f}" for val in totals],
+            f"{sum(res.get('total', 0.0) for res in results):.2f}",
+        ]
+    )
+
+    widths = [max(len(row[idx]) for row in rows) for idx in range(len(header))]
+    return "\n".join(
+        "  ".join(val.ljust(width) for val, width in zip(row, widths)).rstrip() for row in rows
+    )
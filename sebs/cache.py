@@ -1,13 +1,15 @@
 # https://stackoverflow.com/questions/3232943/update-value-of-a-nested-dictionary-of-varying-depth
 import collections.abc
 import datetime
+import fcntl
 import json
 import os
 import shutil
 import threading
-from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING  # noqa
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING  # noqa
 
-from sebs.utils import LoggingBase, serialize
+from sebs.cache_backend import CacheBackend, create_backend
+from sebs.utils import LoggingBase
 
 if TYPE_CHECKING:
     from sebs.benchmark import Benchmark
@@ -42,21 +44,27 @@ class Cache(LoggingBase):
     """
     config_updated = False
 
-    def __init__(self, cache_dir: str):
+    def __init__(self, cache_dir: str, backend: Optional[str] = None):
         super().__init__()
         self.cache_dir = os.path.abspath(cache_dir)
         self.ignore_functions: bool = False
         self.ignore_storage: bool = False
         self._lock = threading.RLock()
+        self._hash_index: Optional[Dict[str, dict]] = None
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir, exist_ok=True)
         else:
             self.load_config()
+        self._backend = create_backend(self.cache_dir, backend)
 
     @staticmethod
     def typename() -> str:
         return "Benchmark"
 
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend
+
     def load_config(self):
         with self._lock:
             for cloud in ["azure", "aws", "gcp", "openwhisk"]:
@@ -85,6 +93,7 @@ class Cache(LoggingBase):
         self._lock.release()
 
     def shutdown(self):
+        self._backend.close()
         if self.config_updated:
             for cloud in ["azure", "aws", "gcp", "openwhisk"]:
                 if cloud in self.cached_config:
@@ -93,6 +102,98 @@ class Cache(LoggingBase):
                     with open(cloud_config_file, "w") as out:
                         json.dump(self.cached_config[cloud], out, indent=2)
 
+    """
+        Index of file digests stored in `hash_index.json`.
+        Each entry records the signature of a hashed file: size, modification
+        time in nanoseconds and inode. The digest is reused only when the file
+        has not been modified since.
+
+        :param path: absolute path of the file
+        :param algorithm: hash algorithm
+        :param signature: file signature
+        :return: cached digest or None
+    """
+
+    def get_file_digest(self, path: str, algorithm: str, signature: list) -> Optional[str]:
+        with self._lock:
+            entry = self._load_hash_index().get(f"{algorithm}:{path}")
+            if entry is not None and entry.get("signature") == signature:
+                return entry["digest"]
+            return None
+
+    """
+        Entries are merged with the index stored on disk while holding an exclusive
+        `flock` on `hash_index.lock`, thus concurrent processes keep each other's digests.
+
+        :param digests: signature and digest of each file by absolute path
+    """
+
+    def update_file_digests(self, algorithm: str, digests: Dict[str, Tuple[list, str]]):
+        index_file = os.path.join(self.cache_dir, "hash_index.json")
+        with self._lock:
+            lock_file = os.open(
+                os.path.join(self.cache_dir, "hash_index.lock"), os.O_RDWR | os.O_CREAT, 0o644
+            )
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                index = self._read_hash_index(index_file)
+                for path, (signature, digest) in digests.items():
+                    index[f"{algorithm}:{path}"] = {"signature": signature, "digest": digest}
+                tmp_file = f"{index_file}.{os.getpid()}.tmp"
+                with open(tmp_file, "w") as fp:
+                    json.dump(index, fp)
+                os.replace(tmp_file, index_file)
+                self._hash_index = index
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                os.close(lock_file)
+
+    def _load_hash_index(self) -> Dict[str, dict]:
+        if self._hash_index is None:
+            self._hash_index = self._read_hash_index(
+                os.path.join(self.cache_dir, "hash_index.json")
+            )
+        return self._hash_index
+
+    def _read_hash_index(self, index_file: str) -> Dict[str, dict]:
+        if not os.path.exists(index_file):
+            return {}
+        try:
+            with open(index_file, "r") as fp:
+                return json.load(fp)
+        except json.decoder.JSONDecodeError:
+            self.logging.warning(f"Ignoring corrupted hash index {index_file}")
+            return {}
+
+    """
+        Digests of input files of a benchmark with the given input size, stored
+        next to the cached configuration in `<benchmark>/input-<size>.json`.
+
+        :return: digests by absolute path of files
+    """
+
+    def get_input_digests(self, benchmark: str, size: str) -> Dict[str, dict]:
+        digests_file = os.path.join(self.cache_dir, benchmark, f"input-{size}.json")
+        with self._lock:
+            if not os.path.exists(digests_file):
+                return {}
+            try:
+                with open(digests_file, "r") as fp:
+                    return json.load(fp)
+            except json.decoder.JSONDecodeError:
+                self.logging.warning(f"Ignoring corrupted input digests {digests_file}")
+                return {}
+
+    def update_input_digests(self, benchmark: str, size: str, digests: Dict[str, dict]):
+        benchmark_dir = os.path.join(self.cache_dir, benchmark)
+        digests_file = os.path.join(benchmark_dir, f"input-{size}.json")
+        with self._lock:
+            os.makedirs(benchmark_dir, exist_ok=True)
+            tmp_file = f"{digests_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as fp:
+                json.dump(digests, fp, indent=2)
+            os.replace(tmp_file, digests_file)
+
     """
         Acccess cached config of a benchmark.
 
@@ -104,11 +205,7 @@ class Cache(LoggingBase):
     """
 
     def get_benchmark_config(self, deployment: str, benchmark: str):
-        benchmark_dir = os.path.join(self.cache_dir, benchmark)
-        if os.path.exists(benchmark_dir):
-            with open(os.path.join(benchmark_dir, "config.json"), "r") as fp:
-                cfg = json.load(fp)
-                return cfg[deployment] if deployment in cfg else None
+        return self._backend.get_benchmark(deployment, benchmark)
 
     """
         Acccess cached version of benchmark code.
@@ -123,20 +220,14 @@ class Cache(LoggingBase):
     def get_code_package(
         self, deployment: str, benchmark: str, language: str, language_version: str
     ) -> Optional[Dict[str, Any]]:
-        cfg = self.get_benchmark_config(deployment, benchmark)
-        if cfg and language in cfg and language_version in cfg[language]["code_package"]:
-            return cfg[language]["code_package"][language_version]
-        else:
-            return None
+        return self._backend.get_code_package(deployment, benchmark, language, language_version)
 
     def get_functions(
         self, deployment: str, benchmark: str, language: str
     ) -> Optional[Dict[str, Any]]:
-        cfg = self.get_benchmark_config(deployment, benchmark)
-        if cfg and language in cfg and not self.ignore_functions:
-            return cfg[language]["functions"]
-        else:
+        if self.ignore_functions:
             return None
+        return self._backend.get_functions(deployment, benchmark, language)
 
     """
         Acccess cached storage config of a benchmark.
@@ -148,22 +239,18 @@ class Cache(LoggingBase):
     """
 
     def get_storage_config(self, deployment: str, benchmark: str):
-        cfg = self.get_benchmark_config(deployment, benchmark)
-        return cfg["storage"] if cfg and "storage" in cfg and not self.ignore_storage else None
+        if self.ignore_storage:
+            return None
+        return self._backend.get_storage(deployment, benchmark)
 
     def update_storage(self, deployment: str, benchmark: str, config: dict):
         if self.ignore_storage:
             return
-        benchmark_dir = os.path.join(self.cache_dir, benchmark)
-        with self._lock:
-            with open(os.path.join(benchmark_dir, "config.json"), "r") as fp:
-                cached_config = json.load(fp)
-            cached_config[deployment]["storage"] = config
-            with open(os.path.join(benchmark_dir, "config.json"), "w") as fp:
-                json.dump(cached_config, fp, indent=2)
+        with self._lock, self._backend.transaction():
+            self._backend.put_storage(deployment, benchmark, config)
 
     def add_code_package(self, deployment_name: str, language_name: str, code_package: "Benchmark"):
-        with self._lock:
+        with self._lock, self._backend.transaction():
             language = code_package.language_name
             language_version = code_package.language_version
             benchmark_dir = os.path.join(self.cache_dir, code_package.benchmark)
@@ -191,37 +278,13 @@ class Cache(LoggingBase):
                     "created": date,
                     "modified": date,
                 }
-                # config = {deployment_name: {language: language_config}}
-                config = {
-                    deployment_name: {
-                        language: {
-                            "code_package": {language_version: language_config},
-                            "functions": {},
-                        }
-                    }
-                }
-
-                # make sure to not replace other entries
-                if os.path.exists(os.path.join(benchmark_dir, "config.json")):
-                    with open(os.path.join(benchmark_dir, "config.json"), "r") as fp:
-                        cached_config = json.load(fp)
-                        if deployment_name in cached_config:
-                            # language known, platform known, extend dictionary
-                            if language in cached_config[deployment_name]:
-                                cached_config[deployment_name][language]["code_package"][
-                                    language_version
-                                ] = language_config
-                            # language unknown, platform known - add new dictionary
-                            else:
-                                cached_config[deployment_name][language] = config[deployment_name][
-                                    language
-                                ]
-                        else:
-                            # language unknown, platform unknown - add new dictionary
-                            cached_config[deployment_name] = config[deployment_name]
-                        config = cached_config
-                with open(os.path.join(benchmark_dir, "config.json"), "w") as fp:
-                    json.dump(config, fp, indent=2)
+                self._backend.put_code_package(
+                    deployment_name,
+                    code_package.benchmark,
+                    language,
+                    language_version,
+                    language_config,
+                )
             else:
                 # TODO: update
                 raise RuntimeError(
@@ -233,7 +296,7 @@ class Cache(LoggingBase):
     def update_code_package(
         self, deployment_name: str, language_name: str, code_package: "Benchmark"
     ):
-        with self._lock:
+        with self._lock, self._backend.transaction():
             language = code_package.language_name
             language_version = code_package.language_version
             benchmark_dir = os.path.join(self.cache_dir, code_package.benchmark)
@@ -255,17 +318,23 @@ class Cache(LoggingBase):
                     if code_package.code_location != cached_location:
                         shutil.copy2(code_package.code_location, cached_dir)
 
-                with open(os.path.join(benchmark_dir, "config.json"), "r") as fp:
-                    config = json.load(fp)
-                    date = str(datetime.datetime.now())
-                    config[deployment_name][language]["code_package"][language_version]["date"][
-                        "modified"
-                    ] = date
-                    config[deployment_name][language]["code_package"][language_version][
-                        "hash"
-                    ] = code_package.hash
-                with open(os.path.join(benchmark_dir, "config.json"), "w") as fp:
-                    json.dump(config, fp, indent=2)
+                config = self._backend.get_code_package(
+                    deployment_name, code_package.benchmark, language, language_version
+                )
+                if config is None:
+                    raise RuntimeError(
+                        "Cached code package {} for {} is not registered in the cache!".format(
+                            code_package.benchmark, deployment_name
+                        )
+                    )
+                # keep the location and creation date of the cached package
+                for key, value in code_package.serialize().items():
+                    if key not in ("location", "date"):
+                        config[key] = value
+                config["date"]["modified"] = str(datetime.datetime.now())
+                self._backend.put_code_package(
+                    deployment_name, code_package.benchmark, language, language_version, config
+                )
             else:
                 self.add_code_package(deployment_name, language_name, code_package)
 
@@ -290,52 +359,21 @@ class Cache(LoggingBase):
         if self.ignore_functions:
             return
         with self._lock:
-            benchmark_dir = os.path.join(self.cache_dir, code_package.benchmark)
-            language = code_package.language_name
-            cache_config = os.path.join(benchmark_dir, "config.json")
-
-            if os.path.exists(cache_config):
-                functions_config: Dict[str, Any] = {function.name: {**function.serialize()}}
-
-                with open(cache_config, "r") as fp:
-                    cached_config = json.load(fp)
-                    if "functions" not in cached_config[deployment_name][language]:
-                        cached_config[deployment_name][language]["functions"] = functions_config
-                    else:
-                        cached_config[deployment_name][language]["functions"].update(
-                            functions_config
-                        )
-                    config = cached_config
-                with open(cache_config, "w") as fp:
-                    fp.write(serialize(config))
-            else:
-                raise RuntimeError(
-                    "Can't cache function {} for a non-existing code package!".format(function.name)
-                )
+            self._backend.put_function(
+                deployment_name,
+                code_package.benchmark,
+                code_package.language_name,
+                function.name,
+                function.serialize(),
+            )
 
     def update_function(self, function: "Function"):
         if self.ignore_functions:
             return
         with self._lock:
-            benchmark_dir = os.path.join(self.cache_dir, function.benchmark)
-            cache_config = os.path.join(benchmark_dir, "config.json")
-
-            if os.path.exists(cache_config):
-
-                with open(cache_config, "r") as fp:
-                    cached_config = json.load(fp)
-                    for deployment, cfg in cached_config.items():
-                        for language, cfg2 in cfg.items():
-                            if "functions" not in cfg2:
-                                continue
-                            for name, func in cfg2["functions"].items():
-                                if name == function.name:
-                                    cached_config[deployment][language]["functions"][
-                                        name
-                                    ] = function.serialize()
-                with open(cache_config, "w") as fp:
-                    fp.write(serialize(cached_config))
-            else:
+            if not self._backend.update_function(
+                function.benchmark, function.name, function.serialize()
+            ):
                 raise RuntimeError(
                     "Can't cache function {} for a non-existing code package!".format(function.name)
                 )
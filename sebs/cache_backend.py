@@ -0,0 +1,628 @@
+import contextlib
+import copy
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sebs.utils import serialize
+
+"""
+    Storage of cached code packages, functions and storage buckets.
+
+    Entries are identified by deployment, benchmark, language, language version
+    and function name. All modifications happen inside `transaction`, which
+    excludes concurrent writers in the same process and in other processes
+    sharing the cache directory.
+"""
+
+
+class CacheBackend(ABC):
+    def __init__(self, cache_dir: str):
+        self._cache_dir = cache_dir
+
+    @staticmethod
+    @abstractmethod
+    def name() -> str:
+        pass
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir
+
+    """
+        :return: configuration of all languages and storage of a benchmark on a deployment,
+            in the layout of the JSON cache
+    """
+
+    @abstractmethod
+    def get_benchmark(self, deployment: str, benchmark: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def get_code_package(
+        self, deployment: str, benchmark: str, language: str, language_version: str
+    ) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def get_functions(self, deployment: str, benchmark: str, language: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def get_storage(self, deployment: str, benchmark: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def put_code_package(
+        self, deployment: str, benchmark: str, language: str, language_version: str, config: dict
+    ):
+        pass
+
+    @abstractmethod
+    def put_function(self, deployment: str, benchmark: str, language: str, name: str, config: dict):
+        pass
+
+    """
+        Replace configuration of an existing function on all deployments and languages.
+
+        :return: False when no function with this name exists
+    """
+
+    @abstractmethod
+    def update_function(self, benchmark: str, name: str, config: dict) -> bool:
+        pass
+
+    @abstractmethod
+    def put_storage(self, deployment: str, benchmark: str, config: dict):
+        pass
+
+    @abstractmethod
+    def benchmarks(self) -> List[str]:
+        pass
+
+    """
+        Entire cached configuration of a benchmark, in the layout of the JSON cache.
+    """
+
+    @abstractmethod
+    def export_benchmark(self, benchmark: str) -> dict:
+        pass
+
+    def import_benchmark(self, benchmark: str, config: dict):
+        with self.transaction():
+            for deployment, deployment_cfg in config.items():
+                for language, language_cfg in deployment_cfg.items():
+                    if language == "storage":
+                        self.put_storage(deployment, benchmark, language_cfg)
+                        continue
+                    for version, code_cfg in language_cfg.get("code_package", {}).items():
+                        self.put_code_package(deployment, benchmark, language, version, code_cfg)
+                    for name, func_cfg in language_cfg.get("functions", {}).items():
+                        self.put_function(deployment, benchmark, language, name, func_cfg)
+
+    """
+        Exclusive access to the cache for the duration of the block.
+        Transactions can be nested within a thread.
+    """
+
+    @abstractmethod
+    def transaction(self) -> contextlib.AbstractContextManager:
+        pass
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _normalize(config: dict) -> dict:
+        return json.loads(serialize(config))
+
+
+"""
+    Default backend: one `config.json` file per benchmark.
+    Writers hold an exclusive `flock` on `cache_dir/.lock`, and files are
+    replaced atomically, thus readers never see partially written files.
+"""
+
+
+class JSONCacheBackend(CacheBackend):
+    def __init__(self, cache_dir: str):
+        super().__init__(cache_dir)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._lock_file: Optional[int] = None
+        # modified configurations, written when the outermost transaction finishes
+        self._pending: Dict[str, dict] = {}
+        # parsed configurations with mtime, size and inode of the file
+        self._memo: Dict[str, Tuple[Tuple[int, int, int], dict]] = {}
+
+    @staticmethod
+    def name() -> str:
+        return "json"
+
+    def _config_path(self, benchmark: str) -> str:
+        return os.path.join(self.cache_dir, benchmark, "config.json")
+
+    @staticmethod
+    def _signature(path: str) -> Tuple[int, int, int]:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    """
+        Files are parsed again only when they have been replaced,
+        e.g., by another process sharing the cache.
+    """
+
+    def _read(self, benchmark: str) -> Optional[dict]:
+        if benchmark in self._pending:
+            return self._pending[benchmark]
+        path = self._config_path(benchmark)
+        try:
+            signature = JSONCacheBackend._signature(path)
+        except FileNotFoundError:
+            self._memo.pop(benchmark, None)
+            return None
+        cached = self._memo.get(benchmark)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(path, "r") as fp:
+            config = json.load(fp)
+        self._memo[benchmark] = (signature, config)
+        return config
+
+    def _modify(self, benchmark: str) -> dict:
+        if self._depth == 0:
+            raise RuntimeError("Cache modified outside of a transaction!")
+        if benchmark not in self._pending:
+            config = self._read(benchmark)
+            # don't modify the memoized configuration
+            self._pending[benchmark] = copy.deepcopy(config) if config is not None else {}
+        return self._pending[benchmark]
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            if self._depth == 0:
+                self._lock_file = os.open(
+                    os.path.join(self.cache_dir, ".lock"), os.O_RDWR | os.O_CREAT, 0o644
+                )
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+                if self._depth == 1:
+                    self._flush()
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pending = {}
+                    assert self._lock_file is not None
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    os.close(self._lock_file)
+                    self._lock_file = None
+
+    def _flush(self):
+        for benchmark, config in self._pending.items():
+            path = self._config_path(benchmark)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as fp:
+                fp.write(serialize(config))
+            os.replace(tmp_path, path)
+            self._memo[benchmark] = (JSONCacheBackend._signature(path), config)
+
+    """
+        Getters return copies: callers can modify them without changing
+        the memoized configuration.
+    """
+
+    def _deployment(self, deployment: str, benchmark: str) -> Optional[dict]:
+        with self._lock:
+            config = self._read(benchmark)
+        return config.get(deployment) if config else None
+
+    def get_benchmark(self, deployment: str, benchmark: str) -> Optional[dict]:
+        return copy.deepcopy(self._deployment(deployment, benchmark))
+
+    def get_code_package(
+        self, deployment: str, benchmark: str, language: str, language_version: str
+    ) -> Optional[dict]:
+        cfg = self._deployment(deployment, benchmark)
+        if cfg and language in cfg:
+            return copy.deepcopy(cfg[language]["code_package"].get(language_version))
+        return None
+
+    def get_functions(self, deployment: str, benchmark: str, language: str) -> Optional[dict]:
+        cfg = self._deployment(deployment, benchmark)
+        if cfg and language in cfg:
+            return copy.deepcopy(cfg[language]["functions"])
+        return None
+
+    def get_storage(self, deployment: str, benchmark: str) -> Optional[dict]:
+        cfg = self._deployment(deployment, benchmark)
+        return copy.deepcopy(cfg.get("storage")) if cfg else None
+
+    def put_code_package(
+        self, deployment: str, benchmark: str, language: str, language_version: str, config: dict
+    ):
+        with self.transaction():
+            language_cfg = (
+                self._modify(benchmark)
+                .setdefault(deployment, {})
+                .setdefault(language, {"code_package": {}, "functions": {}})
+            )
+            language_cfg["code_package"][language_version] = self._normalize(config)
+
+    def put_function(self, deployment: str, benchmark: str, language: str, name: str, config: dict):
+        with self.transaction():
+            cfg = self._modify(benchmark)
+            if deployment not in cfg or language not in cfg[deployment]:
+                raise RuntimeError(f"Can't cache function {name} for a non-existing code package!")
+            cfg[deployment][language].setdefault("functions", {})[name] = self._normalize(config)
+
+    def update_function(self, benchmark: str, name: str, config: dict) -> bool:
+        with self.transaction():
+            if self._read(benchmark) is None:
+                return False
+            updated = False
+            for deployment, cfg in self._modify(benchmark).items():
+                for language, cfg2 in cfg.items():
+                    if language == "storage" or "functions" not in cfg2:
+                        continue
+                    if name in cfg2["functions"]:
+                        cfg2["functions"][name] = self._normalize(config)
+                        updated = True
+            return updated
+
+    def put_storage(self, deployment: str, benchmark: str, config: dict):
+        with self.transaction():
+            self._modify(benchmark).setdefault(deployment, {})["storage"] = self._normalize(config)
+
+    def benchmarks(self) -> List[str]:
+        return sorted(
+            entry
+            for entry in os.listdir(self.cache_dir)
+            if os.path.exists(self._config_path(entry))
+        )
+
+    def export_benchmark(self, benchmark: str) -> dict:
+        with self._lock:
+            config = self._read(benchmark)
+        return copy.deepcopy(config) if config is not None else {}
+
+
+"""
+    SQLite database `cache_dir/cache.db` in WAL mode: readers are not blocked
+    by a writer, and writers are serialized by `BEGIN IMMEDIATE` transactions.
+    Each thread uses its own connection; `close` closes connections of all threads.
+"""
+
+
+class SQLiteCacheBackend(CacheBackend):
+
+    DATABASE = "cache.db"
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS code_packages (
+            deployment TEXT NOT NULL, benchmark TEXT NOT NULL, language TEXT NOT NULL,
+            language_version TEXT NOT NULL, config TEXT NOT NULL,
+            PRIMARY KEY (deployment, benchmark, language, language_version)
+        )""",
+        """CREATE TABLE IF NOT EXISTS functions (
+            deployment TEXT NOT NULL, benchmark TEXT NOT NULL, language TEXT NOT NULL,
+            name TEXT NOT NULL, config TEXT NOT NULL,
+            PRIMARY KEY (deployment, benchmark, language, name)
+        )""",
+        "CREATE INDEX IF NOT EXISTS functions_name ON functions (benchmark, name)",
+        """CREATE TABLE IF NOT EXISTS storage (
+            deployment TEXT NOT NULL, benchmark TEXT NOT NULL, config TEXT NOT NULL,
+            PRIMARY KEY (deployment, benchmark)
+        )""",
+    ]
+
+    def __init__(self, cache_dir: str, timeout: float = 60.0, database: str = DATABASE):
+        super().__init__(cache_dir)
+        self._timeout = timeout
+        self._database = database
+        self._local = threading.local()
+        self._connections_lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        # connections opened before the last `close` are not reused
+        self._generation = 0
+        with self.transaction():
+            for statement in SQLiteCacheBackend.SCHEMA:
+                self._connection().execute(statement)
+
+    @staticmethod
+    def name() -> str:
+        return "sqlite"
+
+    @staticmethod
+    def exists(cache_dir: str) -> bool:
+        return os.path.exists(os.path.join(cache_dir, SQLiteCacheBackend.DATABASE))
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "connection", None)
+        if conn is None or self._local.generation != self._generation:
+            # transactions are managed explicitly; `close` can be called from another thread
+            conn = sqlite3.connect(
+                os.path.join(self.cache_dir, self._database),
+                timeout=self._timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.connection = conn
+            self._local.depth = 0
+            self._local.memo = {}
+            self._local.data_version = None
+        return conn
+
+    """
+        Parsed results of queries are reused until the database is modified.
+        Changes committed by other connections, including other processes,
+        increase `data_version`; changes made by this connection clear the results.
+        Callers receive copies and can modify them.
+    """
+
+    def _memoized(self, key: tuple, load: Callable[[], Any]) -> Any:
+        conn = self._connection()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._local.data_version:
+            self._local.memo = {}
+            self._local.data_version = version
+        if key not in self._local.memo:
+            self._local.memo[key] = load()
+        return copy.deepcopy(self._local.memo[key])
+
+    def _execute(self, statement: str, *args) -> sqlite3.Cursor:
+        self._connection()
+        self._local.memo = {}
+        return self._local.connection.execute(statement, args)
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        conn = self._connection()
+        if self._local.depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.execute("ROLLBACK")
+                # results read within the transaction can contain rolled back changes
+                self._local.memo = {}
+            raise
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            conn.execute("COMMIT")
+
+    def _query(self, statement: str, *args) -> List[tuple]:
+        return self._connection().execute(statement, args).fetchall()
+
+    def get_benchmark(self, deployment: str, benchmark: str) -> Optional[dict]:
+        config = self.export_benchmark(benchmark)
+        return config.get(deployment)
+
+    def get_code_package(
+        self, deployment: str, benchmark: str, language: str, language_version: str
+    ) -> Optional[dict]:
+        return self._memoized(
+            ("code_package", deployment, benchmark, language, language_version),
+            lambda: self._load_code_package(deployment, benchmark, language, language_version),
+        )
+
+    def get_functions(self, deployment: str, benchmark: str, language: str) -> Optional[dict]:
+        return self._memoized(
+            ("functions", deployment, benchmark, language),
+            lambda: self._load_functions(deployment, benchmark, language),
+        )
+
+    def get_storage(self, deployment: str, benchmark: str) -> Optional[dict]:
+        return self._memoized(
+            ("storage", deployment, benchmark), lambda: self._load_storage(deployment, benchmark)
+        )
+
+    def export_benchmark(self, benchmark: str) -> dict:
+        return self._memoized(("benchmark", benchmark), lambda: self._load_benchmark(benchmark))
+
+    def _load_code_package(
+        self, deployment: str, benchmark: str, language: str, language_version: str
+    ) -> Optional[dict]:
+        rows = self._query(
+            "SELECT config FROM code_packages WHERE deployment = ? AND benchmark = ? "
+            "AND language = ? AND language_version = ?",
+            deployment,
+            benchmark,
+            language,
+            language_version,
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def _load_functions(self, deployment: str, benchmark: str, language: str) -> Optional[dict]:
+        packages = self._query(
+            "SELECT 1 FROM code_packages WHERE deployment = ? AND benchmark = ? AND language = ?",
+            deployment,
+            benchmark,
+            language,
+        )
+        if not packages:
+            return None
+        rows = self._query(
+            "SELECT name, config FROM functions WHERE deployment = ? AND benchmark = ? "
+            "AND language = ?",
+            deployment,
+            benchmark,
+            language,
+        )
+        return {name: json.loads(config) for name, config in rows}
+
+    def _load_storage(self, deployment: str, benchmark: str) -> Optional[dict]:
+        rows = self._query(
+            "SELECT config FROM storage WHERE deployment = ? AND benchmark = ?",
+            deployment,
+            benchmark,
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def put_code_package(
+        self, deployment: str, benchmark: str, language: str, language_version: str, config: dict
+    ):
+        with self.transaction():
+            self._execute(
+                "INSERT OR REPLACE INTO code_packages VALUES (?, ?, ?, ?, ?)",
+                deployment,
+                benchmark,
+                language,
+                language_version,
+                serialize(config),
+            )
+
+    def put_function(self, deployment: str, benchmark: str, language: str, name: str, config: dict):
+        with self.transaction():
+            if self.get_functions(deployment, benchmark, language) is None:
+                raise RuntimeError(f"Can't cache function {name} for a non-existing code package!")
+            self._execute(
+                "INSERT OR REPLACE INTO functions VALUES (?, ?, ?, ?, ?)",
+                deployment,
+                benchmark,
+                language,
+                name,
+                serialize(config),
+            )
+
+    def update_function(self, benchmark: str, name: str, config: dict) -> bool:
+        with self.transaction():
+            cursor = self._execute(
+                "UPDATE functions SET config = ? WHERE benchmark = ? AND name = ?",
+                serialize(config),
+                benchmark,
+                name,
+            )
+            return cursor.rowcount > 0
+
+    def put_storage(self, deployment: str, benchmark: str, config: dict):
+        with self.transaction():
+            self._execute(
+                "INSERT OR REPLACE INTO storage VALUES (?, ?, ?)",
+                deployment,
+                benchmark,
+                serialize(config),
+            )
+
+    def benchmarks(self) -> List[str]:
+        rows = self._query(
+            "SELECT benchmark FROM code_packages UNION SELECT benchmark FROM storage"
+        )
+        return sorted(row[0] for row in rows)
+
+    def _load_benchmark(self, benchmark: str) -> dict:
+        config: Dict[str, dict] = {}
+        for deployment, language, version, cfg in self._query(
+            "SELECT deployment, language, language_version, config FROM code_packages "
+            "WHERE benchmark = ?",
+            benchmark,
+        ):
+            language_cfg = config.setdefault(deployment, {}).setdefault(
+                language, {"code_package": {}, "functions": {}}
+            )
+            language_cfg["code_package"][version] = json.loads(cfg)
+        for deployment, language, name, cfg in self._query(
+            "SELECT deployment, language, name, config FROM functions WHERE benchmark = ?",
+            benchmark,
+        ):
+            config[deployment][language]["functions"][name] = json.loads(cfg)
+        for deployment, cfg in self._query(
+            "SELECT deployment, config FROM storage WHERE benchmark = ?", benchmark
+        ):
+            config.setdefault(deployment, {})["storage"] = json.loads(cfg)
+        return config
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            conn.close()
+        self._local.connection = None
+
+
+"""
+    The SQLite backend is used when the cache directory contains its database,
+    i.e., after running `sebs.py cache migrate --to sqlite`.
+"""
+
+
+def create_backend(cache_dir: str, backend: Optional[str] = None) -> CacheBackend:
+    if backend is None:
+        backend = "sqlite" if SQLiteCacheBackend.exists(cache_dir) else "json"
+    if backend == "json":
+        return JSONCacheBackend(cache_dir)
+    elif backend == "sqlite":
+        return SQLiteCacheBackend(cache_dir)
+    else:
+        raise RuntimeError(f"Unknown cache backend {backend}!")
+
+
+def _remove_database(path: str):
+    for suffix in ["", "-wal", "-shm"]:
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+"""
+    Copy all benchmark entries from the current backend to a new one.
+    Code packages stored in the cache directory are shared by both backends.
+
+    The SQLite database is created under a temporary name and moved to its place
+    only after all entries have been copied. Otherwise, a failed migration would
+    leave a database that is selected by `create_backend`.
+
+    :return: number of migrated benchmarks
+"""
+
+
+def migrate(cache_dir: str, target: str) -> int:
+    source = create_backend(cache_dir)
+    if source.name() == target:
+        raise RuntimeError(f"Cache in {cache_dir} already uses the {target} backend!")
+    database = os.path.join(cache_dir, SQLiteCacheBackend.DATABASE)
+    temporary = f"{SQLiteCacheBackend.DATABASE}.migrating"
+    destination: CacheBackend
+    if target == "sqlite":
+        _remove_database(os.path.join(cache_dir, temporary))
+        destination = SQLiteCacheBackend(cache_dir, database=temporary)
+    else:
+        destination = create_backend(cache_dir, target)
+    try:
+        benchmarks = source.benchmarks()
+        with source.transaction(), destination.transaction():
+            for benchmark in benchmarks:
+                destination.import_benchmark(benchmark, source.export_benchmark(benchmark))
+    except BaseException:
+        destination.close()
+        if target == "sqlite":
+            _remove_database(os.path.join(cache_dir, temporary))
+        raise
+    finally:
+        source.close()
+    destination.close()
+    if target == "sqlite":
+        # closing the last connection checkpoints and removes the write-ahead log
+        _remove_database(database)
+        os.replace(os.path.join(cache_dir, temporary), database)
+    else:
+        # JSON files are kept as a backup, but the database is used only when present
+        for suffix in ["", "-wal", "-shm"]:
+            if os.path.exists(database + suffix):
+                os.replace(database + suffix, f"{database}{suffix}.bak")
+    return len(benchmarks)
@@ -1,5 +1,5 @@
 import json
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from sebs.utils import project_absolute_path
 
@@ -21,6 +21,18 @@ class SeBSConfig:
     def docker_repository(self) -> str:
         return self._system_config["general"]["docker_repository"]
 
+    def invocation_executor(self) -> Dict[str, int]:
+        return self._system_config["general"].get("invocation_executor", {})
+
+    def packaging(self) -> Dict[str, Any]:
+        return self._system_config["general"].get("packaging", {})
+
+    def slimming(self) -> Dict[str, Any]:
+        return self._system_config["general"].get("slimming", {})
+
+    def storage_upload(self) -> Dict[str, int]:
+        return self._system_config["general"].get("storage_upload", {})
+
     def deployment_packages(self, deployment_name: str, language_name: str) -> Dict[str, str]:
         return self._system_config[deployment_name]["languages"][language_name]["deployment"][
             "packages"
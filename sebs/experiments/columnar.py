@@ -0,0 +1,199 @@
+import json
+import os
+from typing import cast, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from sebs.faas.function import ExecutionResult
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from sebs.experiments.result import Result
+
+"""
+    Columnar representation of invocation results: one NumPy array per field
+    of ExecutionTimes, ProviderTimes, ExecutionStats and ExecutionBilling.
+
+    Columns are named after the serialized field, prefixed with the name
+    of the sub-object, e.g., `times.client` or `billing.billed_time`.
+    Missing values are stored as NaN in floating-point columns.
+"""
+
+
+class ColumnarResult:
+
+    # column name, JSON object, JSON key, dtype, default value
+    COLUMNS: List[Tuple[str, str, str, str, object]] = [
+        ("times.client", "times", "client", "int64", 0),
+        ("times.benchmark", "times", "benchmark", "int64", 0),
+        ("times.initialization", "times", "initialization", "int64", 0),
+        ("times.http_startup", "times", "http_startup", "float64", np.nan),
+        ("times.http_first_byte_return", "times", "http_first_byte_return", "float64", np.nan),
+        ("times.http_new_connections", "times", "http_new_connections", "int64", 0),
+        ("times.imports", "times", "imports", "float64", np.nan),
+        ("times.module_load", "times", "module_load", "float64", np.nan),
+        ("times.code_load", "times", "code_load", "float64", np.nan),
+        ("times.handler", "times", "handler", "float64", np.nan),
+        ("provider_times.initialization", "provider_times", "initialization", "int64", 0),
+        ("provider_times.execution", "provider_times", "execution", "int64", 0),
+        ("stats.memory_used", "stats", "memory_used", "float64", np.nan),
+        ("stats.cold_start", "stats", "cold_start", "bool", False),
+        ("stats.failure", "stats", "failure", "bool", False),
+        ("billing.memory", "billing", "_memory", "float64", np.nan),
+        ("billing.billed_time", "billing", "_billed_time", "float64", np.nan),
+        ("billing.gb_seconds", "billing", "_gb_seconds", "int64", 0),
+    ]
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        lengths = {len(col) for col in columns.values()}
+        if len(lengths) > 1:
+            raise RuntimeError(f"Columns of a result must have the same length, got {lengths}!")
+        self._columns = columns
+
+    def __len__(self) -> int:
+        return len(self._columns["request_id"])
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._columns.keys())
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    """
+        Add a column, e.g., a configuration parameter shared by all invocations.
+    """
+
+    def add_column(self, name: str, values):
+        self._columns[name] = np.broadcast_to(values, (len(self),)).copy()
+
+    """
+        Select rows with a boolean mask, e.g., `res.select(res["stats.cold_start"])`.
+    """
+
+    def select(self, mask: np.ndarray) -> "ColumnarResult":
+        return ColumnarResult({name: col[mask] for name, col in self._columns.items()})
+
+    """
+        Build columns from serialized invocations, without creating
+        intermediate ExecutionResult objects.
+
+        :param records: tuples of function name, request id and serialized invocation
+    """
+
+    @staticmethod
+    def from_records(records: Iterable[Tuple[str, str, dict]]) -> "ColumnarResult":
+
+        functions: List[str] = []
+        request_ids: List[str] = []
+        values: List[list] = [[] for _ in ColumnarResult.COLUMNS]
+        for func, req_id, record in records:
+            functions.append(func)
+            request_ids.append(req_id)
+            for idx, (_, obj, key, _, default) in enumerate(ColumnarResult.COLUMNS):
+                val = record.get(obj, {}).get(key)
+                values[idx].append(default if val is None else val)
+
+        columns: Dict[str, np.ndarray] = {
+            "function": np.array(functions, dtype=object),
+            "request_id": np.array(request_ids, dtype=object),
+        }
+        for idx, (name, _, _, dtype, _) in enumerate(ColumnarResult.COLUMNS):
+            columns[name] = np.array(values[idx], dtype=dtype)
+        return ColumnarResult(columns)
+
+    @staticmethod
+    def from_invocations(
+        invocations: Iterable[Tuple[str, str, ExecutionResult]]
+    ) -> "ColumnarResult":
+        def record(invoc: ExecutionResult) -> dict:
+            ret: Dict[str, dict] = {}
+            for _, obj, key, _, _ in ColumnarResult.COLUMNS:
+                ret.setdefault(obj, {})[key] = getattr(getattr(invoc, obj), key, None)
+            return ret
+
+        return ColumnarResult.from_records(
+            (func, req_id, record(invoc)) for func, req_id, invoc in invocations
+        )
+
+    """
+        Invocations stored in the JSON Lines file of a streamed result are read
+        directly into columns.
+    """
+
+    @staticmethod
+    def from_result(result: "Result") -> "ColumnarResult":
+        columns = ColumnarResult.from_invocations(result.iter_invocations(from_file=False))
+        if result.invocations_path is not None:
+            stored = ColumnarResult.from_jsonl(result.invocations_path)
+            columns = cast(ColumnarResult, ColumnarResult.concatenate([columns, stored]))
+        return columns
+
+    """
+        Read invocations from a JSON Lines file written by Result.stream_invocations.
+    """
+
+    @staticmethod
+    def from_jsonl(path: str) -> "ColumnarResult":
+        def records():
+            with open(path, "r") as in_f:
+                for line in in_f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.decoder.JSONDecodeError:
+                        break
+                    yield record["function"], record["request_id"], record["invocation"]
+
+        return ColumnarResult.from_records(records())
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame(self._columns)
+
+    """
+        Store columns in a Parquet file when pyarrow is available.
+        Otherwise, columns are stored in a NumPy .npz archive.
+
+        :return: path of the created file
+    """
+
+    def save(self, path: str) -> str:
+        name, _ = os.path.splitext(path)
+        try:
+            import pyarrow  # type: ignore # noqa
+        except ImportError:
+            path = f"{name}.npz"
+            np.savez(path, **self._columns)  # type: ignore
+            return path
+
+        path = f"{name}.parquet"
+        self.to_dataframe().to_parquet(path, index=False)
+        return path
+
+    @staticmethod
+    def load(path: str) -> "ColumnarResult":
+        if path.endswith(".parquet"):
+            import pandas as pd
+
+            df = pd.read_parquet(path)
+            return ColumnarResult({name: df[name].to_numpy() for name in df.columns})
+        else:
+            with np.load(path, allow_pickle=True) as data:
+                return ColumnarResult({name: data[name] for name in data.files})
+
+    @staticmethod
+    def concatenate(results: List["ColumnarResult"]) -> Optional["ColumnarResult"]:
+        if len(results) == 0:
+            return None
+        return ColumnarResult(
+            {
+                name: np.concatenate([res.column(name) for res in results])
+                for name in results[0].names
+            }
+        )
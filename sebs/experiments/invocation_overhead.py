@@ -3,7 +3,7 @@ import os
 import random
 import time
 from datetime import datetime
-from typing import Dict, TYPE_CHECKING
+from typing import Dict, Iterator, Tuple, Union, TYPE_CHECKING
 
 from sebs.benchmark import Benchmark
 from sebs.faas.system import System as FaaSSystem
@@ -38,8 +38,8 @@ class CodePackageSize:
         self._benchmark = benchmark
 
     def before_sample(self, size: int, input_benchmark: dict):
-        arr = bytearray((random.getrandbits(8) for i in range(size)))
-        self._benchmark.code_package_modify("randomdata.bin", bytes(arr))
+        data = random.getrandbits(8 * size).to_bytes(size, "little") if size > 0 else b""
+        self._benchmark.code_package_modify("randomdata.bin", data)
         function = self._deployment_client.get_function(self._benchmark)
         self._deployment_client.update_function(function, self._benchmark)
 
@@ -160,7 +160,9 @@ class InvocationOverhead(Experiment):
                             succesful = True
 
         time.sleep(5)
-        self._storage.download_bucket(self.benchmark_input["output-bucket"], self._out_dir)
+        self._storage.download_bucket(
+            self.benchmark_input["output-bucket"], self._out_dir, prefix="results-"
+        )
 
     def process(
         self,
@@ -169,42 +171,55 @@ class InvocationOverhead(Experiment):
         directory: str,
         logging_filename: str,
     ):
-        import pandas as pd
         import glob
+        import io
+        import itertools
+        import pandas as pd
         from sebs import SeBS  # noqa
 
-        full_data: Dict[str, pd.Dataframe] = {}
-        for f in glob.glob(
-            os.path.join(directory, "invocation-overhead", self.settings["type"], "*.csv")
-        ):
+        results_dir = os.path.join(directory, "invocation-overhead", self.settings["type"])
+        # measurements of the benchmark driver are always stored locally
+        driver_results = [
+            (os.path.basename(f), f) for f in glob.glob(os.path.join(results_dir, "server-*.csv"))
+        ]
+        function_results: Iterator[Tuple[str, Union[str, io.BytesIO]]]
+        if self.settings.get("read_from_bucket", False):
+            # measurements uploaded by functions are streamed without storing them on disk
+            storage = deployment_client.get_storage()
+            storage.allocate_buckets("030.clock-synchronization", (0, 1))
+            location = f"bucket {storage.output[0]}"
+            function_results = (
+                (key, io.BytesIO(content))
+                for key, content in storage.stream_bucket(storage.output[0], prefix="results-")
+            )
+        else:
+            location = results_dir
+            function_results = (
+                (os.path.basename(f), f)
+                for f in glob.glob(os.path.join(results_dir, "results-*.csv"))
+            )
 
-            if "result.csv" in f or "result-processed.csv" in f:
-                continue
-            request_id = os.path.basename(f).split("-", 1)[1].split(".")[0]
-            data = pd.read_csv(f, sep=",").drop(["id"], axis=1)
+        full_data: Dict[str, pd.Dataframe] = {}
+        parsed = 0
+        for name, source in itertools.chain(driver_results, function_results):
+            parsed += 1
+            request_id = name.split("-", 1)[1].split(".")[0]
+            data = pd.read_csv(source, sep=",").drop(["id"], axis=1)
             if request_id in full_data:
                 full_data[request_id] = pd.concat([full_data[request_id], data], axis=1)
                 full_data[request_id]["id"] = request_id
             else:
                 full_data[request_id] = data
+        if parsed == len(driver_results):
+            raise RuntimeError(f"No measurements uploaded by functions found in {location}!")
         df = pd.concat(full_data.values()).reset_index(drop=True)
         df["rtt"] = (df["server_rcv"] - df["client_send"]) + (df["client_rcv"] - df["server_send"])
         df["clock_drift"] = (
             (df["client_send"] - df["server_rcv"]) + (df["client_rcv"] - df["server_send"])
         ) / 2
 
-        with open(
-            os.path.join(directory, "invocation-overhead", self.settings["type"], "result.csv")
-        ) as csvfile:
-            with open(
-                os.path.join(
-                    directory,
-                    "invocation-overhead",
-                    self.settings["type"],
-                    "result-processed.csv",
-                ),
-                "w",
-            ) as csvfile2:
+        with open(os.path.join(results_dir, "result.csv")) as csvfile:
+            with open(os.path.join(results_dir, "result-processed.csv"), "w") as csvfile2:
                 reader = csv.reader(csvfile, delimiter=",")
                 writer = csv.writer(csvfile2, delimiter=",")
                 writer.writerow(
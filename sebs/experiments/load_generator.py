@@ -0,0 +1,305 @@
+import csv
+import json
+import os
+import random
+import threading
+import time
+from typing import List, TYPE_CHECKING
+
+from sebs.faas.executor import InvocationExecutor
+from sebs.faas.system import System as FaaSSystem
+from sebs.faas.function import Trigger
+from sebs.experiments.experiment import Experiment
+from sebs.experiments.result import Result as ExperimentResult
+from sebs.experiments.config import Config as ExperimentConfig
+from sebs.utils import serialize
+
+# import cycle
+if TYPE_CHECKING:
+    from sebs import SeBS
+
+"""
+    Open-loop load generator.
+
+    Invocations are issued at times given by the arrival process,
+    independently of the response times of previous invocations.
+    When all client workers are busy, the invocation is dropped
+    instead of delaying the arrival process.
+"""
+
+
+class LoadGenerator(Experiment):
+
+    PERCENTILES = [50, 90, 95, 99, 99.9]
+
+    def __init__(self, config: ExperimentConfig):
+        super().__init__(config)
+
+    @staticmethod
+    def name() -> str:
+        return "load-generator"
+
+    @staticmethod
+    def typename() -> str:
+        return "Experiment.LoadGenerator"
+
+    def prepare(self, sebs_client: "SeBS", deployment_client: FaaSSystem):
+
+        settings = self.config.experiment_settings(self.name())
+        self._benchmark = sebs_client.get_benchmark(
+            settings["benchmark"], deployment_client, self.config
+        )
+        self._function = deployment_client.get_function(self._benchmark)
+        if "memory" in settings and self._function.config.memory != settings["memory"]:
+            self._function.config.memory = settings["memory"]
+            deployment_client.update_function(self._function, self._benchmark)
+            sebs_client.cache_client.update_function(self._function)
+
+        self._storage = deployment_client.get_storage(replace_existing=self.config.update_storage)
+        self._benchmark_input = self._benchmark.prepare_input(
+            storage=self._storage, size=settings["input-size"]
+        )
+
+        triggers = self._function.triggers(Trigger.TriggerType.HTTP)
+        if len(triggers) == 0:
+            self._trigger = deployment_client.create_trigger(
+                self._function, Trigger.TriggerType.HTTP
+            )
+        else:
+            self._trigger = triggers[0]
+
+        self._out_dir = os.path.join(sebs_client.output_dir, self.name())
+        if not os.path.exists(self._out_dir):
+            os.mkdir(self._out_dir)
+        self._deployment_client = deployment_client
+
+    """
+        Generate arrival times in seconds, relative to the beginning of the experiment.
+
+        constant - evenly spaced invocations at `rps` requests per second
+        poisson - exponentially distributed inter-arrival times with mean 1/`rps`
+        trace - timestamps in seconds read from the first column of the CSV file `trace`
+    """
+
+    @staticmethod
+    def arrivals(settings: dict) -> List[float]:
+
+        process = settings.get("arrivals", "constant")
+        duration = settings.get("duration")
+        if process == "constant":
+            rps = settings["rps"]
+            return [i / rps for i in range(int(rps * settings["duration"]))]
+        elif process == "poisson":
+            rps = settings["rps"]
+            duration = settings["duration"]
+            rng = random.Random(settings.get("seed"))
+            points = []
+            t = rng.expovariate(rps)
+            while t < duration:
+                points.append(t)
+                t += rng.expovariate(rps)
+            return points
+        elif process == "trace":
+            timestamps = []
+            with open(settings["trace"], "r") as trace_file:
+                for row in csv.reader(trace_file):
+                    try:
+                        timestamps.append(float(row[0]))
+                    except (IndexError, ValueError):
+                        # header and empty lines
+                        continue
+            if len(timestamps) == 0:
+                raise RuntimeError(f"No arrivals found in trace {settings['trace']}!")
+            timestamps.sort()
+            points = [t - timestamps[0] for t in timestamps]
+            if duration is not None:
+                points = [t for t in points if t < duration]
+            return points
+        else:
+            raise RuntimeError(f"Unknown arrival process {process} for load generator!")
+
+    def run(self):
+
+        settings = self.config.experiment_settings(self.name())
+        arrivals = LoadGenerator.arrivals(settings)
+        workers = settings.get("max-in-flight", 256)
+        self.logging.info(
+            f"Begin open-loop experiment with {len(arrivals)} invocations, "
+            f"{settings.get('arrivals', 'constant')} arrivals, {workers} client workers"
+        )
+
+        records: List[dict] = []
+        records_lock = threading.Lock()
+        result = ExperimentResult(self.config, self._deployment_client.config)
+        executor = InvocationExecutor(workers)
+
+        def invoke(scheduled: float, begin: float):
+            sent = time.perf_counter() - begin
+            record: dict = {"scheduled": scheduled, "sent": sent}
+            try:
+                ret = self._trigger.sync_invoke(self._benchmark_input)
+                record["status"] = "success"
+                record["request_id"] = ret.request_id
+                record["latency"] = ret.times.client
+                record["cold"] = ret.stats.cold_start
+                with records_lock:
+                    result.add_invocation(self._function, ret)
+            except Exception as e:
+                record["status"] = "failure"
+                record["error"] = str(e)
+                record["latency"] = int((time.perf_counter() - begin - sent) * 1000 * 1000)
+            with records_lock:
+                records.append(record)
+
+        result.begin()
+        begin = time.perf_counter()
+        lag = 0.0
+        for scheduled in arrivals:
+            delay = begin + scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                lag = max(lag, -delay)
+            try:
+                executor.submit(invoke, scheduled, begin, timeout=0)
+            except RuntimeError:
+                with records_lock:
+                    records.append({"scheduled": scheduled, "status": "dropped"})
+        self.logging.info(
+            f"All invocations issued, maximal lag of arrivals {lag * 1000.0:.3f} [ms], "
+            "waiting for responses."
+        )
+        executor.shutdown(wait=True, cancel_pending=False)
+        result.end()
+
+        records.sort(key=lambda rec: rec["scheduled"])
+        statistics = self.summary(records)
+        timeline = self.timeline(records)
+        with open(os.path.join(self._out_dir, "results.json"), "w") as out_f:
+            out_f.write(
+                serialize(
+                    {
+                        **json.loads(serialize(result)),
+                        "settings": settings,
+                        "statistics": statistics,
+                        "invocations": records,
+                    }
+                )
+            )
+        self.write_timeline(os.path.join(self._out_dir, "timeline.csv"), timeline)
+
+    """
+        Overall latency percentiles [ms] and counts of invocations.
+    """
+
+    def summary(self, records: List[dict]) -> dict:
+
+        import numpy as np
+
+        successful = [rec for rec in records if rec["status"] == "success"]
+        stats: dict = {
+            "invocations": len(records),
+            "success_count": len(successful),
+            "failures_count": sum(1 for rec in records if rec["status"] == "failure"),
+            "dropped_count": sum(1 for rec in records if rec["status"] == "dropped"),
+            "cold_count": sum(1 for rec in successful if rec["cold"]),
+        }
+        self.logging.info(
+            f"Invocations {stats['invocations']}, successful {stats['success_count']}, "
+            f"failed {stats['failures_count']}, dropped {stats['dropped_count']}, "
+            f"cold {stats['cold_count']}"
+        )
+        if len(successful) > 0:
+            latencies = np.array([rec["latency"] for rec in successful]) / 1000.0
+            values = np.percentile(latencies, LoadGenerator.PERCENTILES)
+            stats["latency_percentiles"] = {
+                f"p{p}": float(val) for p, val in zip(LoadGenerator.PERCENTILES, values)
+            }
+            self.logging.info(
+                "Latency "
+                + ", ".join(f"{key} {val:.3f}" for key, val in stats["latency_percentiles"].items())
+                + " [ms]"
+            )
+        return stats
+
+    """
+        Aggregate invocations into one-second intervals.
+        Invocations are assigned to the interval in which they were scheduled,
+        except for throughput, which counts invocations completed in the interval.
+    """
+
+    @staticmethod
+    def timeline(records: List[dict]) -> List[dict]:
+
+        import numpy as np
+
+        if len(records) == 0:
+            return []
+        last = max(
+            [rec["scheduled"] for rec in records]
+            + [rec["sent"] + rec["latency"] / 1000.0 / 1000.0 for rec in records if "sent" in rec]
+        )
+        intervals: List[dict] = [
+            {
+                "second": sec,
+                "issued": 0,
+                "dropped": 0,
+                "failures": 0,
+                "throughput": 0,
+                "cold": 0,
+                "latencies": [],
+            }
+            for sec in range(int(last) + 1)
+        ]
+        for rec in records:
+            interval = intervals[int(rec["scheduled"])]
+            if rec["status"] == "dropped":
+                interval["dropped"] += 1
+                continue
+            interval["issued"] += 1
+            if rec["status"] == "failure":
+                interval["failures"] += 1
+                continue
+            interval["latencies"].append(rec["latency"] / 1000.0)
+            interval["cold"] += rec["cold"]
+            completed = rec["sent"] + rec["latency"] / 1000.0 / 1000.0
+            intervals[int(completed)]["throughput"] += 1
+
+        for interval in intervals:
+            latencies = interval.pop("latencies")
+            successful = len(latencies)
+            interval["cold_rate"] = interval["cold"] / successful if successful > 0 else 0.0
+            values = (
+                np.percentile(latencies, LoadGenerator.PERCENTILES)
+                if successful > 0
+                else [float("nan")] * len(LoadGenerator.PERCENTILES)
+            )
+            for p, val in zip(LoadGenerator.PERCENTILES, values):
+                interval[f"p{p}"] = float(val)
+        return intervals
+
+    @staticmethod
+    def write_timeline(path: str, timeline: List[dict]):
+
+        columns = ["second", "issued", "throughput", "dropped", "failures", "cold", "cold_rate"]
+        columns += [f"p{p}" for p in LoadGenerator.PERCENTILES]
+        with open(path, "w") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=columns, delimiter=",")
+            writer.writeheader()
+            writer.writerows(timeline)
+
+    def process(
+        self,
+        sebs_client: "SeBS",
+        deployment_client: FaaSSystem,
+        directory: str,
+        logging_filename: str,
+        extend_time_interval: int,
+    ):
+
+        with open(os.path.join(directory, self.name(), "results.json"), "r") as in_f:
+            records = json.load(in_f)["invocations"]
+        self.summary(records)
+        self.write_timeline(
+            os.path.join(directory, self.name(), "timeline.csv"), self.timeline(records)
+        )
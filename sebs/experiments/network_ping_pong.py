@@ -59,7 +59,9 @@ class NetworkPingPong(Experiment):
 
         # give functions time to finish and upload result
         time.sleep(5)
-        self._storage.download_bucket(self.benchmark_input["output-bucket"], self._out_dir)
+        self._storage.download_bucket(
+            self.benchmark_input["output-bucket"], self._out_dir, prefix="results-"
+        )
 
     def process(self, directory: str):
 
@@ -1,14 +1,17 @@
+import contextlib
+import functools
 import json
 import os
 import time
 from enum import Enum
 from multiprocessing.pool import ThreadPool
-from typing import List, TYPE_CHECKING
+from typing import Any, Dict, List, Tuple, TYPE_CHECKING
 
 from sebs.faas.system import System as FaaSSystem
-from sebs.faas.function import Trigger
+from sebs.faas.function import ExecutionResult, Trigger
 from sebs.experiments.experiment import Experiment
 from sebs.experiments.result import Result as ExperimentResult
+from sebs.experiments.columnar import ColumnarResult
 from sebs.experiments.config import Config as ExperimentConfig
 from sebs.utils import serialize
 from sebs.statistics import basic_stats, ci_tstudents, ci_le_boudec
@@ -139,8 +142,22 @@ class PerfCost(Experiment):
         with open(os.path.join(self._out_dir, file_name), "w") as out_f:
             samples_gathered = 0
             client_times = []
-            with ThreadPool(invocations) as pool:
+            # curl-multi sends the entire batch from a single thread
+            burst_invoker = (
+                settings.get("invoker", "threads") == "curl-multi"
+                and run_type != PerfCost.RunType.SEQUENTIAL
+            )
+            if burst_invoker and self._trigger.trigger_type() != Trigger.TriggerType.HTTP:
+                raise RuntimeError(
+                    "The curl-multi invoker requires an HTTP trigger, but the experiment "
+                    f"uses a {self._trigger.trigger_type().value} trigger!"
+                )
+            with contextlib.ExitStack() as stack:
+                pool = None if burst_invoker else stack.enter_context(ThreadPool(invocations))
                 result = ExperimentResult(self.config, self._deployment_client.config)
+                result.stream_invocations(
+                    os.path.join(self._out_dir, f"{os.path.splitext(file_name)[0]}.jsonl")
+                )
                 result.begin()
                 samples_generated = 0
 
@@ -159,18 +176,22 @@ class PerfCost(Experiment):
 
                     time.sleep(5)
 
-                    results = []
-                    for i in range(0, invocations):
-                        results.append(
-                            pool.apply_async(
-                                self._trigger.sync_invoke, args=(self._benchmark_input,)
+                    results: List[Any] = []
+                    if burst_invoker:
+                        results = self._trigger.burst_invoke(self._benchmark_input, invocations)
+                    else:
+                        assert pool is not None
+                        for i in range(0, invocations):
+                            results.append(
+                                pool.apply_async(
+                                    self._trigger.sync_invoke, args=(self._benchmark_input,)
+                                )
                             )
-                        )
 
                     incorrect = []
                     for res in results:
                         try:
-                            ret = res.get()
+                            ret = res.result() if burst_invoker else res.get()
                             if first_iteration:
                                 continue
                             if run_type == PerfCost.RunType.COLD and not ret.stats.cold_start:
@@ -206,6 +227,7 @@ class PerfCost(Experiment):
                     time.sleep(5)
 
                 result.end()
+                result.close()
                 self.compute_statistics(client_times)
                 out_f.write(
                     serialize(
@@ -257,6 +279,23 @@ class PerfCost(Experiment):
             else:
                 raise RuntimeError(f"Unknown experiment type {experiment_type} for Perf-Cost!")
 
+    @staticmethod
+    def _process_invocations(
+        deployment_client: FaaSSystem,
+        experiments: ExperimentResult,
+        times: Tuple[int, int],
+        func: str,
+        invocations: Dict[str, ExecutionResult],
+    ):
+        deployment_client.download_metrics(func, *times, invocations, experiments.metrics(func))
+        # compress! remove output since it can be large but it's useless for us
+        for invoc in invocations.values():
+            # FIXME: compatibility with old results
+            if "output" in invoc.output["result"]:
+                del invoc.output["result"]["output"]
+            elif "result" in invoc.output["result"]:
+                del invoc.output["result"]["result"]
+
     def process(
         self,
         sebs_client: "SeBS",
@@ -267,104 +306,93 @@ class PerfCost(Experiment):
     ):
 
         import glob
-        import csv
-
-        with open(os.path.join(directory, "perf-cost", "result.csv"), "w") as csvfile:
-            writer = csv.writer(csvfile, delimiter=",")
-            writer.writerow(
-                [
-                    "memory",
-                    "type",
-                    "is_cold",
-                    "exec_time",
-                    "connection_time",
-                    "client_time",
-                    "provider_time",
-                    "mem_used",
-                ]
-            )
-            for f in glob.glob(os.path.join(directory, "perf-cost", "*.json")):
-                name, extension = os.path.splitext(f)
-                if "processed" in f:
-                    with open(f) as in_f:
-                        config = json.load(in_f)
-                        experiments = ExperimentResult.deserialize(
-                            config,
-                            sebs_client.cache_client,
-                            sebs_client.generate_logging_handlers(logging_filename),
-                        )
-                    fname = os.path.splitext(os.path.basename(f))[0].split("_")
-                    if len(fname) > 2:
-                        memory = int(fname[2].split("-")[0])
-                    else:
-                        memory = 0
-                    exp_type = fname[0]
+
+        results: List[ColumnarResult] = []
+        for f in glob.glob(os.path.join(directory, "perf-cost", "*.json")):
+            name, extension = os.path.splitext(f)
+            if "processed" in f:
+                with open(f) as in_f:
+                    config = json.load(in_f)
+                    experiments = ExperimentResult.deserialize(
+                        config,
+                        sebs_client.cache_client,
+                        sebs_client.generate_logging_handlers(logging_filename),
+                        os.path.dirname(f),
+                    )
+                fname = os.path.splitext(os.path.basename(f))[0].split("_")
+                if len(fname) > 2:
+                    memory = int(fname[2].split("-")[0])
                 else:
+                    memory = 0
+                exp_type = fname[0]
+            else:
 
-                    if os.path.exists(
-                        os.path.join(directory, "perf-cost", f"{name}-processed{extension}")
-                    ):
-                        self.logging.info(f"Skipping already processed {f}")
-                        continue
-                    self.logging.info(f"Processing data in {f}")
-                    fname = os.path.splitext(os.path.basename(f))[0].split("_")
-                    if len(fname) > 2:
-                        memory = int(fname[2])
+                if os.path.exists(f"{name}-processed{extension}"):
+                    self.logging.info(f"Skipping already processed {f}")
+                    continue
+                self.logging.info(f"Processing data in {f}")
+                fname = os.path.splitext(os.path.basename(f))[0].split("_")
+                if len(fname) > 2:
+                    memory = int(fname[2])
+                else:
+                    memory = 0
+                exp_type = fname[0]
+                with open(f, "r") as in_f:
+                    config = json.load(in_f)
+                    statistics = config["statistics"]
+                    experiments = ExperimentResult.deserialize(
+                        config,
+                        sebs_client.cache_client,
+                        sebs_client.generate_logging_handlers(logging_filename),
+                        os.path.dirname(f),
+                    )
+                    if extend_time_interval > 0:
+                        times = (
+                            -extend_time_interval * 60 + experiments.times()[0],
+                            extend_time_interval * 60 + experiments.times()[1],
+                        )
                     else:
-                        memory = 0
-                    exp_type = fname[0]
-                    with open(f, "r") as in_f:
-                        config = json.load(in_f)
-                        statistics = config["statistics"]
-                        experiments = ExperimentResult.deserialize(
-                            config,
-                            sebs_client.cache_client,
-                            sebs_client.generate_logging_handlers(logging_filename),
+                        times = experiments.times()
+                    process_invocations = functools.partial(
+                        PerfCost._process_invocations, deployment_client, experiments, times
+                    )
+                    # streamed invocations are processed one function at a time
+                    if experiments.invocations_file is not None:
+                        experiments.transform_invocations(
+                            f"{name}-processed.jsonl", process_invocations
                         )
+                    else:
                         for func in experiments.functions():
-                            if extend_time_interval > 0:
-                                times = (
-                                    -extend_time_interval * 60 + experiments.times()[0],
-                                    extend_time_interval * 60 + experiments.times()[1],
-                                )
-                            else:
-                                times = experiments.times()
-                            deployment_client.download_metrics(
-                                func,
-                                *times,
-                                experiments.invocations(func),
-                                experiments.metrics(func),
-                            )
-                        # compress! remove output since it can be large but it's useless for us
-                        for func in experiments.functions():
-                            for id, invoc in experiments.invocations(func).items():
-                                # FIXME: compatibility with old results
-                                if "output" in invoc.output["result"]:
-                                    del invoc.output["result"]["output"]
-                                elif "result" in invoc.output["result"]:
-                                    del invoc.output["result"]["result"]
-
-                        name, extension = os.path.splitext(f)
-                        with open(
-                            os.path.join(directory, "perf-cost", f"{name}-processed{extension}"),
-                            "w",
-                        ) as out_f:
-                            out_f.write(
-                                serialize(
-                                    {**json.loads(serialize(experiments)), "statistics": statistics}
-                                )
+                            process_invocations(func, experiments.invocations(func))
+                    with open(f"{name}-processed{extension}", "w") as out_f:
+                        out_f.write(
+                            serialize(
+                                {**json.loads(serialize(experiments)), "statistics": statistics}
                             )
-                for func in experiments.functions():
-                    for request_id, invoc in experiments.invocations(func).items():
-                        writer.writerow(
-                            [
-                                memory,
-                                exp_type,
-                                invoc.stats.cold_start,
-                                invoc.times.benchmark,
-                                invoc.times.http_startup,
-                                invoc.times.client,
-                                invoc.provider_times.execution,
-                                invoc.stats.memory_used,
-                            ]
                         )
+            columns = ColumnarResult.from_result(experiments)
+            columns.add_column("memory", memory)
+            columns.add_column("type", exp_type)
+            results.append(columns)
+
+        result = ColumnarResult.concatenate(results)
+        if result is None:
+            self.logging.info("No results found!")
+            return
+        path = result.save(os.path.join(directory, "perf-cost", "result"))
+        self.logging.info(f"Saved columnar results of {len(result)} invocations to {path}")
+
+        csv_columns = {
+            "memory": "memory",
+            "type": "type",
+            "stats.cold_start": "is_cold",
+            "times.benchmark": "exec_time",
+            "times.http_startup": "connection_time",
+            "times.client": "client_time",
+            "provider_times.execution": "provider_time",
+            "stats.memory_used": "mem_used",
+            "times.http_new_connections": "new_connections",
+        }
+        result.to_dataframe()[list(csv_columns.keys())].rename(columns=csv_columns).to_csv(
+            os.path.join(directory, "perf-cost", "result.csv"), index=False
+        )
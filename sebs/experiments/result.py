@@ -1,10 +1,12 @@
+import json
+import os
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple  # noqa
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple  # noqa
 
 from sebs.cache import Cache
 from sebs.faas.config import Config as DeploymentConfig
 from sebs.faas.function import Function, ExecutionResult
-from sebs.utils import LoggingHandlers
+from sebs.utils import JSONSerializer, LoggingHandlers
 from sebs.experiments.config import Config as ExperimentConfig
 
 
@@ -30,6 +32,36 @@ class Result:
         else:
             self._metrics = metrics
         self.result_bucket = result_bucket
+        # JSON Lines file with invocations that are not kept in memory
+        self.invocations_file: Optional[str] = None
+        self._directory = ""
+        self._stream: Optional[IO[str]] = None
+        # functions with invocations in the JSON Lines file, found when it is written or first read
+        self._file_functions: Optional[List[str]] = None
+        self._invocations_count: Dict[str, int] = {
+            func: len(invocs) for func, invocs in self._invocations.items()
+        }
+
+    """
+        Append each new invocation to a JSON Lines file as soon as it is added,
+        instead of keeping it in memory until the result is serialized.
+        The serialized result stores only the name of the file, relative to
+        the directory of the main result file.
+
+        :param path: location of the JSON Lines file; existing content is replaced
+    """
+
+    def stream_invocations(self, path: str):
+        self.close()
+        self._directory = os.path.dirname(path)
+        self.invocations_file = os.path.basename(path)
+        self._file_functions = []
+        self._stream = open(path, "w")
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
 
     def begin(self):
         self.begin_time = datetime.now().timestamp()
@@ -44,21 +76,164 @@ class Result:
         self.result_bucket = result_bucket
 
     def add_invocation(self, func: Function, invocation: ExecutionResult):
+        self._add_invocation(func.name, invocation)
+
+    def _add_invocation(self, func_name: str, invocation: ExecutionResult):
         # the function has most likely failed, thus no request id
         if invocation.request_id:
             req_id = invocation.request_id
         else:
-            req_id = f"failed-{len(self._invocations.get(func.name, []))}"
+            req_id = f"failed-{self._invocations_count.get(func_name, 0)}"
+        self._invocations_count[func_name] = self._invocations_count.get(func_name, 0) + 1
 
-        if func.name in self._invocations:
-            self._invocations.get(func.name)[req_id] = invocation  # type: ignore
+        if self._stream is not None:
+            Result.write_invocation(self._stream, func_name, req_id, invocation)
+            assert self._file_functions is not None
+            if func_name not in self._file_functions:
+                self._file_functions.append(func_name)
+            # do not lose completed invocations when the experiment is interrupted
+            self._stream.flush()
+        elif func_name in self._invocations:
+            self._invocations.get(func_name)[req_id] = invocation  # type: ignore
         else:
-            self._invocations[func.name] = {req_id: invocation}
+            self._invocations[func_name] = {req_id: invocation}
+
+    @staticmethod
+    def write_invocation(out: IO[str], func: str, req_id: str, invocation: ExecutionResult):
+        out.write(
+            json.dumps(
+                {"function": func, "request_id": req_id, "invocation": invocation},
+                cls=JSONSerializer,
+            )
+        )
+        out.write("\n")
+
+    """
+        Lazily read invocations from a JSON Lines file.
+        An incomplete last record, e.g., after the experiment crashed, is skipped.
+
+        :return: generator of function name, request id and invocation result
+    """
+
+    @staticmethod
+    def read_invocations(path: str) -> Iterator[Tuple[str, str, ExecutionResult]]:
+        with open(path, "r") as in_f:
+            for line in in_f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    break
+                yield (
+                    record["function"],
+                    record["request_id"],
+                    ExecutionResult.deserialize(record["invocation"]),
+                )
+
+    @staticmethod
+    def read_functions(path: str) -> List[str]:
+        functions: List[str] = []
+        with open(path, "r") as in_f:
+            for line in in_f:
+                if not line.strip():
+                    continue
+                try:
+                    func_name = json.loads(line)["function"]
+                except json.decoder.JSONDecodeError:
+                    break
+                if func_name not in functions:
+                    functions.append(func_name)
+        return functions
+
+    """
+        Iterate over invocations kept in memory and in the JSON Lines file.
+    """
+
+    def iter_invocations(
+        self, func: Optional[str] = None, from_file: bool = True
+    ) -> Iterator[Tuple[str, str, ExecutionResult]]:
+        for func_name, func_invocations in self._invocations.items():
+            if func is None or func == func_name:
+                for req_id, invoc in func_invocations.items():
+                    yield func_name, req_id, invoc
+        if from_file and self.invocations_file is not None:
+            for func_name, req_id, invoc in Result.read_invocations(self._invocations_path()):
+                if func is None or func == func_name:
+                    yield func_name, req_id, invoc
+
+    """
+        Move all invocations to a new JSON Lines file and release them from memory.
+    """
+
+    def store_invocations(self, path: str):
+        functions = self.functions()
+        with open(path, "w") as out_f:
+            for func_name, req_id, invoc in self.iter_invocations():
+                Result.write_invocation(out_f, func_name, req_id, invoc)
+        self._set_invocations_file(path, functions)
+
+    """
+        Move all invocations to a new JSON Lines file, one function at a time:
+        only invocations of a single function are kept in memory, and they can
+        be modified by the callback before they are written.
+
+        :param path: location of the new JSON Lines file
+        :param transform: called with the function name and its invocations
+    """
+
+    def transform_invocations(
+        self, path: str, transform: Callable[[str, Dict[str, ExecutionResult]], None]
+    ):
+        functions = self.functions()
+        with open(path, "w") as out_f:
+            for func in functions:
+                invocations = {req_id: invoc for _, req_id, invoc in self.iter_invocations(func)}
+                transform(func, invocations)
+                for req_id, invoc in invocations.items():
+                    Result.write_invocation(out_f, func, req_id, invoc)
+        self._set_invocations_file(path, functions)
+
+    def _set_invocations_file(self, path: str, functions: List[str]):
+        self._invocations = {}
+        self._directory = os.path.dirname(path)
+        self.invocations_file = os.path.basename(path)
+        self._file_functions = functions
+
+    def _invocations_path(self) -> str:
+        assert self.invocations_file
+        return os.path.join(self._directory, self.invocations_file)
+
+    @property
+    def invocations_path(self) -> Optional[str]:
+        return self._invocations_path() if self.invocations_file is not None else None
 
     def functions(self) -> List[str]:
-        return list(self._invocations.keys())
+        functions = list(self._invocations.keys())
+        if self.invocations_file is not None:
+            if self._file_functions is None:
+                self._file_functions = Result.read_functions(self._invocations_path())
+            functions.extend(func for func in self._file_functions if func not in functions)
+        return functions
+
+    """
+        Invocations of a function. Results stored in the JSON Lines file
+        are loaded into memory and will be serialized with the result.
+        While invocations are streamed, they are not kept in memory and
+        can be read only with `iter_invocations`.
+    """
 
     def invocations(self, func: str) -> Dict[str, ExecutionResult]:
+        if self._stream is not None:
+            raise RuntimeError(
+                f"Invocations of {func} are streamed to {self._invocations_path()}, "
+                "use iter_invocations or close the result first!"
+            )
+        if self.invocations_file is not None:
+            for func_name, req_id, invoc in Result.read_invocations(self._invocations_path()):
+                self._invocations.setdefault(func_name, {})[req_id] = invoc
+            self.invocations_file = None
+            self._file_functions = None
         return self._invocations[func]
 
     def metrics(self, func: str) -> dict:
@@ -66,8 +241,23 @@ class Result:
             self._metrics[func] = {}
         return self._metrics[func]
 
+    def serialize(self) -> dict:
+        out = vars(self).copy()
+        out.pop("_stream")
+        out.pop("_directory")
+        out.pop("_invocations_count")
+        out.pop("_file_functions")
+        return out
+
+    """
+        :param directory: location of the result file, used to find the file with
+            invocations of a streamed result
+    """
+
     @staticmethod
-    def deserialize(cached_config: dict, cache: Cache, handlers: LoggingHandlers) -> "Result":
+    def deserialize(
+        cached_config: dict, cache: Cache, handlers: LoggingHandlers, directory: str = ""
+    ) -> "Result":
         invocations: Dict[str, dict] = {}
         for func, func_invocations in cached_config["_invocations"].items():
             invocations[func] = {}
@@ -83,4 +273,6 @@ class Result:
         )
         ret.begin_time = cached_config["begin_time"]
         ret.end_time = cached_config["end_time"]
+        ret.invocations_file = cached_config.get("invocations_file")
+        ret._directory = directory
         return ret
@@ -0,0 +1,127 @@
+import concurrent.futures
+import threading
+from typing import Callable, Optional, Set
+
+"""
+    Bounded pool of client threads used for asynchronous invocations.
+
+    Each deployment owns a single executor shared by all of its triggers.
+    The number of invocations submitted but not yet completed is limited by
+    `max_in_flight`: when the limit is reached, `submit` blocks until one
+    of the pending invocations finishes, providing backpressure to the caller.
+"""
+
+
+class InvocationExecutor:
+
+    _default: Optional["InvocationExecutor"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, workers: int = 32, max_in_flight: Optional[int] = None):
+        self._workers = workers
+        self._max_in_flight = max_in_flight if max_in_flight else workers
+        if self._max_in_flight < workers:
+            raise RuntimeError(
+                f"The limit of in-flight invocations {self._max_in_flight} "
+                f"is smaller than the number of workers {workers}!"
+            )
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="sebs-invoke"
+        )
+        self._slots = threading.BoundedSemaphore(self._max_in_flight)
+        self._pending: Set[concurrent.futures.Future] = set()
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    @staticmethod
+    def typename() -> str:
+        return "InvocationExecutor"
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def max_in_flight(self) -> int:
+        return self._max_in_flight
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    """
+        Executor used by triggers that have not been assigned one by a deployment,
+        e.g., triggers unpickled in a child process. Created on first use.
+    """
+
+    @staticmethod
+    def default() -> "InvocationExecutor":
+        with InvocationExecutor._default_lock:
+            if InvocationExecutor._default is None:
+                InvocationExecutor._default = InvocationExecutor()
+            return InvocationExecutor._default
+
+    """
+        Schedule an invocation.
+
+        :param func: invocation callable, e.g., trigger's sync_invoke
+        :param timeout: maximum time in seconds to wait for an in-flight slot,
+            None blocks until a slot is available
+        :return: future of the invocation; it can be cancelled until a worker picks it up
+    """
+
+    def submit(
+        self, func: Callable, *args, timeout: Optional[float] = None
+    ) -> concurrent.futures.Future:
+
+        if self._shutdown:
+            raise RuntimeError("Cannot submit invocation, the executor has been shut down!")
+        if not self._slots.acquire(timeout=timeout):
+            raise RuntimeError(
+                f"Timeout while waiting for one of {self._max_in_flight} in-flight invocations "
+                "to finish!"
+            )
+
+        try:
+            fut = self._pool.submit(func, *args)
+        except RuntimeError:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._pending.add(fut)
+        # runs immediately when the future has already finished
+        fut.add_done_callback(self._finished)
+        return fut
+
+    def _finished(self, fut: concurrent.futures.Future):
+        with self._lock:
+            # the callback is executed only once per future
+            self._pending.discard(fut)
+        self._slots.release()
+
+    """
+        Cancel all invocations that have not started yet.
+
+        :return: number of cancelled invocations
+    """
+
+    def cancel_pending(self) -> int:
+        with self._lock:
+            pending = list(self._pending)
+        return sum(1 for fut in pending if fut.cancel())
+
+    """
+        Stop accepting new invocations and release the worker threads.
+
+        :param wait: block until the running invocations finish
+        :param cancel_pending: cancel invocations that have not started yet
+        :return: number of cancelled invocations
+    """
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = True) -> int:
+        self._shutdown = True
+        cancelled = self.cancel_pending() if cancel_pending else 0
+        self._pool.shutdown(wait=wait)
+        return cancelled
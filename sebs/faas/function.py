@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import concurrent.futures
+import threading
 from abc import ABC
 from abc import abstractmethod
 from dataclasses import dataclass
@@ -10,8 +11,27 @@ from enum import Enum
 from typing import Callable, Dict, List, Optional, Type, TypeVar  # noqa
 
 from sebs.benchmark import Benchmark
+from sebs.faas.executor import InvocationExecutor
 from sebs.utils import LoggingBase
 
+"""
+    Invocation results are created in large numbers, thus classes below
+    use __slots__ instead of a per-instance __dict__.
+    Only attributes that have been set are serialized, which keeps
+    the JSON schema identical to the one produced by vars().
+"""
+
+
+def _serialize_slots(obj) -> dict:
+    return {key: getattr(obj, key) for key in obj.__slots__ if hasattr(obj, key)}
+
+
+def _deserialize_slots(obj, cached_obj: dict):
+    for key, val in cached_obj.items():
+        setattr(obj, key, val)
+    return obj
+
+
 """
     Times are reported in microseconds.
 """
@@ -19,6 +39,21 @@ from sebs.utils import LoggingBase
 
 class ExecutionTimes:
 
+    __slots__ = (
+        "client",
+        "client_begin",
+        "client_end",
+        "benchmark",
+        "initialization",
+        "http_startup",
+        "http_first_byte_return",
+        "http_new_connections",
+        "imports",
+        "module_load",
+        "code_load",
+        "handler",
+    )
+
     client: int
     client_begin: datetime
     client_end: datetime
@@ -26,21 +61,33 @@ class ExecutionTimes:
     initialization: int
     http_startup: int
     http_first_byte_return: int
+    http_new_connections: int
+    # total time of imports recorded by the wrapper's import profiler
+    imports: int
+    # measured by the wrapper with a monotonic clock: loading of the wrapper and of the
+    # benchmark code, both reported only by the first invocation in a process, and the handler
+    module_load: int
+    code_load: int
+    handler: int
 
     def __init__(self):
         self.client = 0
         self.initialization = 0
         self.benchmark = 0
+        self.http_new_connections = 0
+
+    def serialize(self) -> dict:
+        return _serialize_slots(self)
 
     @staticmethod
     def deserialize(cached_obj: dict) -> "ExecutionTimes":
-        ret = ExecutionTimes()
-        ret.__dict__.update(cached_obj)
-        return ret
+        return _deserialize_slots(ExecutionTimes(), cached_obj)
 
 
 class ProviderTimes:
 
+    __slots__ = ("initialization", "execution")
+
     initialization: int
     execution: int
 
@@ -48,15 +95,18 @@ class ProviderTimes:
         self.execution = 0
         self.initialization = 0
 
+    def serialize(self) -> dict:
+        return _serialize_slots(self)
+
     @staticmethod
     def deserialize(cached_obj: dict) -> "ProviderTimes":
-        ret = ProviderTimes()
-        ret.__dict__.update(cached_obj)
-        return ret
+        return _deserialize_slots(ProviderTimes(), cached_obj)
 
 
 class ExecutionStats:
 
+    __slots__ = ("memory_used", "cold_start", "failure")
+
     memory_used: Optional[float]
     cold_start: bool
     failure: bool
@@ -66,15 +116,18 @@ class ExecutionStats:
         self.cold_start = False
         self.failure = False
 
+    def serialize(self) -> dict:
+        return _serialize_slots(self)
+
     @staticmethod
     def deserialize(cached_obj: dict) -> "ExecutionStats":
-        ret = ExecutionStats()
-        ret.__dict__.update(cached_obj)
-        return ret
+        return _deserialize_slots(ExecutionStats(), cached_obj)
 
 
 class ExecutionBilling:
 
+    __slots__ = ("_memory", "_billed_time", "_gb_seconds")
+
     _memory: Optional[int]
     _billed_time: Optional[int]
     _gb_seconds: int
@@ -108,21 +161,34 @@ class ExecutionBilling:
     def gb_seconds(self, val: int):
         self._gb_seconds = val
 
+    def serialize(self) -> dict:
+        return _serialize_slots(self)
+
     @staticmethod
     def deserialize(cached_obj: dict) -> "ExecutionBilling":
-        ret = ExecutionBilling()
-        ret.__dict__.update(cached_obj)
-        return ret
+        return _deserialize_slots(ExecutionBilling(), cached_obj)
 
 
 class ExecutionResult:
 
+    __slots__ = (
+        "output",
+        "request_id",
+        "times",
+        "provider_times",
+        "stats",
+        "billing",
+        "imports",
+    )
+
     output: dict
     request_id: str
     times: ExecutionTimes
     provider_times: ProviderTimes
     stats: ExecutionStats
     billing: ExecutionBilling
+    # import time of each top-level package, set only when imports were profiled
+    imports: Dict[str, int]
 
     def __init__(self):
         self.output = {}
@@ -153,6 +219,36 @@ class ExecutionResult:
             )
             / timedelta(microseconds=1)
         )
+        for key, attr in [
+            ("load_time", "module_load"),
+            ("code_load_time", "code_load"),
+            ("handler_time", "handler"),
+        ]:
+            if key in self.output:
+                setattr(self.times, attr, int(self.output[key]))
+        # the list is empty when all modules were already imported in a warm container
+        if self.output.get("imports") is not None:
+            self.imports = ExecutionResult.aggregate_imports(self.output["imports"])
+            self.times.imports = sum(self.imports.values())
+
+    """
+        Sum the self time of imported modules in each top-level package,
+        e.g., `numpy.core` is attributed to `numpy`.
+
+        :param imports: list of imports recorded by the wrapper
+        :return: import time in microseconds of each package, in descending order
+    """
+
+    @staticmethod
+    def aggregate_imports(imports: List[dict]) -> Dict[str, int]:
+        packages: Dict[str, int] = {}
+        for entry in imports:
+            package = entry["module"].split(".")[0]
+            packages[package] = packages.get(package, 0) + entry["self"]
+        return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+    def serialize(self) -> dict:
+        return _serialize_slots(self)
 
     @staticmethod
     def deserialize(cached_config: dict) -> "ExecutionResult":
@@ -163,6 +259,8 @@ class ExecutionResult:
         ret.stats = ExecutionStats.deserialize(cached_config["stats"])
         ret.request_id = cached_config["request_id"]
         ret.output = cached_config["output"]
+        if "imports" in cached_config:
+            ret.imports = cached_config["imports"]
         return ret
 
 
@@ -187,30 +285,106 @@ class Trigger(ABC, LoggingBase):
                     return member
             raise Exception("Unknown trigger type {}".format(member))
 
-    def _http_invoke(self, payload: dict, url: str, verify_ssl: bool = True) -> ExecutionResult:
+    def __init__(self):
+        super().__init__()
+        self._http_handles = threading.local()
+        self._invocation_executor: Optional[InvocationExecutor] = None
+
+    """
+        Executor of asynchronous invocations, shared by all triggers of a deployment.
+        Triggers that were not assigned one fall back to a process-wide default executor.
+    """
+
+    @property
+    def invocation_executor(self) -> InvocationExecutor:
+        if self._invocation_executor is None:
+            self._invocation_executor = InvocationExecutor.default()
+        return self._invocation_executor
+
+    @invocation_executor.setter
+    def invocation_executor(self, executor: InvocationExecutor):
+        self._invocation_executor = executor
+
+    """
+        Curl handles and thread pools cannot be shared between processes nor pickled.
+        We drop them when sending triggers to other processes, e.g., in the eviction model.
+    """
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_http_handles", None)
+        state["_invocation_executor"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._http_handles = threading.local()
+
+    """
+        Each thread invoking the trigger keeps its own persistent curl handle.
+        libcurl keeps the connection alive between transfers on the same handle,
+        and HTTP/2 is negotiated over TLS when libcurl supports it.
+    """
+
+    def _http_handle(self):
         import pycurl
-        from io import BytesIO
+
+        c = getattr(self._http_handles, "curl", None)
+        if c is not None:
+            return c
 
         c = pycurl.Curl()
         c.setopt(pycurl.HTTPHEADER, ["Content-Type: application/json"])
         c.setopt(pycurl.POST, 1)
+        c.setopt(pycurl.TCP_KEEPALIVE, 1)
+        if hasattr(pycurl, "CURL_HTTP_VERSION_2TLS"):
+            try:
+                c.setopt(pycurl.HTTP_VERSION, pycurl.CURL_HTTP_VERSION_2TLS)
+            except pycurl.error:
+                self.logging.debug("HTTP/2 is not supported by libcurl, using HTTP/1.1")
+        self._http_handles.curl = c
+        return c
+
+    def _http_close_handle(self):
+        c = getattr(self._http_handles, "curl", None)
+        if c is not None:
+            c.close()
+            self._http_handles.curl = None
+
+    def _http_invoke(self, payload: dict, url: str, verify_ssl: bool = True) -> ExecutionResult:
+        import pycurl
+        from io import BytesIO
+
+        c = self._http_handle()
         c.setopt(pycurl.URL, url)
-        if not verify_ssl:
-            c.setopt(pycurl.SSL_VERIFYHOST, 0)
-            c.setopt(pycurl.SSL_VERIFYPEER, 0)
+        c.setopt(pycurl.SSL_VERIFYHOST, 2 if verify_ssl else 0)
+        c.setopt(pycurl.SSL_VERIFYPEER, 1 if verify_ssl else 0)
         data = BytesIO()
         c.setopt(pycurl.WRITEFUNCTION, data.write)
 
         c.setopt(pycurl.POSTFIELDS, json.dumps(payload))
         begin = datetime.now()
-        c.perform()
+        try:
+            c.perform()
+        except pycurl.error:
+            # the connection state is unknown - start with a fresh handle next time
+            self._http_close_handle()
+            raise
         end = datetime.now()
+        return self._http_process_response(c, url, data.getvalue(), begin, end)
+
+    def _http_process_response(
+        self, c, url: str, data: bytes, begin: datetime, end: datetime
+    ) -> ExecutionResult:
+        import pycurl
+
         status_code = c.getinfo(pycurl.RESPONSE_CODE)
         conn_time = c.getinfo(pycurl.PRETRANSFER_TIME)
         receive_time = c.getinfo(pycurl.STARTTRANSFER_TIME)
+        new_connections = c.getinfo(pycurl.NUM_CONNECTS)
 
         try:
-            output = json.loads(data.getvalue())
+            output = json.loads(data)
 
             if status_code != 200:
                 self.logging.error("Invocation on URL {} failed!".format(url))
@@ -221,6 +395,8 @@ class Trigger(ABC, LoggingBase):
             result = ExecutionResult.from_times(begin, end)
             result.times.http_startup = conn_time
             result.times.http_first_byte_return = receive_time
+            # zero when the request was sent over a reused connection
+            result.times.http_new_connections = new_connections
             # OpenWhisk will not return id on a failure
             if "request_id" not in output:
                 raise RuntimeError(f"Cannot process allocation with output: {output}")
@@ -230,11 +406,112 @@ class Trigger(ABC, LoggingBase):
             return result
         except json.decoder.JSONDecodeError:
             self.logging.error("Invocation on URL {} failed!".format(url))
-            if len(data.getvalue()) > 0:
-                self.logging.error("Output: {}".format(data.getvalue().decode()))
+            if len(data) > 0:
+                self.logging.error("Output: {}".format(data.decode()))
             else:
                 self.logging.error("No output provided!")
-            raise RuntimeError(f"Failed invocation of function! Output: {data.getvalue().decode()}")
+            raise RuntimeError(f"Failed invocation of function! Output: {data.decode()}")
+
+    """
+        Send a burst of HTTP invocations from a single thread with the curl-multi
+        interface, instead of blocking one OS thread per concurrent invocation.
+        The send time of each request is stamped by curl callbacks when the request
+        is about to be sent, not when the transfer is queued in the multi handle.
+
+        :param payload: invocation payload, the same for all requests
+        :param url: function endpoint
+        :param invocations: number of concurrent invocations
+        :return: futures that are already completed with an execution result or an exception
+    """
+
+    def _http_burst_invoke(
+        self, payload: dict, url: str, invocations: int, verify_ssl: bool = True
+    ) -> List[concurrent.futures.Future]:
+        import pycurl
+        from io import BytesIO
+
+        body = json.dumps(payload)
+        # reuse DNS lookups and TLS sessions across all handles of the burst
+        share = pycurl.CurlShare()
+        share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+        share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+        multi = pycurl.CurlMulti()
+
+        handles = []
+        buffers: Dict[pycurl.Curl, BytesIO] = {}
+        futures: Dict[pycurl.Curl, concurrent.futures.Future] = {}
+        begin: Dict[pycurl.Curl, datetime] = {}
+
+        def started(c: pycurl.Curl) -> Callable[..., int]:
+            def callback(*args) -> int:
+                if c not in begin:
+                    begin[c] = datetime.now()
+                return 0
+
+            return callback
+
+        for _ in range(invocations):
+            c = pycurl.Curl()
+            c.setopt(pycurl.SHARE, share)
+            c.setopt(pycurl.HTTPHEADER, ["Content-Type: application/json"])
+            c.setopt(pycurl.POST, 1)
+            c.setopt(pycurl.URL, url)
+            c.setopt(pycurl.SSL_VERIFYHOST, 2 if verify_ssl else 0)
+            c.setopt(pycurl.SSL_VERIFYPEER, 1 if verify_ssl else 0)
+            c.setopt(pycurl.POSTFIELDS, body)
+            buffers[c] = BytesIO()
+            c.setopt(pycurl.WRITEFUNCTION, buffers[c].write)
+            # called after connecting, right before the request is sent (libcurl 7.80+);
+            # otherwise, the first progress callback marks the start of the transfer
+            if hasattr(pycurl, "PREREQFUNCTION"):
+                c.setopt(pycurl.PREREQFUNCTION, started(c))
+            else:
+                c.setopt(pycurl.NOPROGRESS, 0)
+                c.setopt(pycurl.XFERINFOFUNCTION, started(c))
+            futures[c] = concurrent.futures.Future()
+            futures[c].set_running_or_notify_cancel()
+            handles.append(c)
+
+        queued_at = datetime.now()
+        for c in handles:
+            multi.add_handle(c)
+
+        remaining = invocations
+        while remaining > 0:
+            ret = pycurl.E_CALL_MULTI_PERFORM
+            while ret == pycurl.E_CALL_MULTI_PERFORM:
+                ret, _ = multi.perform()
+
+            while True:
+                queued, succeeded, failed = multi.info_read()
+                for c in succeeded:
+                    end = datetime.now()
+                    try:
+                        futures[c].set_result(
+                            self._http_process_response(
+                                c, url, buffers[c].getvalue(), begin.get(c, queued_at), end
+                            )
+                        )
+                    except Exception as e:
+                        futures[c].set_exception(e)
+                for c, errno, errmsg in failed:
+                    self.logging.error(f"Invocation on URL {url} failed with error {errmsg}!")
+                    futures[c].set_exception(
+                        RuntimeError(f"Failed invocation of function! Error {errno}: {errmsg}")
+                    )
+                for c in [*succeeded, *[val[0] for val in failed]]:
+                    multi.remove_handle(c)
+                    c.close()
+                    remaining -= 1
+                if queued == 0:
+                    break
+
+            if remaining > 0:
+                multi.select(1.0)
+
+        multi.close()
+        share.close()
+        return [futures[c] for c in handles]
 
     # FIXME: 3.7+, future annotations
     @staticmethod
@@ -246,9 +523,18 @@ class Trigger(ABC, LoggingBase):
     def sync_invoke(self, payload: dict) -> ExecutionResult:
         pass
 
-    @abstractmethod
     def async_invoke(self, payload: dict) -> concurrent.futures.Future:
-        pass
+        return self.invocation_executor.submit(self.sync_invoke, payload)
+
+    """
+        Issue many concurrent invocations at once.
+        Implemented only by HTTP triggers.
+    """
+
+    def burst_invoke(self, payload: dict, invocations: int) -> List[concurrent.futures.Future]:
+        raise NotImplementedError(
+            f"Trigger {self.trigger_type().value} does not support burst invocations!"
+        )
 
     @abstractmethod
     def serialize(self) -> dict:
@@ -352,6 +638,7 @@ class Function(LoggingBase):
         self._benchmark = benchmark
         self._name = name
         self._code_package_hash = code_hash
+        self._archive_hash: Optional[str] = None
         self._updated_code = False
         self._triggers: Dict[Trigger.TriggerType, List[Trigger]] = {}
         self._cfg = cfg
@@ -376,6 +663,18 @@ class Function(LoggingBase):
     def code_package_hash(self, new_hash: str):
         self._code_package_hash = new_hash
 
+    """
+        Digest of the code package archive deployed in the cloud.
+    """
+
+    @property
+    def archive_hash(self) -> Optional[str]:
+        return self._archive_hash
+
+    @archive_hash.setter
+    def archive_hash(self, new_hash: Optional[str]):
+        self._archive_hash = new_hash
+
     @property
     def updated_code(self) -> bool:
         return self._updated_code
@@ -403,6 +702,7 @@ class Function(LoggingBase):
         return {
             "name": self._name,
             "hash": self._code_package_hash,
+            "archive_hash": self._archive_hash,
             "benchmark": self._benchmark,
             "config": self.config.serialize(),
             "triggers": [
@@ -1,12 +1,301 @@
+import base64
+import concurrent.futures
+import hashlib
+import json
 import os
+import threading
 
 from abc import ABC
 from abc import abstractmethod
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from sebs.cache import Cache
 from sebs.utils import LoggingBase
 
+
+"""
+    Object stored in a bucket. The ETag is quoted by some providers, the quotes are removed.
+"""
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+    etag: Optional[str] = None
+    # hexadecimal MD5 of the content, when stored separately from the ETag
+    md5: Optional[str] = None
+
+    @staticmethod
+    def md5_from_base64(digest: Optional[str]) -> Optional[str]:
+        return base64.b64decode(digest).hex() if digest else None
+
+
+"""
+    Digest of a local file, compared with the metadata of stored objects.
+    S3 and Minio report the MD5 of objects uploaded at once as their ETag, and the MD5
+    of concatenated part digests followed by the number of parts for multipart uploads.
+    The latter depends on the part size, which is stored with the digest.
+"""
+
+
+@dataclass
+class FileDigest:
+    size: int
+    mtime: int
+    part_size: int
+    md5: str
+    multipart_etag: Optional[str] = None
+
+    @staticmethod
+    def compute(filepath: str, part_size: int) -> "FileDigest":
+        stat = os.stat(filepath)
+        total = hashlib.md5()
+        parts = []
+        with open(filepath, "rb") as f:
+            while True:
+                data = f.read(part_size)
+                if not data:
+                    break
+                total.update(data)
+                parts.append(hashlib.md5(data).digest())
+        multipart_etag = None
+        if len(parts) > 1:
+            multipart_etag = f"{hashlib.md5(b''.join(parts)).hexdigest()}-{len(parts)}"
+        return FileDigest(
+            stat.st_size, stat.st_mtime_ns, part_size, total.hexdigest(), multipart_etag
+        )
+
+    """
+        :return: true if the digest is still valid for the file
+    """
+
+    def is_current(self, filepath: str, part_size: int) -> bool:
+        stat = os.stat(filepath)
+        return (
+            self.size == stat.st_size
+            and self.mtime == stat.st_mtime_ns
+            and self.part_size == part_size
+        )
+
+    """
+        :return: true if the object has the content of the file;
+            false also when the provider exposes no comparable digest
+    """
+
+    def matches(self, obj: ObjectInfo) -> bool:
+        if obj.size != self.size:
+            return False
+        if obj.md5 is not None:
+            return obj.md5 == self.md5
+        return obj.etag is not None and obj.etag in (self.md5, self.multipart_etag)
+
+    @staticmethod
+    def deserialize(data: dict) -> "FileDigest":
+        keys = list(FileDigest.__dataclass_fields__.keys())
+        data = {k: v for k, v in data.items() if k in keys}
+        return FileDigest(**data)
+
+    def serialize(self) -> dict:
+        return self.__dict__
+
+
+"""
+    Uploads of benchmark inputs: number of files uploaded concurrently,
+    and the multipart configuration of large files (sizes in MiB).
+"""
+
+
+@dataclass
+class UploadConfig:
+    workers: int = 8
+    # concurrent uploads of parts of a single file
+    part_workers: int = 4
+    multipart_threshold: int = 16
+    part_size: int = 8
+
+    @staticmethod
+    def deserialize(data: dict) -> "UploadConfig":
+        keys = list(UploadConfig.__dataclass_fields__.keys())
+        data = {k: v for k, v in data.items() if k in keys}
+        return UploadConfig(**data)
+
+    def serialize(self) -> dict:
+        return self.__dict__
+
+
+"""
+    Files uploaded to a bucket, stored in the cache directory as JSON lines.
+    An entry is appended after each completed upload, such that an interrupted
+    upload resumes with the remaining files. Files are identified by their size
+    and modification time.
+"""
+
+
+class UploadManifest:
+    def __init__(self, path: str):
+        self._path = path
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    # the last line is incomplete when SeBS was killed while writing it
+                    except json.decoder.JSONDecodeError:
+                        continue
+                    self._entries[entry["key"]] = entry
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def contains(self, key: str, filepath: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        stat = os.stat(filepath)
+        return entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns
+
+    def add(self, key: str, filepath: str):
+        stat = os.stat(filepath)
+        entry = {"key": key, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+        with self._lock:
+            self._entries[key] = entry
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            with open(self._path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+"""
+    Concurrent upload of benchmark inputs, passed to benchmarks as the upload function.
+    Files are uploaded by a bounded pool of threads with the `uploader_func` of storage.
+    Files recorded in the manifest of a bucket are skipped unless storage replaces
+    existing data, as long as the object is still present in the bucket. Files are hashed
+    only to compare them with an existing object, and digests of input files of a benchmark
+    and input size are kept in the cache, such that unchanged files are not hashed again.
+    Leaving the context waits for all uploads and raises the first error.
+"""
+
+
+class UploadQueue(LoggingBase):
+    def __init__(
+        self,
+        storage: "PersistentStorage",
+        config: UploadConfig,
+        benchmark: Optional[str] = None,
+        size: Optional[str] = None,
+    ):
+        super().__init__()
+        self._storage = storage
+        self._part_size = config.part_size * 1024 * 1024
+        self._benchmark = benchmark
+        self._size = size
+        self._digests: Dict[str, FileDigest] = {}
+        if benchmark is not None and size is not None:
+            self._digests = {
+                path: FileDigest.deserialize(digest)
+                for path, digest in storage.cache_client.get_input_digests(benchmark, size).items()
+            }
+        self._digests_lock = threading.Lock()
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=config.workers, thread_name_prefix="sebs-upload"
+        )
+        self._futures: List[concurrent.futures.Future] = []
+        self._manifests: Dict[str, UploadManifest] = {}
+        self._uploaded = 0
+        self._skipped = 0
+
+    @staticmethod
+    def typename() -> str:
+        return "UploadQueue"
+
+    @property
+    def uploaded(self) -> int:
+        return self._uploaded
+
+    @property
+    def skipped(self) -> int:
+        return self._skipped
+
+    def _manifest(self, bucket: str) -> UploadManifest:
+        if bucket not in self._manifests:
+            self._manifests[bucket] = UploadManifest(self._storage.manifest_path(bucket))
+        return self._manifests[bucket]
+
+    def __call__(self, bucket_idx: int, key: str, filepath: str):
+        bucket = self._storage.input_buckets[bucket_idx]
+        manifest = self._manifest(bucket)
+        if (
+            not self._storage.replace_existing
+            and manifest.contains(key, filepath)
+            and self._storage.exists_object(bucket, key)
+        ):
+            self.logging.debug(f"Skipping upload of {filepath} to {bucket}, found in manifest")
+            self._skipped += 1
+            return
+        self._futures.append(self._pool.submit(self._upload, bucket_idx, key, filepath, manifest))
+
+    def _digest(self, filepath: str) -> FileDigest:
+        path = os.path.abspath(filepath)
+        with self._digests_lock:
+            digest = self._digests.get(path)
+        if digest is None or not digest.is_current(path, self._part_size):
+            digest = FileDigest.compute(path, self._part_size)
+            with self._digests_lock:
+                self._digests[path] = digest
+        return digest
+
+    def _upload(self, bucket_idx: int, key: str, filepath: str, manifest: UploadManifest) -> bool:
+        uploaded = self._storage.uploader_func(
+            bucket_idx, key, filepath, lambda: self._digest(filepath)
+        )
+        manifest.add(key, filepath)
+        return uploaded
+
+    def wait(self):
+        error: Optional[BaseException] = None
+        for fut in concurrent.futures.as_completed(self._futures):
+            if fut.exception() is not None:
+                if error is None:
+                    error = fut.exception()
+            elif fut.result():
+                self._uploaded += 1
+            else:
+                self._skipped += 1
+        self._futures = []
+        if error is not None:
+            self.logging.error(f"Upload of benchmark input failed! Reason: {error}")
+            raise error
+        self.logging.info(
+            f"Uploaded {self._uploaded} files, skipped {self._skipped} unchanged files."
+        )
+
+    def _save_digests(self):
+        if self._benchmark is None or self._size is None:
+            return
+        with self._digests_lock:
+            digests = {path: digest.serialize() for path, digest in self._digests.items()}
+        self._storage.cache_client.update_input_digests(self._benchmark, self._size, digests)
+
+    def __enter__(self) -> "UploadQueue":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self.wait()
+            else:
+                for fut in self._futures:
+                    fut.cancel()
+        finally:
+            self._pool.shutdown(wait=True)
+            # digests of completed uploads are kept when uploading fails
+            self._save_digests()
+
+
 """
     Abstract class
 """
@@ -40,9 +329,20 @@ class PersistentStorage(ABC, LoggingBase):
         self.cached = False
         self.input_buckets: List[str] = []
         self.output_buckets: List[str] = []
-        self.input_buckets_files: List[List[str]] = []
+        # objects of each bucket, by key
+        self._bucket_index: Dict[str, Dict[str, ObjectInfo]] = {}
+        self._index_lock = threading.Lock()
         self._replace_existing = replace_existing
         self._region = region
+        self._upload_config = UploadConfig()
+
+    @property
+    def upload_config(self) -> UploadConfig:
+        return self._upload_config
+
+    @upload_config.setter
+    def upload_config(self, config: UploadConfig):
+        self._upload_config = config
 
     @property
     def input(self) -> List[str]:  # noqa: A003
@@ -124,6 +424,18 @@ class PersistentStorage(ABC, LoggingBase):
     def download(self, bucket_name: str, key: str, filepath: str) -> None:
         pass
 
+    """
+        Read an object from a bucket.
+
+        :param bucket_name:
+        :param key: storage source filepath
+        :return: content of the object
+    """
+
+    @abstractmethod
+    def read_object(self, bucket_name: str, key: str) -> bytes:
+        pass
+
     """
         Upload a file to a bucket with by passing caching.
         Useful for uploading code package to storage (when required).
@@ -138,16 +450,51 @@ class PersistentStorage(ABC, LoggingBase):
         pass
 
     """
-        Retrieves list of files in a bucket.
+        Retrieves objects in a bucket, following all pages of results.
 
         :param bucket_name:
-        :return: list of files in a given bucket
+        :param prefix: return only objects with keys starting with the prefix
     """
 
     @abstractmethod
-    def list_bucket(self, bucket_name: str) -> List[str]:
+    def list_objects(self, bucket_name: str, prefix: str = "") -> Iterator[ObjectInfo]:
         pass
 
+    """
+        Retrieves list of files in a bucket and updates the index of the bucket.
+
+        :param bucket_name:
+        :return: list of files in a given bucket
+    """
+
+    def list_bucket(self, bucket_name: str) -> List[str]:
+        return list(self.refresh_index(bucket_name).keys())
+
+    """
+        Objects in a bucket by their keys. The bucket is listed on the first access,
+        and the index is updated by uploads and cleaning of the bucket.
+    """
+
+    def bucket_index(self, bucket_name: str) -> Dict[str, ObjectInfo]:
+        with self._index_lock:
+            if bucket_name in self._bucket_index:
+                return self._bucket_index[bucket_name]
+        return self.refresh_index(bucket_name)
+
+    def refresh_index(self, bucket_name: str) -> Dict[str, ObjectInfo]:
+        index = {obj.key: obj for obj in self.list_objects(bucket_name)}
+        with self._index_lock:
+            self._bucket_index[bucket_name] = index
+        return index
+
+    def exists_object(self, bucket_name: str, key: str) -> bool:
+        return key in self.bucket_index(bucket_name)
+
+    def _index_object(self, bucket_name: str, obj: ObjectInfo):
+        with self._index_lock:
+            if bucket_name in self._bucket_index:
+                self._bucket_index[bucket_name][obj.key] = obj
+
     @abstractmethod
     def list_buckets(self, bucket_name: str) -> List[str]:
         pass
@@ -156,10 +503,25 @@ class PersistentStorage(ABC, LoggingBase):
     def exists_bucket(self, bucket_name: str) -> bool:
         pass
 
+    """
+        Delete objects from a bucket, in batches supported by the provider.
+
+        :param bucket_name:
+        :param keys: keys of objects
+    """
+
     @abstractmethod
-    def clean_bucket(self, bucket_name: str):
+    def _delete_objects(self, bucket_name: str, keys: List[str]):
         pass
 
+    def clean_bucket(self, bucket_name: str):
+        self.logging.info("Clean bucket {}".format(bucket_name))
+        keys = [obj.key for obj in self.list_objects(bucket_name)]
+        if keys:
+            self._delete_objects(bucket_name, keys)
+        with self._index_lock:
+            self._bucket_index[bucket_name] = {}
+
     """
         Allocate a set of input/output buckets for the benchmark.
         The routine checks the cache first to verify that buckets have not
@@ -187,7 +549,7 @@ class PersistentStorage(ABC, LoggingBase):
             if cache_valid:
                 self.input_buckets = cached_buckets["buckets"]["input"]
                 for bucket in self.input_buckets:
-                    self.input_buckets_files.append(self.list_bucket(bucket))
+                    self.refresh_index(bucket)
                 self.output_buckets = cached_buckets["buckets"]["output"]
                 # for bucket in self.output_buckets:
                 #    self.clean_bucket(bucket)
@@ -207,7 +569,7 @@ class PersistentStorage(ABC, LoggingBase):
             self.input_buckets.append(
                 self._create_bucket(self.correct_name("{}-{}-input".format(benchmark, i)), buckets)
             )
-            self.input_buckets_files.append(self.list_bucket(self.input_buckets[-1]))
+            self.refresh_index(self.input_buckets[-1])
         for i in range(0, requested_buckets[1]):
             self.output_buckets.append(
                 self._create_bucket(self.correct_name("{}-{}-output".format(benchmark, i)), buckets)
@@ -216,17 +578,66 @@ class PersistentStorage(ABC, LoggingBase):
 
     """
         Implements a handy routine for uploading input data by benchmarks.
-        It should skip uploading existing files unless storage client has been
-        initialized to override existing data.
+        It skips uploading existing files with the same content unless storage client
+        has been initialized to override existing data.
 
         :param bucket_idx: index of input bucket
         :param file: name of file to upload
         :param filepath: filepath in the storage
+        :param get_digest: returns the digest of the file, called only when the object exists
+        :return: true if the file has been uploaded
     """
 
-    @abstractmethod
-    def uploader_func(self, bucket_idx: int, file: str, filepath: str) -> None:
-        pass
+    def uploader_func(
+        self,
+        bucket_idx: int,
+        file: str,
+        filepath: str,
+        get_digest: Optional[Callable[[], FileDigest]] = None,
+    ) -> bool:
+        bucket_name = self.input_buckets[bucket_idx]
+        digest: Optional[FileDigest] = None
+        if not self.replace_existing:
+            obj = self.bucket_index(bucket_name).get(file)
+            # files are hashed only to compare them with an existing object
+            if obj is not None:
+                if get_digest is not None:
+                    digest = get_digest()
+                else:
+                    digest = FileDigest.compute(
+                        filepath, self._upload_config.part_size * 1024 * 1024
+                    )
+                if digest.matches(obj):
+                    self.logging.info("Skipping upload of {} to {}".format(filepath, bucket_name))
+                    return False
+                self.logging.info(f"Object {file} in {bucket_name} differs from {filepath}")
+        self.upload(bucket_name, filepath, file)
+        self._index_object(
+            bucket_name,
+            ObjectInfo(file, os.path.getsize(filepath), md5=digest.md5 if digest else None),
+        )
+        return True
+
+    """
+        Location of the manifest with files uploaded to a bucket.
+    """
+
+    def manifest_path(self, bucket_name: str) -> str:
+        return os.path.join(
+            self.cache_client.cache_dir, "storage", self.deployment_name(), f"{bucket_name}.jsonl"
+        )
+
+    """
+        :param benchmark: benchmark name, used with the input size to cache digests of files
+        :return: upload function for benchmarks, uploading files concurrently
+    """
+
+    def upload_queue(
+        self, benchmark: Optional[str] = None, size: Optional[str] = None
+    ) -> UploadQueue:
+        queue = UploadQueue(self, self._upload_config, benchmark, size)
+        queue.logging_handlers = self.logging_handlers
+        return queue
 
     """
         Save benchmark input/output buckets to cache.
@@ -240,15 +651,80 @@ class PersistentStorage(ABC, LoggingBase):
         )
 
     """
-        Download all files in a storage bucket.
-        Warning: assumes flat directory in a bucket! Does not handle bucket files
-        with directory marks in a name, e.g. 'dir1/dir2/file'
-    """
+        Download files in a storage bucket concurrently. Files existing in the
+        output directory are not downloaded again. Keys with directory marks,
+        e.g. 'dir1/dir2/file', are stored in subdirectories.
 
-    def download_bucket(self, bucket_name: str, output_dir: str):
+        :param bucket_name:
+        :param output_dir: local destination directory
+        :param prefix: download only objects with keys starting with the prefix
+        :param workers: number of download threads, by default the number of upload threads
+        :return: number of downloaded files
+    """
 
-        files = self.list_bucket(bucket_name)
-        for f in files:
-            output_file = os.path.join(output_dir, f)
+    def download_bucket(
+        self,
+        bucket_name: str,
+        output_dir: str,
+        prefix: str = "",
+        workers: Optional[int] = None,
+    ) -> int:
+
+        downloads = []
+        for obj in self.list_objects(bucket_name, prefix):
+            output_file = os.path.join(output_dir, *obj.key.split("/"))
             if not os.path.exists(output_file):
-                self.download(bucket_name, f, output_file)
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+                downloads.append((obj.key, output_file))
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers if workers else self._upload_config.workers,
+            thread_name_prefix="sebs-download",
+        ) as pool:
+            futures = [
+                pool.submit(self.download, bucket_name, key, output_file)
+                for key, output_file in downloads
+            ]
+            for fut in concurrent.futures.as_completed(futures):
+                fut.result()
+        return len(downloads)
+
+    """
+        Read objects of a bucket into memory concurrently, without storing them on disk.
+        Objects are returned in the order of completion. At most twice as many objects
+        as threads are requested ahead of the consumer, such that threads are kept busy
+        while the consumer processes completed objects.
+
+        :param bucket_name:
+        :param prefix: read only objects with keys starting with the prefix
+        :param workers: number of download threads, by default the number of upload threads
+        :return: iterator of keys and contents of objects
+    """
+
+    def stream_bucket(
+        self, bucket_name: str, prefix: str = "", workers: Optional[int] = None
+    ) -> Iterator[Tuple[str, bytes]]:
+
+        workers = workers if workers else self._upload_config.workers
+        keys = (obj.key for obj in self.list_objects(bucket_name, prefix))
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="sebs-download"
+        ) as pool:
+            pending: Dict[concurrent.futures.Future, str] = {}
+            try:
+                while True:
+                    for key in keys:
+                        pending[pool.submit(self.read_object, bucket_name, key)] = key
+                        if len(pending) >= 2 * workers:
+                            break
+                    if not pending:
+                        return
+                    done, _ = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for fut in done:
+                        yield pending.pop(fut), fut.result()
+            finally:
+                # the consumer stopped early or reading failed
+                for fut in pending:
+                    fut.cancel()
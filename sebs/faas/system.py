@@ -8,6 +8,7 @@ import docker
 from sebs.benchmark import Benchmark
 from sebs.cache import Cache
 from sebs.config import SeBSConfig
+from sebs.faas.executor import InvocationExecutor
 from sebs.faas.function import Function, Trigger, ExecutionResult
 from sebs.faas.storage import PersistentStorage
 from sebs.utils import LoggingBase
@@ -34,6 +35,7 @@ class System(ABC, LoggingBase):
         self._docker_client = docker_client
         self._cache_client = cache_client
         self._cold_start_counter = randrange(100)
+        self._invocation_executor = InvocationExecutor(**system_config.invocation_executor())
 
     @property
     def system_config(self) -> SeBSConfig:
@@ -47,6 +49,10 @@ class System(ABC, LoggingBase):
     def cache_client(self) -> Cache:
         return self._cache_client
 
+    @property
+    def invocation_executor(self) -> InvocationExecutor:
+        return self._invocation_executor
+
     @property
     def cold_start_counter(self) -> int:
         return self._cold_start_counter
@@ -172,6 +178,7 @@ class System(ABC, LoggingBase):
             )
             self.logging.info("Creating new function! Reason: " + msg)
             function = self.create_function(code_package, func_name)
+            function.archive_hash = code_package.archive_hash
             self.cache_client.add_function(
                 deployment_name=self.name(),
                 language_name=code_package.language_name,
@@ -185,12 +192,28 @@ class System(ABC, LoggingBase):
             cached_function = functions[func_name]
             code_location = code_package.code_location
             function = self.function_type().deserialize(cached_function)
+            function.archive_hash = cached_function.get("archive_hash")
             self.cached_function(function)
             self.logging.info(
                 "Using cached function {fname} in {loc}".format(fname=func_name, loc=code_location)
             )
             # is the function up-to-date?
-            if function.code_package_hash != code_package.hash or rebuilt:
+            code_changed = function.code_package_hash != code_package.hash or rebuilt
+            # an explicitly requested update is never skipped
+            if (
+                code_changed
+                and not code_package.update_code
+                and self.is_archive_deployed(function, code_package)
+            ):
+                self.logging.info(
+                    f"Code package of cached function {func_name} changed, but its archive "
+                    f"is identical to the deployed one, skipping the code update."
+                )
+                function.code_package_hash = code_package.hash
+                self.cache_client.update_function(function)
+                code_package.query_cache()
+                code_changed = False
+            if code_changed:
                 if function.code_package_hash != code_package.hash:
                     self.logging.info(
                         f"Cached function {func_name} with hash "
@@ -205,6 +228,7 @@ class System(ABC, LoggingBase):
                     )
                 self.update_function(function, code_package)
                 function.code_package_hash = code_package.hash
+                function.archive_hash = code_package.archive_hash
                 function.updated_code = True
                 self.cache_client.add_function(
                     deployment_name=self.name(),
@@ -223,6 +247,25 @@ class System(ABC, LoggingBase):
                 self.logging.info(f"Cached function {func_name} is up to date.")
             return function
 
+    """
+        Code packages are reproducible: when the new archive has the same digest as the
+        archive deployed in the cloud, the upload can be skipped, unless the user
+        requested an update with `--update-code`.
+        Platforms storing parts of the code outside of the archive, e.g., in a Docker image,
+        cannot rely on the digest and return False in `code_archive_complete`.
+    """
+
+    @staticmethod
+    def code_archive_complete() -> bool:
+        return True
+
+    def is_archive_deployed(self, function: Function, code_package: Benchmark) -> bool:
+        return (
+            self.code_archive_complete()
+            and code_package.archive_hash is not None
+            and code_package.archive_hash == function.archive_hash
+        )
+
     @abstractmethod
     def update_function_configuration(self, cached_function: Function, benchmark: Benchmark):
         pass
@@ -301,6 +344,10 @@ class System(ABC, LoggingBase):
         finally:
             self.cache_client.unlock()
 
+        cancelled = self._invocation_executor.shutdown()
+        if cancelled > 0:
+            self.logging.info(f"Cancelled {cancelled} pending asynchronous invocations.")
+
     @staticmethod
     @abstractmethod
     def name() -> str:
@@ -5,7 +5,6 @@ import re
 import shutil
 import time
 import math
-import zipfile
 from datetime import datetime, timezone
 from typing import cast, Dict, Optional, Tuple, List, Type
 
@@ -15,6 +14,7 @@ from google.cloud import monitoring_v3
 
 from sebs.cache import Cache
 from sebs.config import SeBSConfig
+from sebs.packaging import create_archive
 from sebs.benchmark import Benchmark
 from ..faas.function import Function, FunctionConfig, Trigger
 from .storage import PersistentStorage
@@ -164,22 +164,11 @@ class GCP(System):
         new_path = os.path.join(directory, new_name)
         shutil.move(old_path, new_path)
 
-        """
-            zip the whole directroy (the zip-file gets uploaded to gcp later)
-
-            Note that the function GCP.recusive_zip is slower than the use of e.g.
-            `utils.execute("zip -qu -r9 {}.zip * .".format(benchmark), shell=True)`
-            or `shutil.make_archive(benchmark_archive, direcory, directory)`
-            But both of the two alternatives need a chance of directory
-            (shutil.make_archive does the directorychange internaly)
-            which leads to a "race condition" when running several benchmarks
-            in parallel, since a change of the current directory is NOT Thread specfic.
-        """
+        # zip the whole directory (the zip-file gets uploaded to gcp later)
         benchmark_archive = "{}.zip".format(os.path.join(directory, benchmark))
-        GCP.recursive_zip(directory, benchmark_archive)
+        bytes_size = create_archive(directory, benchmark_archive, **self.system_config.packaging())
         logging.info("Created {} archive".format(benchmark_archive))
 
-        bytes_size = os.path.getsize(benchmark_archive)
         mbytes = bytes_size / 1024.0 / 1024.0
         logging.info("Zip archive size {:2f} MB".format(mbytes))
 
@@ -273,6 +262,7 @@ class GCP(System):
 
         trigger = LibraryTrigger(func_name, self)
         trigger.logging_handlers = self.logging_handlers
+        trigger.invocation_executor = self.invocation_executor
         function.add_trigger(trigger)
 
         return function
@@ -304,6 +294,7 @@ class GCP(System):
             raise RuntimeError("Not supported!")
 
         trigger.logging_handlers = self.logging_handlers
+        trigger.invocation_executor = self.invocation_executor
         function.add_trigger(trigger)
         self.cache_client.update_function(function)
         return trigger
@@ -316,7 +307,11 @@ class GCP(System):
         for trigger in function.triggers(Trigger.TriggerType.LIBRARY):
             gcp_trigger = cast(LibraryTrigger, trigger)
             gcp_trigger.logging_handlers = self.logging_handlers
+            gcp_trigger.invocation_executor = self.invocation_executor
             gcp_trigger.deployment_client = self
+        for trigger in function.triggers(Trigger.TriggerType.HTTP):
+            trigger.logging_handlers = self.logging_handlers
+            trigger.invocation_executor = self.invocation_executor
 
     def update_function(self, function: Function, code_package: Benchmark):
 
@@ -636,45 +631,3 @@ class GCP(System):
     # @abstractmethod
     # def download_metrics(self):
     #    pass
-
-    """
-       Helper method for recursive_zip
-
-       :param base_directory: path to directory to be zipped
-       :param path: path to file of subdirecotry to be zipped
-       :param archive: ZipFile object
-    """
-
-    @staticmethod
-    def helper_zip(base_directory: str, path: str, archive: zipfile.ZipFile):
-        paths = os.listdir(path)
-        for p in paths:
-            directory = os.path.join(path, p)
-            if os.path.isdir(directory):
-                GCP.helper_zip(base_directory, directory, archive)
-            else:
-                if directory != archive.filename:  # prevent form including itself
-                    archive.write(directory, os.path.relpath(directory, base_directory))
-
-    """
-       https://gist.github.com/felixSchl/d38b455df8bf83a78d3d
-
-       Zip directory with relative paths given an absolute path
-       If the archive exists only new files are added and updated.
-       If the archive does not exist a new one is created.
-
-       :param path: absolute path to the direcotry to be zipped
-       :param archname: path to the zip file
-    """
-
-    @staticmethod
-    def recursive_zip(directory: str, archname: str):
-        archive = zipfile.ZipFile(archname, "w", zipfile.ZIP_DEFLATED, compresslevel=9)
-        if os.path.isdir(directory):
-            GCP.helper_zip(directory, directory, archive)
-        else:
-            # if the passed direcotry is acually a file we just add the file to the zip archive
-            _, name = os.path.split(directory)
-            archive.write(directory, name)
-        archive.close()
-        return True
@@ -1,15 +1,18 @@
 import logging
 import uuid
-from typing import List
+from typing import Iterator, List
 
 from google.cloud import storage as gcp_storage
 from google.api_core import exceptions
 
 from sebs.cache import Cache
-from ..faas.storage import PersistentStorage
+from ..faas.storage import ObjectInfo, PersistentStorage
 
 
 class GCPStorage(PersistentStorage):
+
+    DELETE_BATCH = 100
+
     @staticmethod
     def typename() -> str:
         return "GCP.GCPStorage"
@@ -58,10 +61,14 @@ class GCPStorage(PersistentStorage):
         blob = bucket_instance.blob(key)
         blob.download_to_filename(filepath)
 
+    def read_object(self, bucket_name: str, key: str) -> bytes:
+        return self.client.bucket(bucket_name).blob(key).download_as_bytes()
+
     def upload(self, bucket_name: str, filepath: str, key: str):
         logging.info("Upload {} to {}".format(filepath, bucket_name))
         bucket_instance = self.client.bucket(bucket_name)
-        blob = bucket_instance.blob(key, chunk_size=4 * 1024 * 1024)
+        # resumable uploads send chunks of the part size, a multiple of 256 KiB
+        blob = bucket_instance.blob(key, chunk_size=self.upload_config.part_size * 1024 * 1024)
         gcp_storage.blob._MAX_MULTIPART_SIZE = 5 * 1024 * 1024  # workaround for connection timeout
         blob.upload_from_filename(filepath)
 
@@ -72,28 +79,23 @@ class GCPStorage(PersistentStorage):
         except exceptions.Forbidden:
             return False
 
-    def list_bucket(self, bucket_name: str) -> List[str]:
-        bucket_instance = self.client.get_bucket(bucket_name)
-        all_blobs = list(self.client.list_blobs(bucket_instance))
-        blobs = [blob.name for blob in all_blobs]
-        return blobs
+    def list_objects(self, bucket_name: str, prefix: str = "") -> Iterator[ObjectInfo]:
+        # the iterator requests next pages of results
+        for blob in self.client.list_blobs(bucket_name, prefix=prefix or None):
+            yield ObjectInfo(
+                blob.name, blob.size, blob.etag, ObjectInfo.md5_from_base64(blob.md5_hash)
+            )
 
     def list_buckets(self, bucket_name: str) -> List[str]:
         all_buckets = list(self.client.list_buckets())
         buckets = [bucket.name for bucket in all_buckets]
         return buckets
 
-    def clean_bucket(self, bucket: str):
-        raise NotImplementedError()
-
-    def uploader_func(self, bucket_idx: int, key: str, filepath: str) -> None:
-        if self.cached and not self.replace_existing:
-            return
-        bucket_name = self.input_buckets[bucket_idx]
-        if not self.replace_existing:
-            for blob in self.input_buckets_files[bucket_idx]:
-                if key == blob:
-                    logging.info("Skipping upload of {} to {}".format(filepath, bucket_name))
-                    return
-        bucket_name = self.input_buckets[bucket_idx]
-        self.upload(bucket_name, filepath, key)
+    def _delete_objects(self, bucket_name: str, keys: List[str]):
+        bucket_instance = self.client.bucket(bucket_name)
+        # a batch request contains at most 100 calls
+        for begin in range(0, len(keys), self.DELETE_BATCH):
+            end = begin + self.DELETE_BATCH
+            with self.client.batch():
+                for key in keys[begin:end]:
+                    bucket_instance.delete_blob(key)
@@ -0,0 +1,338 @@
+import http.client
+import http.server
+import json
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sebs.utils import LoggingBase
+
+"""
+    Emulation of a FaaS platform for the local deployment.
+
+    A router running in the SeBS process receives invocations and forwards them
+    to a pool of function containers. Warm containers are reused, the pool scales
+    out when requests are queued, and containers idle for longer than the keep-alive
+    period are stopped. New containers are started from scratch, such that
+    invocations routed to them are real cold starts.
+"""
+
+
+@dataclass
+class AutoscalerConfig:
+    enabled: bool = False
+    # seconds before an idle container is evicted
+    keep_alive: int = 300
+    min_instances: int = 0
+    max_instances: int = 16
+    # seconds to wait for the server of a new container
+    startup_timeout: int = 60
+
+    @staticmethod
+    def deserialize(data: dict) -> "AutoscalerConfig":
+        keys = list(AutoscalerConfig.__dataclass_fields__.keys())
+        data = {k: v for k, v in data.items() if k in keys}
+        return AutoscalerConfig(**data)
+
+    def serialize(self) -> dict:
+        return self.__dict__
+
+
+"""
+    Wait until a server accepts connections.
+"""
+
+
+def wait_for_server(address: str, port: int, timeout: int):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((address, port), timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f"Server at {address}:{port} did not start in {timeout} seconds!"
+                )
+            time.sleep(0.05)
+
+
+class Instance:
+
+    __slots__ = ("container", "address", "port", "in_flight", "last_used")
+
+    def __init__(self, container, address: str, port: int):
+        self.container = container
+        self.address = address
+        self.port = port
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+
+class Autoscaler(LoggingBase):
+
+    HOST = "127.0.0.1"
+    # seconds
+    TIMEOUT_GRACE = 5
+
+    """
+    :param name: function name
+    :param start_container: starts a new function container
+    :param port: port of the function server inside containers
+    :param concurrency: number of requests served concurrently by a container
+    :param timeout: function timeout in seconds
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: AutoscalerConfig,
+        start_container: Callable[[], Any],
+        port: int,
+        concurrency: int = 1,
+        timeout: int = 0,
+    ):
+        super().__init__()
+        self._name = name
+        self._config = config
+        self._start_container = start_container
+        self._port = port
+        self._concurrency = concurrency
+        self._timeout = timeout
+        self._instances: List[Instance] = []
+        self._starting = 0
+        self._queued = 0
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+
+        router = self
+
+        class RequestHandler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, data = router.invoke(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                router.logging.debug(format % args)
+
+        self._server = http.server.ThreadingHTTPServer((Autoscaler.HOST, 0), RequestHandler)
+        self._server.daemon_threads = True
+        self._threads = [
+            threading.Thread(
+                target=self._server.serve_forever, name=f"sebs-router-{name}", daemon=True
+            ),
+            threading.Thread(target=self._evict_idle, name=f"sebs-evict-{name}", daemon=True),
+        ]
+
+    @staticmethod
+    def typename() -> str:
+        return "Local.Autoscaler"
+
+    @property
+    def url(self) -> str:
+        return f"{Autoscaler.HOST}:{self._server.server_port}"
+
+    @property
+    def instances(self) -> int:
+        with self._cond:
+            return len(self._instances)
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        for _ in range(self._config.min_instances):
+            instance = self._launch()
+            with self._cond:
+                self._instances.append(instance)
+        self.logging.info(f"Router of function {self._name} listening on {self.url}")
+
+    """
+        Start a container and wait until its server accepts connections.
+    """
+
+    def _launch(self) -> Instance:
+        container = self._start_container()
+        container.reload()
+        address = container.attrs["NetworkSettings"]["Networks"]["bridge"]["IPAddress"]
+        try:
+            wait_for_server(address, self._port, self._config.startup_timeout)
+        except RuntimeError:
+            container.stop(timeout=0)
+            raise
+        self.logging.info(f"Started container {container.id} of function {self._name}")
+        return Instance(container, address, self._port)
+
+    """
+        Select the most recently used container with a free slot, such that
+        the remaining ones become idle and can be evicted.
+        When there is none, start a new container if the number of queued
+        requests exceeds the number of containers being started.
+
+        :return: instance and the duration of its startup in seconds, zero when warm
+    """
+
+    def _acquire(self) -> Tuple[Instance, float]:
+        with self._cond:
+            self._queued += 1
+            try:
+                while True:
+                    available = [
+                        inst for inst in self._instances if inst.in_flight < self._concurrency
+                    ]
+                    if available:
+                        instance = max(available, key=lambda inst: inst.last_used)
+                        instance.in_flight += 1
+                        return instance, 0.0
+                    total = len(self._instances) + self._starting
+                    if total < self._config.max_instances and self._queued > self._starting:
+                        self._starting += 1
+                        break
+                    self._cond.wait()
+            finally:
+                self._queued -= 1
+
+        begin = time.monotonic()
+        new_instance: Optional[Instance] = None
+        try:
+            new_instance = self._launch()
+        finally:
+            with self._cond:
+                self._starting -= 1
+                if new_instance is not None:
+                    new_instance.in_flight += 1
+                    self._instances.append(new_instance)
+                self._cond.notify_all()
+        return new_instance, time.monotonic() - begin
+
+    def _release(self, instance: Instance, failed: bool = False):
+        with self._cond:
+            instance.in_flight -= 1
+            instance.last_used = time.monotonic()
+            if failed and instance in self._instances:
+                self._instances.remove(instance)
+            self._cond.notify_all()
+        if failed:
+            self._stop(instance)
+
+    """
+        Forward a request to a function container.
+        The JSON output is extended with the router's measurements in microseconds:
+        time spent waiting for a container and the startup time of a new container.
+
+        :return: HTTP status and response body
+    """
+
+    def invoke(self, body: bytes) -> Tuple[int, bytes]:
+
+        begin = time.monotonic()
+        try:
+            instance, startup = self._acquire()
+        except Exception as e:
+            return 503, json.dumps({"result": f"Error - {e}"}).encode()
+        queue_time = time.monotonic() - begin - startup
+
+        failed = False
+        try:
+            # the server terminates requests after the timeout, the router waits longer
+            conn = http.client.HTTPConnection(
+                instance.address,
+                instance.port,
+                timeout=self._timeout + Autoscaler.TIMEOUT_GRACE if self._timeout > 0 else None,
+            )
+            conn.request("POST", "/", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            status, data = response.status, response.read()
+            conn.close()
+        except socket.timeout:
+            failed = True
+            return 504, json.dumps({"result": "Error - function timed out!"}).encode()
+        except (OSError, http.client.HTTPException) as e:
+            failed = True
+            return 502, json.dumps({"result": f"Error - invocation failed! Reason: {e}"}).encode()
+        finally:
+            self._release(instance, failed)
+
+        try:
+            output = json.loads(data)
+        except json.decoder.JSONDecodeError:
+            return status, data
+        if isinstance(output, dict):
+            output["router"] = {
+                "instance": instance.container.id,
+                "queue_time": int(queue_time * 1000000),
+                "container_start": int(startup * 1000000),
+            }
+            data = json.dumps(output).encode()
+        return status, data
+
+    def _stop(self, instance: Instance):
+        self.logging.info(f"Stopping container {instance.container.id} of function {self._name}")
+        try:
+            instance.container.stop(timeout=0)
+        except Exception as e:
+            self.logging.error(f"Failed to stop container {instance.container.id}: {e}")
+
+    def _evict_idle(self):
+        period = min(1.0, max(self._config.keep_alive / 4.0, 0.1))
+        while not self._stopped.wait(period):
+            now = time.monotonic()
+            evicted = []
+            with self._cond:
+                for instance in sorted(self._instances, key=lambda inst: inst.last_used):
+                    if len(self._instances) <= self._config.min_instances:
+                        break
+                    if (
+                        instance.in_flight == 0
+                        and now - instance.last_used > self._config.keep_alive
+                    ):
+                        self._instances.remove(instance)
+                        evicted.append(instance)
+            for instance in evicted:
+                self._stop(instance)
+
+    """
+        Stop all containers, e.g., to enforce cold starts.
+        Waits until invocations in progress are finished.
+
+        :return: number of evicted containers
+    """
+
+    def evict_all(self) -> int:
+        with self._cond:
+            while any(inst.in_flight > 0 for inst in self._instances):
+                self._cond.wait()
+            evicted = self._instances
+            self._instances = []
+        for instance in evicted:
+            self._stop(instance)
+        return len(evicted)
+
+    """
+        Apply new resource limits to running containers.
+        A new timeout is passed to servers only in new containers,
+        thus existing containers are evicted.
+    """
+
+    def reconfigure(self, limits: Dict[str, Any], timeout: int):
+        with self._cond:
+            restart = timeout != self._timeout
+            self._timeout = timeout
+            instances = list(self._instances)
+        if restart:
+            self.evict_all()
+        elif limits:
+            for instance in instances:
+                instance.container.update(**limits)
+
+    def shutdown(self):
+        self._stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+        self.evict_all()
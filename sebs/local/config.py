@@ -1,7 +1,9 @@
+from dataclasses import dataclass
 from typing import cast, Optional
 
 from sebs.cache import Cache
 from sebs.faas.config import Config, Credentials, Resources
+from sebs.local.autoscaler import AutoscalerConfig
 from sebs.storage.minio import MinioConfig
 from sebs.utils import LoggingHandlers
 
@@ -43,11 +45,39 @@ class LocalResources(Resources):
         return ret
 
 
+"""
+    Limits of function containers, derived from the memory configured for a function.
+"""
+
+
+@dataclass
+class ResourceLimits:
+    # disabled by default: containers use all CPUs and memory of the host, as before
+    enabled: bool = False
+    # memory corresponding to one vCPU
+    memory_per_vcpu: int = 1769
+    # CPUs available to functions, e.g., "0-3"
+    cpuset: str = ""
+
+    @staticmethod
+    def deserialize(data: dict) -> "ResourceLimits":
+        keys = list(ResourceLimits.__dataclass_fields__.keys())
+        data = {k: v for k, v in data.items() if k in keys}
+        return ResourceLimits(**data)
+
+    def serialize(self) -> dict:
+        return self.__dict__
+
+
 class LocalConfig(Config):
     def __init__(self):
         super().__init__()
         self._credentials = LocalCredentials()
         self._resources = LocalResources()
+        self._server_workers = 1
+        self._server_threads = 1
+        self._autoscaler = AutoscalerConfig()
+        self._limits = ResourceLimits()
 
     @staticmethod
     def typename() -> str:
@@ -69,6 +99,32 @@ class LocalConfig(Config):
     def resources(self, val: LocalResources):
         self._resources = val
 
+    """
+        Number of server processes in each function container; each process
+        corresponds to a separate function instance with its own cold start.
+    """
+
+    @property
+    def server_workers(self) -> int:
+        return self._server_workers
+
+    """
+        Number of threads serving concurrent requests in each server process.
+        Not used by Node.js servers, which rely on the event loop.
+    """
+
+    @property
+    def server_threads(self) -> int:
+        return self._server_threads
+
+    @property
+    def autoscaler(self) -> AutoscalerConfig:
+        return self._autoscaler
+
+    @property
+    def limits(self) -> ResourceLimits:
+        return self._limits
+
     @staticmethod
     def deserialize(config: dict, cache: Cache, handlers: LoggingHandlers) -> Config:
 
@@ -76,6 +132,11 @@ class LocalConfig(Config):
         config_obj.resources = cast(
             LocalResources, LocalResources.deserialize(config, cache, handlers)
         )
+        server = config.get("server", {})
+        config_obj._server_workers = server.get("workers", 1)
+        config_obj._server_threads = server.get("threads", 1)
+        config_obj._autoscaler = AutoscalerConfig.deserialize(config.get("autoscaler", {}))
+        config_obj._limits = ResourceLimits.deserialize(config.get("limits", {}))
         config_obj.logging_handlers = handlers
         return config_obj
 
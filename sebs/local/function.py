@@ -1,9 +1,10 @@
 import concurrent.futures
 import docker
 import json
-from typing import Optional
+from typing import cast, List, Optional
 
 from sebs.faas.function import ExecutionResult, Function, FunctionConfig, Trigger
+from sebs.local.autoscaler import Autoscaler, wait_for_server
 
 
 class HTTPTrigger(Trigger):
@@ -23,10 +24,8 @@ class HTTPTrigger(Trigger):
         self.logging.debug(f"Invoke function {self.url}")
         return self._http_invoke(payload, self.url)
 
-    def async_invoke(self, payload: dict) -> concurrent.futures.Future:
-        pool = concurrent.futures.ThreadPoolExecutor()
-        fut = pool.submit(self.sync_invoke, payload)
-        return fut
+    def burst_invoke(self, payload: dict, invocations: int) -> List[concurrent.futures.Future]:
+        return self._http_burst_invoke(payload, self.url, invocations)
 
     def serialize(self) -> dict:
         return {"type": "HTTP", "url": self.url}
@@ -36,6 +35,13 @@ class HTTPTrigger(Trigger):
         return HTTPTrigger(obj["url"])
 
 
+"""
+    A function runs either in a single container, or in a pool of containers managed
+    by an autoscaler. Functions of the second kind have no container and store
+    the location of their code, which is mounted into new containers.
+"""
+
+
 class LocalFunction(Function):
     def __init__(
         self,
@@ -46,15 +52,25 @@ class LocalFunction(Function):
         code_package_hash: str,
         config: FunctionConfig,
         measurement_pid: Optional[int] = None,
+        code_location: Optional[str] = None,
     ):
         super().__init__(benchmark, name, code_package_hash, config)
         self._instance = docker_container
-        self._instance_id = docker_container.id
+        self._port = port
+        self._measurement_pid = measurement_pid
+        self._code_location = code_location
+        self._autoscaler: Optional[Autoscaler] = None
+        self._instance_id: Optional[str] = None
+        self._url = ""
+        if docker_container is not None:
+            self._instance_id = docker_container.id
+            self._update_url()
+
+    def _update_url(self):
         self._instance.reload()
         networks = self._instance.attrs["NetworkSettings"]["Networks"]
-        self._port = port
         self._url = "{IPAddress}:{Port}".format(
-            IPAddress=networks["bridge"]["IPAddress"], Port=port
+            IPAddress=networks["bridge"]["IPAddress"], Port=self._port
         )
         if not self._url:
             self.logging.error(
@@ -64,8 +80,57 @@ class LocalFunction(Function):
             raise RuntimeError(
                 f"Incorrect detection of IP address for container with id {self._instance_id}"
             )
+        for trigger in self.triggers(Trigger.TriggerType.HTTP):
+            cast(HTTPTrigger, trigger).url = self._url
 
-        self._measurement_pid = measurement_pid
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def container(self):
+        return self._instance
+
+    """
+        Replace the container, e.g., to change its environment.
+    """
+
+    def replace_container(self, container, timeout: int = 60):
+        self.logging.info(f"Replacing function container {self._instance_id} with {container.id}")
+        self._instance.stop(timeout=0)
+        self._instance = container
+        self._instance_id = container.id
+        self._update_url()
+        address, port = self._url.rsplit(":", 1)
+        wait_for_server(address, int(port), timeout)
+
+    @property
+    def autoscaled(self) -> bool:
+        return self._instance is None
+
+    @property
+    def code_location(self) -> Optional[str]:
+        return self._code_location
+
+    @code_location.setter
+    def code_location(self, code_location: str):
+        self._code_location = code_location
+
+    """
+        Router of an autoscaled function. Autoscalers do not survive the SeBS process,
+        and a new one is attached to cached functions.
+    """
+
+    @property
+    def autoscaler(self) -> Optional[Autoscaler]:
+        return self._autoscaler
+
+    @autoscaler.setter
+    def autoscaler(self, autoscaler: Autoscaler):
+        self._autoscaler = autoscaler
+        self._url = autoscaler.url
+        for trigger in self.triggers(Trigger.TriggerType.HTTP):
+            cast(HTTPTrigger, trigger).url = self._url
 
     @property
     def memory_measurement_pid(self) -> Optional[int]:
@@ -76,15 +141,28 @@ class LocalFunction(Function):
         return "Local.LocalFunction"
 
     def serialize(self) -> dict:
-        return {
+        ret = {
             **super().serialize(),
             "instance_id": self._instance_id,
             "url": self._url,
             "port": self._port,
         }
+        if self._code_location is not None:
+            ret["code_location"] = self._code_location
+        return ret
 
     @staticmethod
     def deserialize(cached_config: dict) -> "LocalFunction":
+        if cached_config.get("instance_id") is None:
+            return LocalFunction(
+                None,
+                cached_config["port"],
+                cached_config["name"],
+                cached_config["benchmark"],
+                cached_config["hash"],
+                FunctionConfig.deserialize(cached_config["config"]),
+                code_location=cached_config["code_location"],
+            )
         try:
             instance_id = cached_config["instance_id"]
             instance = docker.from_env().containers.get(instance_id)
@@ -96,11 +174,33 @@ class LocalFunction(Function):
                 cached_config["benchmark"],
                 cached_config["hash"],
                 cfg,
+                code_location=cached_config.get("code_location"),
             )
         except docker.errors.NotFound:
             raise RuntimeError(f"Cached container {instance_id} not available anymore!")
 
+    """
+        Restart the container, such that the next invocation is a cold start.
+        Autoscaled functions stop all of their containers instead.
+    """
+
+    def restart(self, timeout: int = 60):
+        if self._autoscaler is not None:
+            self._autoscaler.evict_all()
+        elif self._instance is not None:
+            self.logging.info(f"Restarting function container {self._instance_id}")
+            self._instance.restart(timeout=0)
+            self._update_url()
+            address, port = self._url.rsplit(":", 1)
+            wait_for_server(address, int(port), timeout)
+
     def stop(self):
+        if self._autoscaler is not None:
+            self._autoscaler.shutdown()
+            return
+        if self._instance is None:
+            # the router stopped together with the SeBS process that created it
+            return
         self.logging.info(f"Stopping function container {self._instance_id}")
         self._instance.stop(timeout=0)
         self.logging.info(f"Function container {self._instance_id} stopped succesfully")
@@ -1,6 +1,6 @@
 import os
 import shutil
-from typing import cast, Dict, List, Optional, Type, Tuple  # noqa
+from typing import Any, cast, Dict, List, Optional, Type, Tuple  # noqa
 import subprocess
 
 import docker
@@ -8,6 +8,7 @@ import docker
 from sebs.cache import Cache
 from sebs.config import SeBSConfig
 from sebs.utils import LoggingHandlers
+from sebs.local.autoscaler import Autoscaler
 from sebs.local.config import LocalConfig
 from sebs.storage.minio import Minio
 from sebs.local.function import LocalFunction
@@ -20,6 +21,8 @@ from sebs.benchmark import Benchmark
 class Local(System):
 
     DEFAULT_PORT = 9000
+    # period of the CFS scheduler in microseconds
+    CPU_PERIOD = 100000
 
     @staticmethod
     def name():
@@ -72,6 +75,7 @@ class Local(System):
         self._memory_measurement_path: Optional[str] = None
         # disable external measurements
         self._measure_interval = -1
+        self._autoscalers: List[Autoscaler] = []
 
     """
         Create wrapper object for minio storage and fill buckets.
@@ -103,7 +107,9 @@ class Local(System):
     """
 
     def shutdown(self):
-        pass
+        for autoscaler in self._autoscalers:
+            autoscaler.shutdown()
+        self.invocation_executor.shutdown()
 
     """
         It would be sufficient to just pack the code and ship it as zip to AWS.
@@ -151,34 +157,58 @@ class Local(System):
 
         return directory, bytes_size
 
-    def create_function(self, code_package: Benchmark, func_name: str) -> "LocalFunction":
+    """
+        Docker limits corresponding to the function configuration: memory without swap,
+        and CPU time proportional to memory, with one vCPU per 1769 MB as on AWS Lambda.
+        CPU time is limited with the CFS quota, which can be changed in running containers.
+    """
+
+    def _resource_limits(self, config: FunctionConfig) -> Dict[str, Any]:
+        limits = self.config.limits
+        if not limits.enabled:
+            return {}
+        cpus = min(config.memory / limits.memory_per_vcpu, float(os.cpu_count() or 1))
+        ret: Dict[str, Any] = {
+            "mem_limit": f"{config.memory}m",
+            "memswap_limit": f"{config.memory}m",
+            "cpu_period": self.CPU_PERIOD,
+            # Docker does not accept quotas below 1 ms
+            "cpu_quota": max(int(cpus * self.CPU_PERIOD), 1000),
+        }
+        if limits.cpuset:
+            ret["cpuset_cpus"] = limits.cpuset
+        return ret
+
+    def _start_container(self, code_location: str, config: FunctionConfig):
 
+        language = config.runtime.language.value
         container_name = "{}:run.local.{}.{}".format(
             self._system_config.docker_repository(),
-            code_package.language_name,
-            code_package.language_version,
+            language,
+            config.runtime.version,
         )
-        environment: Dict[str, str] = {}
+        environment: Dict[str, str] = {
+            "SEBS_SERVER_WORKERS": str(self.config.server_workers),
+            "SEBS_SERVER_THREADS": str(self.config.server_threads),
+            # requests exceeding the timeout are terminated by the server
+            "SEBS_FUNCTION_TIMEOUT": str(config.timeout),
+        }
         if self.config.resources.storage_config:
             environment = {
+                **environment,
                 "MINIO_ADDRESS": self.config.resources.storage_config.address,
                 "MINIO_ACCESS_KEY": self.config.resources.storage_config.access_key,
                 "MINIO_SECRET_KEY": self.config.resources.storage_config.secret_key,
                 "CONTAINER_UID": str(os.getuid()),
                 "CONTAINER_GID": str(os.getgid()),
-                "CONTAINER_USER": self._system_config.username(
-                    self.name(), code_package.language_name
-                ),
+                "CONTAINER_USER": self._system_config.username(self.name(), language),
             }
-        container = self._docker_client.containers.run(
+        return self._docker_client.containers.run(
             image=container_name,
             command=f"/bin/bash /sebs/run_server.sh {self.DEFAULT_PORT}",
-            volumes={code_package.code_location: {"bind": "/function", "mode": "ro"}},
+            volumes={code_location: {"bind": "/function", "mode": "ro"}},
             environment=environment,
-            # FIXME: make CPUs configurable
-            # FIXME: configure memory
-            # FIXME: configure timeout
-            # cpuset_cpus=cpuset,
+            **self._resource_limits(config),
             # required to access perf counters
             # alternative: use custom seccomp profile
             privileged=True,
@@ -192,6 +222,42 @@ class Local(System):
             # tty=True,
         )
 
+    """
+        Start the router of an autoscaled function. New containers mount
+        the current code location of the function.
+    """
+
+    def _start_autoscaler(self, function: LocalFunction) -> Autoscaler:
+        autoscaler = Autoscaler(
+            function.name,
+            self.config.autoscaler,
+            lambda: self._start_container(cast(str, function.code_location), function.config),
+            self.DEFAULT_PORT,
+            self.config.server_workers * self.config.server_threads,
+            function.config.timeout,
+        )
+        autoscaler.logging_handlers = self.logging_handlers
+        autoscaler.start()
+        self._autoscalers.append(autoscaler)
+        return autoscaler
+
+    def create_function(self, code_package: Benchmark, func_name: str) -> "LocalFunction":
+
+        function_cfg = FunctionConfig.from_benchmark(code_package)
+        if self.config.autoscaler.enabled:
+            func = LocalFunction(
+                None,
+                self.DEFAULT_PORT,
+                func_name,
+                code_package.benchmark,
+                code_package.hash,
+                function_cfg,
+                code_location=code_package.code_location,
+            )
+            func.autoscaler = self._start_autoscaler(func)
+            return func
+
+        container = self._start_container(code_package.code_location, function_cfg)
         pid: Optional[int] = None
         if self.measurements_enabled and self._memory_measurement_path is not None:
             # launch subprocess to measure memory
@@ -209,7 +275,6 @@ class Local(System):
             )
             pid = proc.pid
 
-        function_cfg = FunctionConfig.from_benchmark(code_package)
         func = LocalFunction(
             container,
             self.DEFAULT_PORT,
@@ -218,6 +283,7 @@ class Local(System):
             code_package.hash,
             function_cfg,
             pid,
+            code_package.code_location,
         )
         self.logging.info(
             f"Started {func_name} function at container {container.id} , running on {func._url}"
@@ -225,11 +291,14 @@ class Local(System):
         return func
 
     """
-        FIXME: restart Docker?
+        Code is mounted into containers, thus restarting them is sufficient
+        to load the new version.
     """
 
     def update_function(self, function: Function, code_package: Benchmark):
-        pass
+        func = cast(LocalFunction, function)
+        func.code_location = code_package.code_location
+        func.restart()
 
     """
         For local functions, we don't need to do anything for a cached function.
@@ -243,6 +312,7 @@ class Local(System):
         if trigger_type == Trigger.TriggerType.HTTP:
             trigger = HTTPTrigger(function._url)
             trigger.logging_handlers = self.logging_handlers
+            trigger.invocation_executor = self.invocation_executor
         else:
             raise RuntimeError("Not supported!")
 
@@ -251,11 +321,45 @@ class Local(System):
         return trigger
 
     def cached_function(self, function: Function):
-        pass
+        func = cast(LocalFunction, function)
+        if func.autoscaled and func.autoscaler is None:
+            func.autoscaler = self._start_autoscaler(func)
+
+    """
+        Memory and CPU limits are changed in running containers.
+        The timeout is passed to the server when the container starts,
+        thus its change requires new containers. It is rejected when the memory
+        of the function is measured, since measurements follow the original container.
+    """
 
     def update_function_configuration(self, function: Function, code_package: Benchmark):
-        self.logging.error("Updating function configuration of local deployment is not supported")
-        raise RuntimeError("Updating function configuration of local deployment is not supported")
+        func = cast(LocalFunction, function)
+        limits = self._resource_limits(func.config)
+        if func.autoscaler is not None:
+            func.autoscaler.reconfigure(limits, func.config.timeout)
+        elif func.container is not None:
+            env = func.container.attrs["Config"]["Env"]
+            if f"SEBS_FUNCTION_TIMEOUT={func.config.timeout}" in env:
+                if limits:
+                    func.container.update(**limits)
+            else:
+                if func.code_location is None:
+                    raise RuntimeError(
+                        f"Changing the timeout of function {func.name} requires its redeployment."
+                    )
+                # the measurement process watches a single container
+                if func.memory_measurement_pid is not None:
+                    raise RuntimeError(
+                        f"Changing the timeout of function {func.name} requires a new container, "
+                        "which is not supported while its memory is measured."
+                    )
+                func.replace_container(
+                    self._start_container(cast(str, func.code_location), func.config)
+                )
+        self.logging.info(
+            f"Updated configuration of function {func.name}: memory {func.config.memory} MB, "
+            f"timeout {func.config.timeout} s."
+        )
 
     def download_metrics(
         self,
@@ -268,7 +372,8 @@ class Local(System):
         pass
 
     def enforce_cold_start(self, functions: List[Function], code_package: Benchmark):
-        raise NotImplementedError()
+        for func in functions:
+            cast(LocalFunction, func).restart()
 
     @staticmethod
     def default_function_name(code_package: Benchmark) -> str:
@@ -11,6 +11,7 @@ from sebs.faas import System, PersistentStorage
 from sebs.faas.function import Function, ExecutionResult, Trigger
 from sebs.openwhisk.storage import Minio
 from sebs.openwhisk.triggers import LibraryTrigger, HTTPTrigger
+from sebs.packaging import create_archive
 from sebs.utils import DOCKER_DIR, LoggingHandlers, execute
 from .config import OpenWhiskConfig
 from .function import OpenWhiskFunction, OpenWhiskFunctionConfig
@@ -85,6 +86,11 @@ class OpenWhisk(System):
     def function_type() -> "Type[Function]":
         return OpenWhiskFunction
 
+    # dependencies are installed in the Docker image, not in the archive
+    @staticmethod
+    def code_archive_complete() -> bool:
+        return False
+
     def get_wsk_cmd(self) -> List[str]:
         cmd = [self.config.wsk_exec]
         if self.config.wsk_bypass_security:
@@ -219,11 +225,13 @@ class OpenWhisk(System):
         package_config = CONFIG_FILES[language_name]
 
         benchmark_archive = os.path.join(directory, f"{benchmark}.zip")
-        subprocess.run(
-            ["zip", benchmark_archive] + package_config, stdout=subprocess.DEVNULL, cwd=directory
+        bytes_size = create_archive(
+            directory,
+            benchmark_archive,
+            members=package_config,
+            **self.system_config.packaging(),
         )
         self.logging.info(f"Created {benchmark_archive} archive")
-        bytes_size = os.path.getsize(benchmark_archive)
         self.logging.info("Zip archive size {:2f} MB".format(bytes_size / 1024.0 / 1024.0))
         return benchmark_archive, bytes_size
 
@@ -313,6 +321,7 @@ class OpenWhisk(System):
         # Add LibraryTrigger to a new function
         trigger = LibraryTrigger(func_name, self.get_wsk_cmd())
         trigger.logging_handlers = self.logging_handlers
+        trigger.invocation_executor = self.invocation_executor
         res.add_trigger(trigger)
 
         return res
@@ -441,6 +450,7 @@ class OpenWhisk(System):
             url = stdout.strip().split("\n")[-1] + ".json"
             trigger = HTTPTrigger(function.name, url)
             trigger.logging_handlers = self.logging_handlers
+            trigger.invocation_executor = self.invocation_executor
             function.add_trigger(trigger)
             self.cache_client.update_function(function)
             return trigger
@@ -450,6 +460,8 @@ class OpenWhisk(System):
     def cached_function(self, function: Function):
         for trigger in function.triggers(Trigger.TriggerType.LIBRARY):
             trigger.logging_handlers = self.logging_handlers
+            trigger.invocation_executor = self.invocation_executor
             cast(LibraryTrigger, trigger).wsk_cmd = self.get_wsk_cmd()
         for trigger in function.triggers(Trigger.TriggerType.HTTP):
             trigger.logging_handlers = self.logging_handlers
+            trigger.invocation_executor = self.invocation_executor
@@ -63,11 +63,6 @@ class LibraryTrigger(Trigger):
         openwhisk_result.parse_benchmark_output(return_content)
         return openwhisk_result
 
-    def async_invoke(self, payload: dict) -> concurrent.futures.Future:
-        pool = concurrent.futures.ThreadPoolExecutor()
-        fut = pool.submit(self.sync_invoke, payload)
-        return fut
-
     def serialize(self) -> dict:
         return {"type": "Library", "name": self.fname}
 
@@ -98,10 +93,8 @@ class HTTPTrigger(Trigger):
         self.logging.debug(f"Invoke function {self.url}")
         return self._http_invoke(payload, self.url, False)
 
-    def async_invoke(self, payload: dict) -> concurrent.futures.Future:
-        pool = concurrent.futures.ThreadPoolExecutor()
-        fut = pool.submit(self.sync_invoke, payload)
-        return fut
+    def burst_invoke(self, payload: dict, invocations: int) -> List[concurrent.futures.Future]:
+        return self._http_burst_invoke(payload, self.url, invocations, False)
 
     def serialize(self) -> dict:
         return {"type": "HTTP", "fname": self.fname, "url": self.url}
@@ -0,0 +1,321 @@
+import collections
+import concurrent.futures
+import copy
+import os
+import shutil
+import stat
+import struct
+import tempfile
+import zipfile
+import zlib
+from typing import Deque, Iterable, List, Optional, Tuple
+
+"""
+    In-process creation and modification of zip archives.
+
+    Members are compressed by a pool of threads, since zlib releases the GIL.
+    Files larger than `CHUNK_SIZE` are split into chunks deflated in parallel;
+    each chunk is primed with the last 32 KiB of the previous one and the raw
+    deflate streams are concatenated into a single member, as in pigz.
+    Compressed data is written directly to the archive, without a second pass.
+
+    Archives are reproducible: members are sorted, timestamps are fixed and
+    permissions are normalized, so identical code produces byte-identical archives.
+"""
+
+CHUNK_SIZE = 1024 * 1024
+# size of the deflate window
+DICTIONARY_SIZE = 32 * 1024
+# bit 3 of general purpose flags: sizes and CRC are stored after the data
+DATA_DESCRIPTOR_FLAG = 0x08
+# earliest timestamp supported by zip
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def _zinfo(arcname: str, executable: bool = False) -> zipfile.ZipInfo:
+    zinfo = zipfile.ZipInfo(arcname, date_time=FIXED_DATE_TIME)
+    zinfo.create_system = 3
+    zinfo.external_attr = ((0o755 if executable else 0o644) | stat.S_IFREG) << 16
+    return zinfo
+
+
+def _deflate(data: memoryview, level: int, zdict: Optional[bytes], last: bool) -> bytes:
+    if zdict:
+        compressor = zlib.compressobj(
+            level,
+            zlib.DEFLATED,
+            -zlib.MAX_WBITS,
+            zlib.DEF_MEM_LEVEL,
+            zlib.Z_DEFAULT_STRATEGY,
+            zdict,
+        )
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    # non-final chunks end on a byte boundary without the final block marker
+    return compressor.compress(data) + compressor.flush(
+        zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+    )
+
+
+"""
+    ZipFile has no public API to write precompressed members or to remove members,
+    thus its private state is updated here, in the same way as in `ZipFile.writestr`:
+    `_writecheck` validates a new member, `_didModify` makes `close` write the central
+    directory, and `start_dir` is the offset of the central directory.
+    Checked against CPython 3.7 to 3.13.
+
+    :param archive: archive opened for writing or appending
+    :param start_dir: offset of the central directory
+    :param zinfo: new member to be validated
+"""
+
+_ZIPFILE_ATTRIBUTES = ("_writecheck", "_didModify", "start_dir")
+
+
+def _update_zipfile(
+    archive: zipfile.ZipFile, start_dir: int, zinfo: Optional[zipfile.ZipInfo] = None
+):
+    missing = [attr for attr in _ZIPFILE_ATTRIBUTES if not hasattr(archive, attr)]
+    if missing:
+        raise RuntimeError(
+            f"Unsupported zipfile implementation, missing attributes: {', '.join(missing)}!"
+        )
+    if zinfo is not None:
+        archive._writecheck(zinfo)  # type: ignore
+    archive._didModify = True  # type: ignore
+    archive.start_dir = start_dir  # type: ignore
+
+
+"""
+    Write member with precomputed CRC and sizes, followed by its compressed data.
+"""
+
+
+def _write_raw(archive: zipfile.ZipFile, zinfo: zipfile.ZipInfo, chunks: Iterable[bytes]):
+    assert archive.fp is not None
+    zinfo.flag_bits &= ~DATA_DESCRIPTOR_FLAG
+    zinfo.header_offset = archive.fp.tell()
+    _update_zipfile(archive, zinfo.header_offset, zinfo)
+    archive.fp.write(zinfo.FileHeader())
+    for chunk in chunks:
+        archive.fp.write(chunk)
+    archive.filelist.append(zinfo)
+    archive.NameToInfo[zinfo.filename] = zinfo
+    _update_zipfile(archive, archive.fp.tell())
+
+
+def _read_raw(archive: zipfile.ZipFile, zinfo: zipfile.ZipInfo) -> Iterable[bytes]:
+    assert archive.fp is not None
+    archive.fp.seek(zinfo.header_offset)
+    header = archive.fp.read(zipfile.sizeFileHeader)  # type: ignore
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    archive.fp.seek(zinfo.header_offset + len(header) + name_length + extra_length)
+    remaining = zinfo.compress_size
+    while remaining > 0:
+        chunk = archive.fp.read(min(remaining, CHUNK_SIZE))
+        if not chunk:
+            raise RuntimeError(f"Truncated member {zinfo.filename} in {archive.filename}!")
+        remaining -= len(chunk)
+        yield chunk
+
+
+class ArchiveWriter:
+
+    """
+    :param archive: zip archive opened for writing or appending
+    :param compression_level: zlib level from 0 (store) to 9
+    :param workers: number of compression threads, defaults to the number of CPUs
+    """
+
+    def __init__(
+        self,
+        archive: zipfile.ZipFile,
+        compression_level: int = 9,
+        workers: Optional[int] = None,
+    ):
+        self._archive = archive
+        self._level = compression_level
+        self._workers = workers if workers else (os.cpu_count() or 1)
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="sebs-zip"
+        )
+        # members are written in the order of submission
+        self._pending: Deque[
+            Tuple[
+                zipfile.ZipInfo,
+                bytes,
+                concurrent.futures.Future,
+                List[concurrent.futures.Future],
+            ]
+        ] = collections.deque()
+        self._pending_bytes = 0
+
+    @staticmethod
+    def typename() -> str:
+        return "ArchiveWriter"
+
+    def add_file(self, path: str, arcname: str):
+        zinfo = _zinfo(arcname, bool(os.stat(path).st_mode & 0o111))
+        with open(path, "rb") as f:
+            data = f.read()
+        self.add_bytes(zinfo, data)
+
+    def add_bytes(self, zinfo: zipfile.ZipInfo, data: bytes):
+
+        view = memoryview(data)
+        chunks = []
+        if self._level > 0:
+            for begin in range(0, max(len(data), 1), CHUNK_SIZE):
+                end = begin + CHUNK_SIZE
+                window = max(begin - DICTIONARY_SIZE, 0)
+                chunks.append(
+                    self._pool.submit(
+                        _deflate,
+                        view[begin:end],
+                        self._level,
+                        bytes(view[window:begin]),
+                        end >= len(data),
+                    )
+                )
+        crc = self._pool.submit(zlib.crc32, view)
+        self._pending.append((zinfo, data, crc, chunks))
+        self._pending_bytes += len(data)
+
+        # limit the memory used by members waiting for compression
+        while self._pending and (
+            len(self._pending) > 4 * self._workers
+            or self._pending_bytes > 4 * self._workers * CHUNK_SIZE
+        ):
+            self._write_next()
+
+    def _write_next(self):
+        zinfo, data, crc, chunks = self._pending.popleft()
+        self._pending_bytes -= len(data)
+        compressed = [chunk.result() for chunk in chunks]
+        zinfo.CRC = crc.result()
+        zinfo.file_size = len(data)
+        zinfo.compress_size = sum(len(chunk) for chunk in compressed)
+        # incompressible data is stored, as done by zip
+        if self._level > 0 and zinfo.compress_size < zinfo.file_size:
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+        else:
+            zinfo.compress_type = zipfile.ZIP_STORED
+            zinfo.compress_size = zinfo.file_size
+            compressed = [data]
+        _write_raw(self._archive, zinfo, compressed)
+
+    def flush(self):
+        while self._pending:
+            self._write_next()
+
+    def close(self):
+        self.flush()
+        self._pool.shutdown()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.shutdown()
+
+
+"""
+    Files and directories to be archived, with paths relative to `directory`.
+    Hidden files are included and symbolic links are followed, like in `zip -r`.
+"""
+
+
+def list_files(directory: str, members: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    files = []
+    for member in sorted(members if members is not None else os.listdir(directory)):
+        path = os.path.join(directory, member)
+        if not os.path.isdir(path):
+            files.append((path, member))
+            continue
+        for root, dirs, filenames in os.walk(path, followlinks=True):
+            dirs.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(root, filename)
+                files.append((file_path, os.path.relpath(file_path, directory)))
+    return files
+
+
+"""
+    Create a zip archive of a directory.
+
+    :param directory: directory with code package
+    :param archive: path of the new archive; if it is inside `directory`, it is not archived
+    :param members: files and directories to include, all by default
+    :return: size of the archive in bytes
+"""
+
+
+def create_archive(
+    directory: str,
+    archive: str,
+    compression_level: int = 9,
+    workers: Optional[int] = None,
+    members: Optional[List[str]] = None,
+) -> int:
+
+    archive_path = os.path.abspath(archive)
+    with zipfile.ZipFile(archive, "w") as zip_archive:
+        with ArchiveWriter(zip_archive, compression_level, workers) as writer:
+            for path, arcname in list_files(directory, members):
+                if os.path.abspath(path) != archive_path:
+                    writer.add_file(path, arcname)
+    return os.path.getsize(archive)
+
+
+"""
+    Add a member to an archive or replace an existing one.
+    Other members are never recompressed: when the replaced member is the last one,
+    the archive is truncated in place; otherwise, the compressed data of remaining
+    members is copied to a new archive.
+"""
+
+
+def replace_member(
+    archive: str,
+    name: str,
+    data: bytes,
+    compression_level: int = 9,
+    workers: Optional[int] = None,
+):
+
+    zinfo = _zinfo(name)
+
+    with zipfile.ZipFile(archive, "a") as zip_archive:
+        assert zip_archive.fp is not None
+        existing = zip_archive.NameToInfo.get(name)
+        last_offset = max((info.header_offset for info in zip_archive.filelist), default=-1)
+        if existing is None or existing.header_offset == last_offset:
+            if existing is not None:
+                zip_archive.fp.seek(existing.header_offset)
+                zip_archive.fp.truncate()
+                zip_archive.filelist.remove(existing)
+                del zip_archive.NameToInfo[name]
+                _update_zipfile(zip_archive, existing.header_offset)
+            with ArchiveWriter(zip_archive, compression_level, workers) as writer:
+                writer.add_bytes(zinfo, data)
+            return
+
+    fd, tmp_archive = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(archive)))
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(archive, "r") as zin, zipfile.ZipFile(tmp_archive, "w") as zout:
+            zout.comment = zin.comment
+            for info in zin.infolist():
+                if info.filename != name:
+                    _write_raw(zout, copy.copy(info), _read_raw(zin, info))
+            with ArchiveWriter(zout, compression_level, workers) as writer:
+                writer.add_bytes(zinfo, data)
+        # mkstemp creates files readable only by the owner
+        shutil.copymode(archive, tmp_archive)
+        os.replace(tmp_archive, archive)
+    except BaseException:
+        os.remove(tmp_archive)
+        raise
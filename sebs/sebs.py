@@ -141,6 +141,7 @@ class SeBS(LoggingBase):
             NetworkPingPong,
             InvocationOverhead,
             EvictionModel,
+            LoadGenerator,
         )
 
         implementations: Dict[str, Type[Experiment]] = {
@@ -148,6 +149,7 @@ class SeBS(LoggingBase):
             "network-ping-pong": NetworkPingPong,
             "invocation-overhead": InvocationOverhead,
             "eviction-model": EvictionModel,
+            "load-generator": LoadGenerator,
         }
         if experiment_type not in implementations:
             raise RuntimeError(f"Experiment {experiment_type} not supported!")
@@ -163,13 +165,14 @@ class SeBS(LoggingBase):
         deployment: FaaSSystem,
         config: ExperimentConfig,
         logging_filename: Optional[str] = None,
+        output_dir: Optional[str] = None,
     ) -> Benchmark:
         benchmark = Benchmark(
             name,
             deployment.name(),
             config,
             self._config,
-            self._output_dir,
+            output_dir if output_dir else self._output_dir,
             self.cache_client,
             self.docker_client,
         )
@@ -0,0 +1,163 @@
+import compileall
+import os
+import py_compile
+import re
+import shutil
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+"""
+    Removal of files not needed at runtime from a code package
+    after the installation of dependencies.
+
+    Directories with tests and documentation are removed only inside packages,
+    never at the top level of the code package. Debug symbols are stripped from
+    shared libraries with `strip --strip-debug` when the tool is available.
+    Removed bytes are attributed to the package owning each file: the top-level
+    entry for Python, and the module in `node_modules` for Node.js.
+"""
+
+CATEGORIES = ["pycache", "tests", "docs", "dist-info", "debug-symbols"]
+SHARED_LIBRARY = re.compile(r"\.(so(\.[0-9]+)*|node)$")
+METADATA_DIRECTORY = re.compile(r"^(.+?)-[^-]*\.(dist-info|egg-info)$")
+ELF_MAGIC = b"\x7fELF"
+
+
+def _path_size(path: str) -> int:
+    if os.path.islink(path) or not os.path.isdir(path):
+        return os.lstat(path).st_size
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            total += os.lstat(os.path.join(root, f)).st_size
+    return total
+
+
+def _package_name(relative_path: str) -> str:
+    parts = relative_path.split(os.sep)
+    if parts[0] == "node_modules" and len(parts) > 2:
+        # scoped modules, e.g., @aws-sdk/client-s3
+        if parts[1].startswith("@") and len(parts) > 3:
+            return f"{parts[1]}/{parts[2]}"
+        return parts[1]
+    top = parts[0]
+    metadata = METADATA_DIRECTORY.match(top)
+    if metadata:
+        return metadata.group(1)
+    # numpy.libs, six.py, _cffi_backend.cpython-38-x86_64-linux-gnu.so
+    return top.split(".")[0]
+
+
+def _is_elf(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(ELF_MAGIC)) == ELF_MAGIC
+
+
+"""
+    Byte-compile Python sources with the interpreter running SeBS.
+    Bytecode is specific to the Python version, thus compilation is done only
+    when it matches the version of the function runtime. Hash-based validation
+    is used since archives store fixed timestamps of sources.
+
+    :return: number of bytes added, None if versions do not match
+"""
+
+
+def compile_bytecode(directory: str, language_version: str) -> Optional[int]:
+    if f"{sys.version_info.major}.{sys.version_info.minor}" != language_version:
+        return None
+    size_before = _path_size(directory)
+    compileall.compile_dir(
+        directory,
+        quiet=1,
+        workers=0,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+    return _path_size(directory) - size_before
+
+
+"""
+    :param directory: code package with installed dependencies
+    :param config: `slimming` section of the systems configuration
+    :return: report with bytes removed in each package and category
+"""
+
+
+def slim_package(directory: str, config: dict) -> dict:
+
+    test_dirs = set(config.get("test_directories", ["tests", "test", "__tests__"]))
+    doc_dirs = set(config.get("doc_directories", ["docs", "doc"]))
+    metadata_files = set(
+        config.get(
+            "dist_info_files", ["RECORD", "INSTALLER", "REQUESTED", "WHEEL", "direct_url.json"]
+        )
+    )
+    strip = shutil.which("strip") if config.get("strip_debug_symbols", True) else None
+
+    removed: Dict[str, Dict[str, int]] = {}
+
+    def account(relative_path: str, category: str, size: int):
+        if size <= 0:
+            return
+        package = removed.setdefault(_package_name(relative_path), {c: 0 for c in CATEGORIES})
+        package[category] += size
+
+    def remove(path: str, category: str):
+        account(os.path.relpath(path, directory), category, _path_size(path))
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+    size_before = _path_size(directory)
+    for root, dirs, files in os.walk(directory):
+        nested = root != directory
+        kept: List[str] = []
+        for d in sorted(dirs):
+            path = os.path.join(root, d)
+            if d == "__pycache__":
+                remove(path, "pycache")
+            elif nested and d in test_dirs:
+                remove(path, "tests")
+            elif nested and d in doc_dirs:
+                remove(path, "docs")
+            else:
+                kept.append(d)
+        # do not descend into removed directories
+        dirs[:] = kept
+
+        metadata = METADATA_DIRECTORY.match(os.path.basename(root)) is not None
+        for f in sorted(files):
+            path = os.path.join(root, f)
+            if os.path.islink(path):
+                continue
+            if metadata and f in metadata_files:
+                remove(path, "dist-info")
+            elif strip is not None and SHARED_LIBRARY.search(f) and _is_elf(path):
+                size = os.path.getsize(path)
+                ret = subprocess.run(
+                    [strip, "--strip-debug", path],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                # libraries built for another architecture are left unchanged
+                if ret.returncode == 0:
+                    account(
+                        os.path.relpath(path, directory),
+                        "debug-symbols",
+                        size - os.path.getsize(path),
+                    )
+
+    packages = {}
+    for name, categories in sorted(
+        removed.items(), key=lambda item: sum(item[1].values()), reverse=True
+    ):
+        packages[name] = {**categories, "total": sum(categories.values())}
+    size_after = _path_size(directory)
+    return {
+        "size_before": size_before,
+        "size_after": size_after,
+        "removed": size_before - size_after,
+        "packages": packages,
+    }
@@ -1,5 +1,5 @@
 import math
-from typing import List, Tuple
+from typing import List, Tuple, Union
 from collections import namedtuple
 
 import numpy as np
@@ -7,8 +7,11 @@ import scipy.stats as st
 
 BasicStats = namedtuple("BasicStats", "mean median std cv")
 
+# lists of samples or NumPy views of result columns
+Samples = Union[List[float], np.ndarray]
 
-def basic_stats(times: List[float]) -> BasicStats:
+
+def basic_stats(times: Samples) -> BasicStats:
     mean = np.mean(times)
     median = np.median(times)
     std = np.std(times)
@@ -16,14 +19,14 @@ def basic_stats(times: List[float]) -> BasicStats:
     return BasicStats(mean, median, std, cv)
 
 
-def ci_tstudents(alpha: float, times: List[float]) -> Tuple[float, float]:
+def ci_tstudents(alpha: float, times: Samples) -> Tuple[float, float]:
     mean = np.mean(times)
     return st.t.interval(alpha, len(times) - 1, loc=mean, scale=st.sem(times))
 
 
-def ci_le_boudec(alpha: float, times: List[float]) -> Tuple[float, float]:
+def ci_le_boudec(alpha: float, times: Samples) -> Tuple[float, float]:
 
-    sorted_times = sorted(times)
+    sorted_times = np.sort(times)
     n = len(times)
 
     # z(alfa/2)
@@ -2,14 +2,14 @@ import json
 import os
 import secrets
 import uuid
-from typing import List, Optional, Type, TypeVar
+from typing import Iterator, List, Optional, Type, TypeVar
 
 import docker
 import minio
 
 from sebs.cache import Cache
 from sebs.types import Storage as StorageTypes
-from sebs.faas.storage import PersistentStorage
+from sebs.faas.storage import ObjectInfo, PersistentStorage
 from sebs.storage.config import MinioConfig
 
 
@@ -151,51 +151,44 @@ class Minio(PersistentStorage):
             # rethrow
             raise err
 
-    def uploader_func(self, bucket_idx, file, filepath):
-        try:
-            self.connection.fput_object(self.input_buckets[bucket_idx], file, filepath)
-        except minio.error.ResponseError as err:
-            self.logging.error("Upload failed!")
-            raise (err)
-
     def clean(self):
         for bucket in self.output_buckets:
-            objects = self.connection.list_objects_v2(bucket)
-            objects = [obj.object_name for obj in objects]
-            for err in self.connection.remove_objects(bucket, objects):
-                self.logging.error("Deletion Error: {}".format(err))
+            self.clean_bucket(bucket)
 
     def download_results(self, result_dir):
         result_dir = os.path.join(result_dir, "storage_output")
         for bucket in self.output_buckets:
-            objects = self.connection.list_objects_v2(bucket)
-            objects = [obj.object_name for obj in objects]
-            for obj in objects:
-                self.connection.fget_object(bucket, obj, os.path.join(result_dir, obj))
-
-    def clean_bucket(self, bucket: str):
-        delete_object_list = map(
-            lambda x: minio.DeleteObject(x.object_name),
-            self.connection.list_objects(bucket_name=bucket),
-        )
-        errors = self.connection.remove_objects(bucket, delete_object_list)
-        for error in errors:
-            self.logging.error(f"Error when deleting object from bucket {bucket}: {error}!")
+            for obj in self.list_objects(bucket):
+                self.connection.fget_object(bucket, obj.key, os.path.join(result_dir, obj.key))
+
+    def _delete_objects(self, bucket_name: str, keys: List[str]):
+        # the client sends multi-object delete requests with up to 1000 keys,
+        # errors are returned lazily
+        for error in self.connection.remove_objects(bucket_name, keys):
+            self.logging.error(f"Error when deleting object from bucket {bucket_name}: {error}!")
 
     def correct_name(self, name: str) -> str:
         return name
 
     def download(self, bucket_name: str, key: str, filepath: str):
-        raise NotImplementedError()
+        self.logging.info("Download {}:{} to {}".format(bucket_name, key, filepath))
+        self.connection.fget_object(bucket_name, key, filepath)
+
+    def read_object(self, bucket_name: str, key: str) -> bytes:
+        response = self.connection.get_object(bucket_name, key)
+        try:
+            return response.read()
+        finally:
+            response.release_conn()
 
     def exists_bucket(self, bucket_name: str) -> bool:
         return self.connection.bucket_exists(bucket_name)
 
-    def list_bucket(self, bucket_name: str) -> List[str]:
+    def list_objects(self, bucket_name: str, prefix: str = "") -> Iterator[ObjectInfo]:
         try:
-            objects_list = self.connection.list_objects(bucket_name)
-            objects: List[str]
-            return [obj.object_name for obj in objects_list]
+            # the client requests next pages of results
+            for obj in self.connection.list_objects_v2(bucket_name, prefix=prefix, recursive=True):
+                yield ObjectInfo(obj.object_name, obj.size, obj.etag.strip('"'))
         except minio.error.NoSuchBucket:
             raise RuntimeError(f"Attempting to access a non-existing bucket {bucket_name}!")
 
@@ -204,7 +197,15 @@ class Minio(PersistentStorage):
         return [bucket.name for bucket in buckets if bucket_name in bucket.name]
 
     def upload(self, bucket_name: str, filepath: str, key: str):
-        raise NotImplementedError()
+        self.logging.info("Upload {} to {}".format(filepath, bucket_name))
+        try:
+            # files larger than the part size are uploaded with multipart upload
+            self.connection.fput_object(
+                bucket_name, key, filepath, part_size=self.upload_config.part_size * 1024 * 1024
+            )
+        except minio.error.ResponseError as err:
+            self.logging.error("Upload failed!")
+            raise (err)
 
     def serialize(self) -> dict:
         return {
@@ -33,7 +33,7 @@ class JSONSerializer(json.JSONEncoder):
 
 def serialize(obj) -> str:
     if hasattr(obj, "serialize"):
-        return json.dumps(obj.serialize(), sort_keys=True, indent=2)
+        return json.dumps(obj.serialize(), cls=JSONSerializer, sort_keys=True, indent=2)
     else:
         return json.dumps(obj, cls=JSONSerializer, sort_keys=True, indent=2)
 
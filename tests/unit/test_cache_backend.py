@@ -0,0 +1,165 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sebs import cache_backend
+from sebs.cache_backend import JSONCacheBackend, SQLiteCacheBackend
+
+
+class CacheBackendMigration(unittest.TestCase):
+    benchmarks = {
+        "110.dynamic-html": {
+            "aws": {
+                "python": {
+                    "code_package": {"3.8": {"hash": "abc", "size": 1024}},
+                    "functions": {"dynamic-html-python-3.8": {"name": "dynamic-html"}},
+                },
+                "storage": {"buckets": {"input": ["input-0"], "output": []}},
+            },
+            "local": {
+                "nodejs": {
+                    "code_package": {"14": {"hash": "def", "size": 2048}},
+                    "functions": {},
+                },
+            },
+        },
+        "210.thumbnailer": {
+            "gcp": {
+                "python": {
+                    "code_package": {"3.7": {"hash": "ghi", "size": 4096}},
+                    "functions": {"thumbnailer-python-3.7": {"name": "thumbnailer"}},
+                },
+            },
+        },
+    }
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = self.tmp_dir.name
+        backend = JSONCacheBackend(self.cache_dir)
+        for benchmark, config in self.benchmarks.items():
+            backend.import_benchmark(benchmark, config)
+        backend.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def database_files(self):
+        return sorted(
+            f for f in os.listdir(self.cache_dir) if f.startswith(SQLiteCacheBackend.DATABASE)
+        )
+
+    def assertBenchmarks(self, backend, benchmarks: dict):
+        self.assertEqual(backend.benchmarks(), sorted(benchmarks.keys()))
+        for benchmark, config in benchmarks.items():
+            self.assertEqual(backend.export_benchmark(benchmark), config)
+
+    def test_round_trip(self):
+        self.assertEqual(cache_backend.migrate(self.cache_dir, "sqlite"), len(self.benchmarks))
+        self.assertEqual(self.database_files(), [SQLiteCacheBackend.DATABASE])
+
+        backend = cache_backend.create_backend(self.cache_dir)
+        self.assertIsInstance(backend, SQLiteCacheBackend)
+        self.assertBenchmarks(backend, self.benchmarks)
+        self.assertEqual(
+            backend.get_code_package("aws", "110.dynamic-html", "python", "3.8"),
+            {"hash": "abc", "size": 1024},
+        )
+        # modifications made with SQLite are migrated back
+        with backend.transaction():
+            backend.put_code_package(
+                "aws", "110.dynamic-html", "python", "3.8", {"hash": "xyz", "size": 1}
+            )
+        backend.close()
+
+        self.assertEqual(cache_backend.migrate(self.cache_dir, "json"), len(self.benchmarks))
+        self.assertNotIn(SQLiteCacheBackend.DATABASE, self.database_files())
+        self.assertIn(f"{SQLiteCacheBackend.DATABASE}.bak", self.database_files())
+
+        backend = cache_backend.create_backend(self.cache_dir)
+        self.assertIsInstance(backend, JSONCacheBackend)
+        self.assertEqual(
+            backend.get_code_package("aws", "110.dynamic-html", "python", "3.8"),
+            {"hash": "xyz", "size": 1},
+        )
+        self.assertEqual(
+            backend.export_benchmark("210.thumbnailer"), self.benchmarks["210.thumbnailer"]
+        )
+
+    def test_migrate_to_same_backend(self):
+        with self.assertRaises(RuntimeError):
+            cache_backend.migrate(self.cache_dir, "json")
+
+    def test_failed_migration_to_sqlite(self):
+        export = JSONCacheBackend.export_benchmark
+
+        def failing_export(backend, benchmark):
+            if benchmark == "210.thumbnailer":
+                raise OSError("read failure")
+            return export(backend, benchmark)
+
+        with mock.patch.object(JSONCacheBackend, "export_benchmark", failing_export):
+            with self.assertRaises(OSError):
+                cache_backend.migrate(self.cache_dir, "sqlite")
+
+        # the partially filled database is removed and the JSON cache stays in use
+        self.assertEqual(self.database_files(), [])
+        backend = cache_backend.create_backend(self.cache_dir)
+        self.assertIsInstance(backend, JSONCacheBackend)
+        self.assertBenchmarks(backend, self.benchmarks)
+
+        self.assertEqual(cache_backend.migrate(self.cache_dir, "sqlite"), len(self.benchmarks))
+        backend = cache_backend.create_backend(self.cache_dir)
+        self.assertIsInstance(backend, SQLiteCacheBackend)
+        self.assertBenchmarks(backend, self.benchmarks)
+        backend.close()
+
+    def test_failed_migration_to_json(self):
+        cache_backend.migrate(self.cache_dir, "sqlite")
+        backend = cache_backend.create_backend(self.cache_dir)
+        with backend.transaction():
+            backend.put_storage("gcp", "210.thumbnailer", {"buckets": {}})
+        backend.close()
+
+        with mock.patch.object(
+            SQLiteCacheBackend, "export_benchmark", side_effect=OSError("read failure")
+        ):
+            with self.assertRaises(OSError):
+                cache_backend.migrate(self.cache_dir, "json")
+
+        # the database is kept and none of the JSON files has been modified
+        self.assertIn(SQLiteCacheBackend.DATABASE, self.database_files())
+        self.assertBenchmarks(JSONCacheBackend(self.cache_dir), self.benchmarks)
+        backend = cache_backend.create_backend(self.cache_dir)
+        self.assertIsInstance(backend, SQLiteCacheBackend)
+        self.assertEqual(backend.get_storage("gcp", "210.thumbnailer"), {"buckets": {}})
+        backend.close()
+
+
+class SQLiteTransactions(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.backend = SQLiteCacheBackend(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.backend.close()
+        self.tmp_dir.cleanup()
+
+    def test_rollback(self):
+        with self.backend.transaction():
+            self.backend.put_storage("aws", "110.dynamic-html", {"buckets": 1})
+
+        with self.assertRaises(KeyError):
+            with self.backend.transaction():
+                self.backend.put_storage("aws", "110.dynamic-html", {"buckets": 2})
+                # the uncommitted row is read and memoized
+                self.assertEqual(
+                    self.backend.get_storage("aws", "110.dynamic-html"), {"buckets": 2}
+                )
+                raise KeyError()
+        self.assertEqual(self.backend.get_storage("aws", "110.dynamic-html"), {"buckets": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import stat
+import tempfile
+import unittest
+import zipfile
+
+from sebs import packaging
+
+
+class Packaging(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp_dir.name, "code")
+        os.makedirs(os.path.join(self.directory, "function", "data"))
+        self.files = {
+            "handler.py": b"def handler(event, context):\n    pass\n",
+            "requirements.txt": b"",
+            "function/function.py": b"import os\n" * 1000,
+            # larger than a chunk, compressed in parallel
+            "function/data/large.bin": os.urandom(packaging.CHUNK_SIZE // 2) * 5,
+            "function/data/.hidden": b"hidden",
+        }
+        for name, data in self.files.items():
+            with open(os.path.join(self.directory, name), "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def archive_path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir.name, name)
+
+    def read_archive(self, path: str) -> dict:
+        with zipfile.ZipFile(path) as archive:
+            self.assertIsNone(archive.testzip())
+            return {info.filename: archive.read(info) for info in archive.infolist()}
+
+    def test_create_archive(self):
+        path = self.archive_path("code.zip")
+        size = packaging.create_archive(self.directory, path)
+        self.assertEqual(size, os.path.getsize(path))
+        self.assertEqual(self.read_archive(path), self.files)
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(
+                archive.namelist(),
+                [name for _, name in packaging.list_files(self.directory)],
+            )
+
+    def test_create_archive_workers(self):
+        archives = []
+        for workers in [1, 2, 8]:
+            path = self.archive_path(f"code_{workers}.zip")
+            packaging.create_archive(self.directory, path, workers=workers)
+            with open(path, "rb") as f:
+                archives.append(f.read())
+        self.assertEqual(archives[0], archives[1])
+        self.assertEqual(archives[0], archives[2])
+
+    def test_create_archive_inside_directory(self):
+        path = os.path.join(self.directory, "code.zip")
+        packaging.create_archive(self.directory, path)
+        self.assertEqual(self.read_archive(path), self.files)
+
+    def test_replace_last_member(self):
+        path = self.archive_path("code.zip")
+        packaging.create_archive(self.directory, path)
+        packaging.replace_member(path, "requirements.txt", b"numpy\n")
+        expected = {**self.files, "requirements.txt": b"numpy\n"}
+        self.assertEqual(self.read_archive(path), expected)
+
+    def test_replace_middle_member(self):
+        path = self.archive_path("code.zip")
+        packaging.create_archive(self.directory, path)
+        packaging.replace_member(path, "handler.py", b"# replaced\n")
+        expected = {**self.files, "handler.py": b"# replaced\n"}
+        self.assertEqual(self.read_archive(path), expected)
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+        # other members are copied in their order, the replaced one is appended
+        self.assertEqual(names[-1], "handler.py")
+        self.assertEqual(len(names), len(self.files))
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["code", "code.zip"])
+
+    def test_replace_member_mode(self):
+        path = self.archive_path("code.zip")
+        packaging.create_archive(self.directory, path)
+        os.chmod(path, 0o644)
+        packaging.replace_member(path, "handler.py", b"# replaced\n")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+
+    def test_add_member(self):
+        path = self.archive_path("code.zip")
+        packaging.create_archive(self.directory, path)
+        packaging.replace_member(path, "config.json", b"{}")
+        expected = {**self.files, "config.json": b"{}"}
+        self.assertEqual(self.read_archive(path), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import base64
+import hashlib
+import os
+import tempfile
+import unittest
+from typing import Dict, Iterator, List
+
+from sebs.faas.storage import FileDigest, ObjectInfo, PersistentStorage
+from sebs.utils import LoggingHandlers
+
+
+class MemoryStorage(PersistentStorage):
+
+    """
+    Buckets kept in memory; objects report the MD5 of their content as the ETag.
+    """
+
+    def __init__(self, replace_existing: bool = False):
+        super().__init__("region", None, replace_existing)  # type: ignore
+        self.logging_handlers = LoggingHandlers()
+        self.buckets: Dict[str, Dict[str, bytes]] = {}
+        self.uploads: List[str] = []
+        self.listings = 0
+
+    @staticmethod
+    def deployment_name() -> str:
+        return "memory"
+
+    def correct_name(self, name: str) -> str:
+        return name
+
+    def _create_bucket(self, name: str, buckets: List[str] = []):
+        self.buckets.setdefault(name, {})
+        return name
+
+    def download(self, bucket_name: str, key: str, filepath: str) -> None:
+        with open(filepath, "wb") as f:
+            f.write(self.buckets[bucket_name][key])
+
+    def read_object(self, bucket_name: str, key: str) -> bytes:
+        return self.buckets[bucket_name][key]
+
+    def upload(self, bucket_name: str, filepath: str, key: str):
+        with open(filepath, "rb") as f:
+            self.buckets[bucket_name][key] = f.read()
+        self.uploads.append(key)
+
+    def list_objects(self, bucket_name: str, prefix: str = "") -> Iterator[ObjectInfo]:
+        self.listings += 1
+        for key, data in self.buckets[bucket_name].items():
+            if key.startswith(prefix):
+                yield ObjectInfo(key, len(data), etag=hashlib.md5(data).hexdigest())
+
+    def list_buckets(self, bucket_name: str) -> List[str]:
+        return [bucket for bucket in self.buckets.keys() if bucket_name in bucket]
+
+    def exists_bucket(self, bucket_name: str) -> bool:
+        return bucket_name in self.buckets
+
+    def _delete_objects(self, bucket_name: str, keys: List[str]):
+        for key in keys:
+            del self.buckets[bucket_name][key]
+
+
+class StorageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = MemoryStorage()
+        self.storage._create_bucket("input-0")
+        self.storage.input_buckets.append("input-0")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_file(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+
+class BucketIndex(StorageTestCase):
+    def test_index_listed_once(self):
+        self.storage.buckets["input-0"]["existing"] = b"data"
+        self.assertTrue(self.storage.exists_object("input-0", "existing"))
+        self.assertFalse(self.storage.exists_object("input-0", "missing"))
+        self.assertEqual(self.storage.listings, 1)
+        self.assertEqual(self.storage.list_bucket("input-0"), ["existing"])
+        self.assertEqual(self.storage.listings, 2)
+
+    def test_upload_updates_index(self):
+        path = self.write_file("file.txt", b"content")
+        self.assertFalse(self.storage.exists_object("input-0", "file.txt"))
+
+        self.assertTrue(self.storage.uploader_func(0, "file.txt", path))
+        self.assertTrue(self.storage.exists_object("input-0", "file.txt"))
+        self.assertEqual(self.storage.bucket_index("input-0")["file.txt"].size, len(b"content"))
+        # the bucket is not listed again after the upload
+        self.assertEqual(self.storage.listings, 1)
+
+        # new files are not hashed, thus the indexed object has no comparable digest
+        self.assertIsNone(self.storage.bucket_index("input-0")["file.txt"].md5)
+        self.assertTrue(self.storage.uploader_func(0, "file.txt", path))
+        self.assertEqual(
+            self.storage.bucket_index("input-0")["file.txt"].md5,
+            hashlib.md5(b"content").hexdigest(),
+        )
+        self.assertFalse(self.storage.uploader_func(0, "file.txt", path))
+        self.assertEqual(self.storage.uploads, ["file.txt", "file.txt"])
+
+    def test_upload_modified_file(self):
+        self.storage.buckets["input-0"]["file.txt"] = b"old content"
+        path = self.write_file("file.txt", b"new content")
+
+        self.assertTrue(self.storage.uploader_func(0, "file.txt", path))
+        self.assertEqual(self.storage.buckets["input-0"]["file.txt"], b"new content")
+        self.assertEqual(
+            self.storage.bucket_index("input-0")["file.txt"].md5,
+            hashlib.md5(b"new content").hexdigest(),
+        )
+        self.assertFalse(self.storage.uploader_func(0, "file.txt", path))
+        self.assertEqual(self.storage.uploads, ["file.txt"])
+
+    def test_replace_existing(self):
+        self.storage.replace_existing = True
+        self.storage.buckets["input-0"]["file.txt"] = b"content"
+        path = self.write_file("file.txt", b"content")
+
+        self.assertTrue(self.storage.uploader_func(0, "file.txt", path))
+        self.assertTrue(self.storage.uploader_func(0, "file.txt", path))
+        self.assertEqual(self.storage.uploads, ["file.txt", "file.txt"])
+        # neither listed nor hashed when all files are replaced
+        self.assertEqual(self.storage.listings, 0)
+
+    def test_clean_bucket_updates_index(self):
+        path = self.write_file("file.txt", b"content")
+        self.storage.uploader_func(0, "file.txt", path)
+        self.storage.clean_bucket("input-0")
+        self.assertFalse(self.storage.exists_object("input-0", "file.txt"))
+        self.assertTrue(self.storage.uploader_func(0, "file.txt", path))
+
+
+class Digest(StorageTestCase):
+    part_size = 1024
+
+    def test_single_part(self):
+        data = b"x" * 100
+        digest = FileDigest.compute(self.write_file("file", data), self.part_size)
+        md5 = hashlib.md5(data).hexdigest()
+        self.assertEqual(digest.md5, md5)
+        self.assertIsNone(digest.multipart_etag)
+
+        self.assertTrue(digest.matches(ObjectInfo("file", len(data), etag=md5)))
+        self.assertTrue(digest.matches(ObjectInfo("file", len(data), md5=md5)))
+        self.assertFalse(digest.matches(ObjectInfo("file", len(data), etag="0" * 32)))
+        self.assertFalse(digest.matches(ObjectInfo("file", len(data) + 1, etag=md5)))
+        # a separately stored MD5 takes precedence over the ETag
+        self.assertFalse(digest.matches(ObjectInfo("file", len(data), etag=md5, md5="0" * 32)))
+        # no comparable digest, e.g., an ETag that is not a content hash
+        self.assertFalse(digest.matches(ObjectInfo("file", len(data))))
+        self.assertFalse(digest.matches(ObjectInfo("file", len(data), etag="0x8D9")))
+
+    def test_multipart(self):
+        parts = [b"a" * self.part_size, b"b" * self.part_size, b"c" * 10]
+        data = b"".join(parts)
+        digest = FileDigest.compute(self.write_file("file", data), self.part_size)
+        etag = hashlib.md5(b"".join(hashlib.md5(p).digest() for p in parts)).hexdigest()
+        self.assertEqual(digest.multipart_etag, f"{etag}-3")
+        self.assertEqual(digest.md5, hashlib.md5(data).hexdigest())
+
+        self.assertTrue(digest.matches(ObjectInfo("file", len(data), etag=f"{etag}-3")))
+        self.assertTrue(digest.matches(ObjectInfo("file", len(data), etag=digest.md5)))
+        self.assertTrue(digest.matches(ObjectInfo("file", len(data), md5=digest.md5)))
+        # uploaded with a different part size
+        self.assertFalse(digest.matches(ObjectInfo("file", len(data), etag=f"{etag}-2")))
+
+    def test_is_current(self):
+        path = self.write_file("file", b"content")
+        digest = FileDigest.compute(path, self.part_size)
+        self.assertTrue(digest.is_current(path, self.part_size))
+        self.assertFalse(digest.is_current(path, 2 * self.part_size))
+        self.assertEqual(FileDigest.deserialize(digest.serialize()), digest)
+
+        self.write_file("file", b"modified")
+        self.assertFalse(digest.is_current(path, self.part_size))
+
+    def test_md5_from_base64(self):
+        md5 = hashlib.md5(b"content")
+        encoded = base64.b64encode(md5.digest()).decode()
+        self.assertEqual(ObjectInfo.md5_from_base64(encoded), md5.hexdigest())
+        self.assertIsNone(ObjectInfo.md5_from_base64(None))
+
+
+if __name__ == "__main__":
+    unittest.main()